@@ -0,0 +1 @@
+# Benchmarks and load tools run against a local stub backend
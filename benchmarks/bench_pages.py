@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from statistics import mean, median
+
+from benchmarks.stub_backend import StubBackend, make_token
+
+"""
+Benchmark suite for the forum and meetings pages.
+
+Starts the local stub backend, then drives render_forum_page and
+render_meeting_appointment_page through Streamlit's AppTest for a number of reruns per
+data set size. For every scenario it reports cold and warm rerun latency, backend calls
+and bytes transferred per rerun, and peak Python memory of a cold rerun. Results are
+written as JSON tagged with the current commit so runs can be compared.
+
+Usage:
+    python -m benchmarks.bench_pages --posts 10000 100000 1000000 --latency 0.02
+"""
+
+
+def forum_app():
+    from demo5_web_svc.pages.forum import render_forum_page
+
+    render_forum_page()
+
+
+def meetings_app():
+    from demo5_web_svc.pages.meeting_appointment import render_meeting_appointment_page
+
+    render_meeting_appointment_page()
+
+
+APPS = {"forum": forum_app, "meetings": meetings_app}
+
+
+def percentile(values: list, pct: float) -> float:
+    """Return the pct-th percentile (0-100) using nearest-rank."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def reset_client_state() -> None:
+    """Drop every client-side cache so the next rerun is cold."""
+    from demo5_web_svc import cache, http_client
+
+    cache.data_cache.clear()
+    http_client.clear_validators()
+
+
+def new_app_test(page: str, token: str):
+    from streamlit.testing.v1 import AppTest
+
+    app_test = AppTest.from_function(APPS[page], default_timeout=300)
+    app_test.session_state["jwt_token"] = token
+    return app_test
+
+
+def run_scenario(backend: StubBackend, page: str, reruns: int, token: str) -> dict:
+    """Run one page for a number of reruns and collect measurements."""
+    reset_client_state()
+    backend.reset_stats()
+    app_test = new_app_test(page, token)
+
+    latencies, calls, transferred = [], [], []
+    for _ in range(reruns):
+        requests_before = backend.stats["requests"]
+        bytes_before = backend.stats["bytes_sent"]
+        started = time.perf_counter()
+        app_test.run()
+        latencies.append(time.perf_counter() - started)
+        calls.append(backend.stats["requests"] - requests_before)
+        transferred.append(backend.stats["bytes_sent"] - bytes_before)
+    exceptions = [str(exc.value) for exc in app_test.exception]
+
+    # Peak memory is measured on a separate cold rerun so tracing does not skew latency
+    reset_client_state()
+    tracemalloc.start()
+    new_app_test(page, token).run()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    warm = latencies[1:] or latencies
+    return {
+        "page": page,
+        "reruns": reruns,
+        "cold_rerun_seconds": latencies[0],
+        "warm_rerun_p50_seconds": median(warm),
+        "warm_rerun_p95_seconds": percentile(warm, 95),
+        "backend_calls_per_rerun": mean(calls),
+        "backend_calls_cold_rerun": calls[0],
+        "bytes_per_rerun": mean(transferred),
+        "bytes_cold_rerun": transferred[0],
+        "backend_errors": backend.stats["errors"],
+        "peak_python_memory_bytes": peak_bytes,
+        "exceptions": exceptions,
+    }
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Forum sizes to benchmark")
+    parser.add_argument("--meetings", type=int, nargs="+", default=[100, 10_000], help="Meeting list sizes to benchmark")
+    parser.add_argument("--content-size", type=int, default=200, help="Bytes of content per post")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub backend latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of backend requests answered with 500")
+    parser.add_argument("--reruns", type=int, default=10, help="Reruns per scenario")
+    parser.add_argument("--list-mode", action="store_true", help="Serve /forum as one unpaginated list")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write the JSON results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    backend = StubBackend(
+        latency=args.latency,
+        content_size=args.content_size,
+        error_rate=args.error_rate,
+        paginate=not args.list_mode,
+    ).start()
+    # The app resolves its backend URL once, at import time
+    os.environ["AUTH_SERVICE_URL"] = backend.url
+    token = make_token()
+
+    results = []
+    try:
+        for post_count in args.posts:
+            backend.reset(post_count=post_count)
+            result = dict(run_scenario(backend, "forum", args.reruns, token), posts=post_count)
+            results.append(result)
+            print(json.dumps(result), file=sys.stderr)
+        for meeting_count in args.meetings:
+            backend.reset(meeting_count=meeting_count)
+            result = dict(run_scenario(backend, "meetings", args.reruns, token), meetings=meeting_count)
+            results.append(result)
+            print(json.dumps(result), file=sys.stderr)
+    finally:
+        backend.stop()
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "max_rss_kilobytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "settings": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
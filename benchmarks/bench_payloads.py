@@ -0,0 +1,129 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from statistics import median
+
+import requests
+
+from benchmarks.bench_pages import current_commit
+from benchmarks.stub_backend import StubBackend, make_token, msgpack, zstd
+
+"""
+Benchmark of list payload encodings.
+
+Starts the local stub backend with unpaginated /forum and /api/meetings lists and reads
+each list once per repetition under every combination of body format (JSON, msgpack) and
+content encoding (identity, gzip, zstd) that the installed packages support, decoding it
+with the same functions the pages use. For every combination it reports bytes on the wire,
+decoded body bytes, bytes saved against plain JSON, and the p50 time to transfer plus
+decode and to decode alone. Meetings sent as JSON are validated into models while they
+are decoded, so compare their fetch_decode_p50_ms rather than decode_p50_ms.
+
+Usage:
+    python -m benchmarks.bench_payloads --posts 10000 100000 --meetings 10000
+"""
+
+
+def variants() -> list[tuple[str, str]]:
+    """Return the (Accept, Accept-Encoding) pairs that can be negotiated here."""
+    formats = ["application/json"] + (["application/msgpack"] if msgpack is not None else [])
+    encodings = ["identity", "gzip"] + (["zstd"] if zstd is not None else [])
+    return [(accept, encoding) for accept in formats for encoding in encodings]
+
+
+def read_forum(response: requests.Response):
+    from demo5_web_svc import payloads
+
+    return payloads.parse_window(response, 0, 5)
+
+
+def read_meetings(response: requests.Response):
+    from demo5_web_svc.pages.meeting_appointment import _parse_meetings_body
+
+    return _parse_meetings_body(response)
+
+
+READERS = {"/forum": (read_forum, True), "/api/meetings": (read_meetings, False)}
+
+
+def run_scenario(backend: StubBackend, path: str, repeat: int, token: str) -> list[dict]:
+    """Read one list under every negotiable encoding and collect measurements."""
+    from demo5_web_svc import metrics
+
+    read, stream = READERS[path]
+    rows = []
+    with requests.Session() as session:
+        for accept, accept_encoding in variants():
+            headers = {"Authorization": f"Bearer {token}", "Accept": accept, "Accept-Encoding": accept_encoding}
+            metrics.reset()
+            backend.reset_stats()
+            totals = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = session.get(f"{backend.url}{path}", headers=headers, stream=stream)
+                response.raise_for_status()
+                read(response)
+                totals.append(time.perf_counter() - started)
+            summary = metrics.payload_summary()[0]
+            rows.append({
+                "path": path,
+                "format": summary["format"],
+                "wire_bytes": summary["wire_bytes"] // repeat,
+                "decoded_bytes": summary["decoded_bytes"] // repeat,
+                "fetch_decode_p50_ms": round(median(totals) * 1000, 1),
+                "decode_p50_ms": summary["decode_p50_ms"],
+            })
+    baseline = rows[0]["wire_bytes"]
+    for row in rows:
+        row["bytes_saved_vs_json"] = baseline - row["wire_bytes"]
+    return rows
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, nargs="+", default=[10_000, 100_000], help="Forum sizes to benchmark")
+    parser.add_argument("--meetings", type=int, nargs="+", default=[10_000], help="Meeting list sizes to benchmark")
+    parser.add_argument("--content-size", type=int, default=200, help="Bytes of content per post")
+    parser.add_argument("--repeat", type=int, default=5, help="Reads per encoding")
+    parser.add_argument("--output", default="bench_payloads.json", help="Where to write the JSON results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    backend = StubBackend(content_size=args.content_size, paginate=False).start()
+    token = make_token()
+
+    results = []
+    try:
+        for post_count in args.posts:
+            backend.reset(post_count=post_count)
+            for row in run_scenario(backend, "/forum", args.repeat, token):
+                results.append(dict(row, posts=post_count))
+                print(json.dumps(results[-1]), file=sys.stderr)
+        for meeting_count in args.meetings:
+            backend.reset(meeting_count=meeting_count)
+            for row in run_scenario(backend, "/api/meetings", args.repeat, token):
+                results.append(dict(row, meetings=meeting_count))
+                print(json.dumps(results[-1]), file=sys.stderr)
+    finally:
+        backend.stop()
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
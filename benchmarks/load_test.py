@@ -0,0 +1,405 @@
+import argparse
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import mean, median
+from typing import Optional
+
+import requests
+from websockets.sync.client import connect
+
+from benchmarks.bench_pages import current_commit, percentile
+from benchmarks.stub_backend import StubBackend
+
+"""
+Multi-session load generator for the Streamlit app.
+
+Starts the local stub backend and one `streamlit run src/demo5_web_svc/app.py` server
+process, then simulates N concurrent users for each requested user count. Every user
+opens its own websocket session, exactly like a browser tab, and clicks through the
+sidebar navigation: Signup, Login (submitting the login form), Forum (and its second
+page), Meetings, and round again until the step's duration is over.
+
+For every step it reports p50/p99 rerun latency overall and per action, throughput
+(user actions per second), backend request amplification (stub backend requests per user
+action, in total and per path), script errors, and the server process's CPU and resident
+memory sampled over the run (Linux only; read from /proc).
+
+Usage:
+    python -m benchmarks.load_test --users 1 10 50 100 --duration 30 --latency 0.05
+"""
+
+APP_PATH = Path(__file__).resolve().parent.parent / "src" / "demo5_web_svc" / "app.py"
+
+# Journey after the initial page load; users loop over JOURNEY_LOOP once logged in
+JOURNEY_START = [("navigate", "Login"), ("login", None)]
+JOURNEY_LOOP = [
+    ("navigate", "Forum"),
+    ("forum_page", 2),
+    ("navigate", "Meetings"),
+    ("navigate", "Signup"),
+    ("navigate", "Forum"),
+    ("forum_page", 1),
+]
+
+
+def _proto():
+    # Imported lazily: importing streamlit protos pulls in the whole streamlit package
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    return BackMsg, ForwardMsg, WidgetState
+
+
+class ScriptError(Exception):
+    """Raised when a rerun shows an exception or does not finish."""
+
+
+class VirtualUser:
+    """One browser session driving the app over Streamlit's websocket protocol.
+
+    Like the frontend, it resends the state of every widget shown by the previous run
+    with each rerun, so navigation and form values persist between actions.
+    """
+
+    def __init__(self, url: str, index: int, timeout: float):
+        self.url = url
+        self.index = index
+        self.timeout = timeout
+        self.widgets: dict[str, tuple[str, object]] = {}  # label -> (element type, proto)
+        self.states: dict[str, object] = {}  # widget id -> WidgetState
+        self.alerts: list[str] = []
+        self._cached: dict[str, object] = {}
+
+    def rerun(self, websocket, triggers=()) -> float:
+        BackMsg, ForwardMsg, _ = _proto()
+        message = BackMsg()
+        message.rerun_script.query_string = ""
+        message.rerun_script.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+        started = time.perf_counter()
+        websocket.send(message.SerializeToString())
+
+        widgets, alerts, exceptions = {}, [], []
+        while True:
+            forward = ForwardMsg()
+            forward.ParseFromString(websocket.recv(timeout=self.timeout))
+            kind = forward.WhichOneof("type")
+            if kind == "ref_hash":
+                forward = self._cached.get(forward.ref_hash, forward)
+                kind = forward.WhichOneof("type")
+            elif forward.metadata.cacheable and forward.hash:
+                self._cached[forward.hash] = forward
+            if kind == "script_finished":
+                break
+            if kind != "delta" or forward.delta.WhichOneof("type") != "new_element":
+                continue
+            element = forward.delta.new_element
+            element_type = element.WhichOneof("type")
+            proto = getattr(element, element_type)
+            if element_type == "exception":
+                exceptions.append(proto.message)
+            elif element_type == "alert":
+                alerts.append(proto.body)
+            elif hasattr(proto, "id") and hasattr(proto, "label") and proto.id:
+                widgets[proto.label] = (element_type, proto)
+        elapsed = time.perf_counter() - started
+
+        # Widgets that were not shown again are unmounted, so their state is dropped
+        shown = {proto.id for _, proto in widgets.values()}
+        self.states = {widget_id: state for widget_id, state in self.states.items() if widget_id in shown}
+        self.widgets = widgets
+        self.alerts = alerts
+        if exceptions:
+            raise ScriptError(exceptions[0])
+        return elapsed
+
+    def _state(self, label: str):
+        _, _, WidgetState = _proto()
+        if label not in self.widgets:
+            return None
+        state = WidgetState()
+        state.id = self.widgets[label][1].id
+        return state
+
+    def set_string(self, label: str, value: str) -> bool:
+        state = self._state(label)
+        if state is None:
+            return False
+        state.string_value = value
+        self.states[state.id] = state
+        return True
+
+    def set_number(self, label: str, value: float) -> bool:
+        state = self._state(label)
+        if state is None:
+            return False
+        state.double_value = value
+        self.states[state.id] = state
+        return True
+
+    def trigger(self, label: str):
+        state = self._state(label)
+        if state is not None:
+            state.trigger_value = True
+        return state
+
+    def act(self, websocket, action: str, argument) -> Optional[float]:
+        """Perform one user action; returns its rerun latency, or None if it was not possible."""
+        if action == "open":
+            return self.rerun(websocket)
+        if action == "navigate":
+            return self.rerun(websocket) if self.set_string("Navigation", argument) else None
+        if action == "login":
+            self.set_string("Email", f"user{self.index}@example.com")
+            self.set_string("Password", "secret")
+            submit = self.trigger("Login")
+            if submit is None:
+                return None
+            elapsed = self.rerun(websocket, [submit])
+            if "Login successful!" not in self.alerts:
+                raise ScriptError(f"Login failed: {self.alerts}")
+            return elapsed
+        if action == "forum_page":
+            return self.rerun(websocket) if self.set_number("Page", argument) else None
+        raise ValueError(f"Unknown action {action}")
+
+
+class ProcessSampler(threading.Thread):
+    """Samples CPU utilisation and resident memory of a process from /proc."""
+
+    def __init__(self, pid: int, interval: float):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: list[dict] = []
+        self._stop_event = threading.Event()
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+
+    def _read(self) -> Optional[tuple[float, int]]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as stat:
+                fields = stat.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{self.pid}/statm") as statm:
+                resident_pages = int(statm.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return None
+        # utime and stime are fields 14 and 15 of /proc/<pid>/stat (11 and 12 after the name)
+        cpu_seconds = (int(fields[11]) + int(fields[12])) / self._ticks
+        return cpu_seconds, resident_pages * self._page_size
+
+    def run(self) -> None:
+        previous = self._read()
+        previous_time = time.monotonic()
+        while not self._stop_event.wait(self.interval):
+            current = self._read()
+            now = time.monotonic()
+            if current is None or previous is None:
+                break
+            self.samples.append({
+                "cpu_percent": round((current[0] - previous[0]) / (now - previous_time) * 100, 1),
+                "rss_bytes": current[1],
+            })
+            previous, previous_time = current, now
+
+    def stop(self) -> list[dict]:
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def run_user(url: str, index: int, deadline: float, think_time: float, timeout: float, results: list, lock) -> None:
+    """Run one user's journey until the deadline, appending (action, seconds, error) tuples."""
+    rng = random.Random(index)
+    user = VirtualUser(url, index, timeout)
+    journey = [("open", None)] + JOURNEY_START
+    step = 0
+    try:
+        with connect(url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout) as websocket:
+            while time.monotonic() < deadline:
+                if step < len(journey):
+                    action, argument = journey[step]
+                else:
+                    action, argument = JOURNEY_LOOP[(step - len(journey)) % len(JOURNEY_LOOP)]
+                step += 1
+                name = f"{action}:{argument}" if argument is not None else action
+                try:
+                    elapsed = user.act(websocket, action, argument)
+                    error = None
+                except ScriptError as e:
+                    elapsed, error = None, str(e)
+                if elapsed is not None or error is not None:
+                    with lock:
+                        results.append((name, elapsed, error))
+                if think_time:
+                    time.sleep(rng.uniform(0, 2 * think_time))
+    except Exception as e:
+        with lock:
+            results.append(("connection", None, f"{type(e).__name__}: {e}"))
+
+
+def run_step(url: str, backend: StubBackend, pid: int, users: int, args: argparse.Namespace) -> dict:
+    """Simulate a number of concurrent users for args.duration seconds."""
+    backend.reset_stats()
+    sampler = ProcessSampler(pid, args.sample_interval)
+    sampler.start()
+    results: list[tuple] = []
+    lock = threading.Lock()
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = [
+        threading.Thread(
+            target=run_user, args=(url, index, deadline, args.think_time, args.timeout, results, lock), daemon=True
+        )
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+        if args.ramp_up:
+            time.sleep(args.ramp_up / users)
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+    samples = sampler.stop()
+
+    latencies = [elapsed for _, elapsed, _ in results if elapsed is not None]
+    errors = [(name, error) for name, _, error in results if error is not None]
+    by_action: dict[str, list[float]] = {}
+    for name, elapsed, _ in results:
+        if elapsed is not None:
+            by_action.setdefault(name, []).append(elapsed)
+    actions = len(latencies)
+    cpu = [sample["cpu_percent"] for sample in samples]
+    rss = [sample["rss_bytes"] for sample in samples]
+    return {
+        "users": users,
+        "duration_seconds": round(wall, 2),
+        "actions": actions,
+        "throughput_actions_per_second": round(actions / wall, 2),
+        "rerun_p50_seconds": median(latencies) if latencies else None,
+        "rerun_p99_seconds": percentile(latencies, 99) if latencies else None,
+        "rerun_max_seconds": max(latencies) if latencies else None,
+        "by_action": {
+            name: {"count": len(values), "p50_seconds": median(values), "p99_seconds": percentile(values, 99)}
+            for name, values in sorted(by_action.items())
+        },
+        "backend_requests": backend.stats["requests"],
+        "backend_requests_per_action": round(backend.stats["requests"] / actions, 3) if actions else None,
+        "backend_requests_per_action_by_path": {
+            path: round(count / actions, 3) for path, count in sorted(backend.stats["by_path"].items())
+        } if actions else {},
+        "backend_bytes_per_action": round(backend.stats["bytes_sent"] / actions) if actions else None,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "cpu_percent_mean": round(mean(cpu), 1) if cpu else None,
+        "cpu_percent_max": max(cpu) if cpu else None,
+        "rss_bytes_start": rss[0] if rss else None,
+        "rss_bytes_max": max(rss) if rss else None,
+        "samples": samples,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(backend_url: str, port: int, timeout: float) -> subprocess.Popen:
+    """Start `streamlit run app.py` against the stub backend and wait until it is healthy."""
+    env = dict(
+        os.environ,
+        AUTH_SERVICE_URL=backend_url,
+        # The virtual users log in with example.com addresses; skip DNS lookups
+        EMAIL_VALIDATION_MODE="syntax",
+    )
+    # Make the package importable for `streamlit run` from a source checkout
+    source_dir = str(APP_PATH.parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [source_dir, env.get("PYTHONPATH")]))
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", str(APP_PATH),
+            "--server.headless=true",
+            "--server.address=127.0.0.1",
+            f"--server.port={port}",
+            "--browser.gatherUsageStats=false",
+        ],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {server.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).ok:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("streamlit did not become healthy in time")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 25, 50], help="Concurrent users per step")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per step")
+    parser.add_argument("--ramp-up", type=float, default=2, help="Seconds over which a step's users connect")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause between a user's actions in seconds")
+    parser.add_argument("--latency", type=float, default=0.02, help="Stub backend latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of backend requests answered with 500")
+    parser.add_argument("--posts", type=int, default=10_000, help="Forum size")
+    parser.add_argument("--meetings", type=int, default=500, help="Number of meetings")
+    parser.add_argument("--sample-interval", type=float, default=0.5, help="Seconds between CPU/memory samples")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for a rerun to finish")
+    parser.add_argument("--output", default="load_results.json", help="Where to write the JSON results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    backend = StubBackend(
+        latency=args.latency, post_count=args.posts, meeting_count=args.meetings, error_rate=args.error_rate
+    ).start()
+    port = free_port()
+    server = start_server(backend.url, port, args.timeout)
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+
+    steps = []
+    try:
+        for users in args.users:
+            result = run_step(url, backend, server.pid, users, args)
+            steps.append(result)
+            summary = {key: value for key, value in result.items() if key not in ("samples", "by_action")}
+            print(json.dumps(summary), file=sys.stderr)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        backend.stop()
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "steps": steps,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(steps)} steps to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
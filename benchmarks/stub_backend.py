@@ -0,0 +1,460 @@
+import base64
+import gzip
+import json
+import random
+import threading
+import time
+from collections import deque
+from bisect import bisect_right, insort
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    from backports import zstd
+except ImportError:
+    try:
+        from compression import zstd
+    except ImportError:
+        zstd = None
+
+"""
+Local stand-in for the auth/forum/meetings backend.
+
+Serves the endpoints the pages call (/forum, /forum/<id>, /forum/batch, /api/meetings,
+/api/login, /api/signup, /api/refresh) with configurable latency, data set size, post payload size
+and error rate, and counts requests and bytes sent so benchmarks can report backend
+amplification.
+
+Like a production API gateway, it answers with msgpack when the request's Accept header
+prefers it and compresses bodies of COMPRESS_MIN_BYTES or more with zstd or gzip as
+negotiated by Accept-Encoding (msgpack and zstd only when their packages are installed).
+
+With `delta`, GET /forum?updated_since=<cursor> answers with the posts created, updated
+or deleted (as {"id": ..., "deleted": true} tombstones) since the cursor and the next
+cursor; "0" returns every live post. Only the last `changelog_size` writes are kept, and
+older cursors get 410 Gone.
+
+Posts are generated on the fly from their id, so a forum with a million posts costs no
+memory until it is requested; only writes are stored.
+"""
+
+
+def make_token(subject: str = "bench-user", ttl_seconds: int = 3600) -> str:
+    """Return an unsigned JWT-shaped token that expires after ttl_seconds."""
+
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    claims = {"sub": subject, "exp": int(time.time()) + ttl_seconds}
+    return f"{encode({'alg': 'none', 'typ': 'JWT'})}.{encode(claims)}.stub"
+
+
+COMPRESS_MIN_BYTES = 1024
+
+
+def _accepts(header: Optional[str], value: str) -> bool:
+    """Whether a comma-separated Accept(-Encoding) header lists value with a non-zero q."""
+    for item in (header or "").split(","):
+        name, _, parameters = item.strip().partition(";")
+        if name.strip().lower() == value:
+            return parameters.replace(" ", "") not in ("q=0", "q=0.0")
+    return False
+
+
+class StubBackend:
+    """Threaded HTTP server emulating the backend service."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        post_count: int = 100,
+        meeting_count: int = 50,
+        content_size: int = 200,
+        error_rate: float = 0.0,
+        paginate: bool = True,
+        batch: bool = True,
+        compress: bool = True,
+        binary: bool = True,
+        delta: bool = True,
+        changelog_size: int = 1000,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.content_size = content_size
+        self.error_rate = error_rate
+        self.paginate = paginate
+        self.batch = batch
+        self.compress = compress
+        self.binary = binary
+        self.delta = delta
+        self.changelog_size = changelog_size
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.reset(post_count, meeting_count)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self, post_count: Optional[int] = None, meeting_count: Optional[int] = None) -> None:
+        """Reset the data set and the counters."""
+        with self._lock:
+            if post_count is not None:
+                self.post_count = post_count
+            if meeting_count is not None:
+                self.meeting_count = meeting_count
+            self._next_id = self.post_count + 1
+            self._deleted: list[int] = []
+            self._overrides: dict[int, dict] = {}
+            self._created_meetings: list[dict] = []
+            self.version = 1
+            # (version, post id) of recent writes; cursors below the floor have been trimmed
+            self._changelog: deque[tuple[int, int]] = deque()
+            self._changelog_floor = self.version
+            self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Reset request, error and byte counters."""
+        self.stats = {"requests": 0, "errors": 0, "not_modified": 0, "bytes_sent": 0, "by_path": {}}
+
+    def start(self) -> "StubBackend":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubBackend":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # Data set -----------------------------------------------------------------
+
+    def _post(self, post_id: int) -> dict:
+        if post_id in self._overrides:
+            return self._overrides[post_id]
+        created = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=post_id)
+        body = f"Content of post {post_id}. "
+        return {
+            "id": post_id,
+            "title": f"Post {post_id}",
+            "content": (body * (self.content_size // len(body) + 1))[: self.content_size],
+            "created_at": created.isoformat(),
+            "updated_at": created.isoformat(),
+        }
+
+    def _total_posts(self) -> int:
+        return self._next_id - 1 - len(self._deleted)
+
+    def _is_deleted(self, post_id: int) -> bool:
+        index = bisect_right(self._deleted, post_id)
+        return index > 0 and self._deleted[index - 1] == post_id
+
+    def _id_at(self, position: int) -> int:
+        """Return the id of the live post at a 0-based position."""
+        target = position + 1
+        post_id = target
+        while True:
+            live = post_id - bisect_right(self._deleted, post_id)
+            if live == target:
+                break
+            post_id += target - live
+        while self._is_deleted(post_id):
+            post_id -= 1
+        return post_id
+
+    def posts_page(self, offset: int, limit: int) -> list[dict]:
+        total = self._total_posts()
+        if offset >= total:
+            return []
+        posts = []
+        post_id = self._id_at(offset)
+        while len(posts) < limit and post_id < self._next_id:
+            if not self._is_deleted(post_id):
+                posts.append(self._post(post_id))
+            post_id += 1
+        return posts
+
+    def _live(self, post_id: int) -> bool:
+        return 0 < post_id < self._next_id and not self._is_deleted(post_id)
+
+    def _record_change(self, post_id: int) -> None:
+        """Bump the version for a write to post_id; the caller holds the lock."""
+        self.version += 1
+        self._changelog.append((self.version, post_id))
+        while len(self._changelog) > self.changelog_size:
+            self._changelog_floor = self._changelog.popleft()[0]
+
+    def changes_since(self, cursor: int) -> Optional[dict]:
+        """Return the posts written after cursor and the next cursor, or None if cursor was trimmed."""
+        with self._lock:
+            if cursor == 0:
+                return {"items": self.posts_page(0, self._total_posts()), "cursor": str(self.version)}
+            if cursor < self._changelog_floor or cursor > self.version:
+                return None
+            changed = sorted({post_id for version, post_id in self._changelog if version > cursor})
+            items = [self._post(post_id) if self._live(post_id) else {"id": post_id, "deleted": True} for post_id in changed]
+            return {"items": items, "cursor": str(self.version)}
+
+    def create_post(self, payload: dict) -> dict:
+        """Store a new post and return it."""
+        with self._lock:
+            post_id = self._next_id
+            self._next_id += 1
+            post = self._post(post_id)
+            post.update(title=payload.get("title", ""), content=payload.get("content", ""))
+            self._overrides[post_id] = post
+            self._record_change(post_id)
+            return post
+
+    def update_post(self, post_id: int, payload: dict) -> Optional[dict]:
+        """Apply an edit and return the updated post, or None when the post does not exist."""
+        with self._lock:
+            if not self._live(post_id):
+                return None
+            post = dict(self._post(post_id))
+            post.update(title=payload.get("title", ""), content=payload.get("content", ""))
+            post["updated_at"] = datetime.now(timezone.utc).isoformat()
+            self._overrides[post_id] = post
+            self._record_change(post_id)
+            return post
+
+    def delete_post(self, post_id: int) -> bool:
+        """Delete a post and return whether it existed."""
+        with self._lock:
+            if not self._live(post_id):
+                return False
+            insort(self._deleted, post_id)
+            self._overrides.pop(post_id, None)
+            self._record_change(post_id)
+            return True
+
+    def meetings(self) -> list[dict]:
+        start = datetime(2030, 1, 1, 9, 0)
+        generated = [
+            {
+                "id": i,
+                "time": (start + timedelta(hours=i)).isoformat(),
+                "location": f"Room {i % 20}",
+                "participants": [f"user{i % 50}@example.com"],
+            }
+            for i in range(1, self.meeting_count + 1)
+        ]
+        return generated + self._created_meetings
+
+    # HTTP ---------------------------------------------------------------------
+
+    def _handler_class(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _encode(self, data) -> tuple[bytes, dict]:
+                if backend.binary and msgpack is not None and _accepts(self.headers.get("Accept"), "application/msgpack"):
+                    body, headers = msgpack.packb(data), {"Content-Type": "application/msgpack"}
+                else:
+                    body, headers = json.dumps(data).encode(), {"Content-Type": "application/json"}
+                if backend.compress and len(body) >= COMPRESS_MIN_BYTES:
+                    accept_encoding = self.headers.get("Accept-Encoding")
+                    if zstd is not None and _accepts(accept_encoding, "zstd"):
+                        body, headers["Content-Encoding"] = zstd.compress(body), "zstd"
+                    elif _accepts(accept_encoding, "gzip"):
+                        body, headers["Content-Encoding"] = gzip.compress(body, compresslevel=6), "gzip"
+                headers["Vary"] = "Accept, Accept-Encoding"
+                return body, headers
+
+            def _send(self, status: int, data=None, headers: Optional[dict] = None) -> None:
+                body, encoding_headers = (b"", {"Content-Type": "application/json"}) if data is None else self._encode(data)
+                self.send_response(status)
+                for name, value in encoding_headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with backend._lock:
+                    backend.stats["bytes_sent"] += len(body)
+                    if status >= 500:
+                        backend.stats["errors"] += 1
+                    if status == 304:
+                        backend.stats["not_modified"] += 1
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _begin(self) -> Optional[tuple]:
+                url = urlparse(self.path)
+                with backend._lock:
+                    backend.stats["requests"] += 1
+                    by_path = backend.stats["by_path"]
+                    by_path[url.path] = by_path.get(url.path, 0) + 1
+                    fail = backend.error_rate and backend._random.random() < backend.error_rate
+                if backend.latency:
+                    time.sleep(backend.latency)
+                if fail:
+                    # Drain the body so the connection can be reused
+                    self._read_json() if self.command in ("POST", "PUT") else None
+                    self._send(500, {"error": "injected failure"})
+                    return None
+                query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                return url.path.rstrip("/"), query
+
+            def do_GET(self):
+                request = self._begin()
+                if request is None:
+                    return
+                path, query = request
+                if path == "/forum":
+                    self._get_forum(query)
+                elif path == "/api/meetings":
+                    self._get_meetings(query)
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def _get_meetings(self, query: dict) -> None:
+                with backend._lock:
+                    version = (backend.meeting_count, len(backend._created_meetings), tuple(sorted(query.items())))
+                    etag = f'"m{hash(version) & 0xFFFFFFFF:x}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, headers={"ETag": etag})
+                    return
+                meetings = backend.meetings()
+                if not backend.paginate:
+                    self._send(200, meetings, {"ETag": etag})
+                    return
+                start, end = query.get("start"), query.get("end")
+                window = [
+                    meeting for meeting in meetings
+                    if (not start or meeting["time"] >= start) and (not end or meeting["time"] < end)
+                ]
+                offset = int(query.get("offset", 0))
+                limit = int(query.get("limit", 0)) or len(window)
+                self._send(200, {"items": window[offset:offset + limit], "total": len(window)}, {"ETag": etag})
+
+            def _get_forum(self, query: dict) -> None:
+                cursor = query.get("updated_since")
+                if cursor is not None and backend.delta:
+                    if not cursor.isdigit():
+                        self._send(400, {"error": "invalid cursor"})
+                        return
+                    changes = backend.changes_since(int(cursor))
+                    if changes is None:
+                        self._send(410, {"error": "cursor expired"})
+                    else:
+                        self._send(200, changes)
+                    return
+                with backend._lock:
+                    offset = int(query.get("offset", 0))
+                    limit = int(query.get("limit", 0)) or backend._total_posts()
+                    etag = f'"{backend.version}-{offset}-{limit}-{int(backend.paginate)}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        not_modified = True
+                    else:
+                        not_modified = False
+                        total = backend._total_posts()
+                        if backend.paginate:
+                            data = {"items": backend.posts_page(offset, limit), "total": total}
+                        else:
+                            data = backend.posts_page(0, total)
+                if not_modified:
+                    self._send(304, headers={"ETag": etag})
+                else:
+                    self._send(200, data, {"ETag": etag})
+
+            def do_HEAD(self):
+                # Connection warm-up probes; answered without a body
+                if self._begin() is not None:
+                    self._send(204)
+
+            def do_POST(self):
+                request = self._begin()
+                if request is None:
+                    return
+                path, _ = request
+                payload = self._read_json()
+                if path == "/forum":
+                    self._send(201, backend.create_post(payload))
+                elif path == "/forum/batch" and backend.batch:
+                    self._batch(payload)
+                elif path == "/api/meetings":
+                    with backend._lock:
+                        meeting = dict(payload, id=backend.meeting_count + len(backend._created_meetings) + 1)
+                        backend._created_meetings.append(meeting)
+                    self._send(201, meeting)
+                elif path == "/api/login":
+                    self._send(200, {"token": make_token(payload.get("email", "bench-user"))})
+                elif path == "/api/refresh":
+                    self._send(200, {"token": make_token()})
+                elif path == "/api/signup":
+                    self._send(200, {"jwt_token": make_token(payload.get("email", "bench-user"))})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def _post_id(self, path: str) -> Optional[int]:
+                prefix, _, post_id = path.rpartition("/")
+                if prefix != "/forum" or not post_id.isdigit():
+                    return None
+                return int(post_id)
+
+            def _batch(self, payload: dict) -> None:
+                results = []
+                for operation in payload.get("operations", []):
+                    post_id = operation.get("id")
+                    if operation.get("op") == "delete":
+                        found = isinstance(post_id, int) and backend.delete_post(post_id)
+                        results.append({"id": post_id, "status": 204 if found else 404})
+                    elif operation.get("op") == "update":
+                        post = backend.update_post(post_id, operation) if isinstance(post_id, int) else None
+                        results.append({"id": post_id, "status": 200 if post else 404, "post": post})
+                    else:
+                        results.append({"id": post_id, "status": 400, "error": "unknown operation"})
+                self._send(200, {"results": results})
+
+            def do_PUT(self):
+                request = self._begin()
+                if request is None:
+                    return
+                path, _ = request
+                payload = self._read_json()
+                post_id = self._post_id(path)
+                post = backend.update_post(post_id, payload) if post_id is not None else None
+                if post is None:
+                    self._send(404, {"error": "not found"})
+                else:
+                    self._send(200, post)
+
+            def do_DELETE(self):
+                request = self._begin()
+                if request is None:
+                    return
+                path, _ = request
+                post_id = self._post_id(path)
+                if post_id is None or not backend.delete_post(post_id):
+                    self._send(404, {"error": "not found"})
+                else:
+                    self._send(204)
+
+        return Handler
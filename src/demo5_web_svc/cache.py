@@ -0,0 +1,258 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+from demo5_web_svc import config, loader, shared_cache
+
+"""
+TTL cache for backend reads.
+
+Streamlit reruns the page script on every widget interaction, so without a cache each
+keystroke in a form costs a full backend round trip. Entries are keyed by the user token
+and the query, so every session only sees data fetched with its own credentials.
+
+An entry is fresh for `ttl` seconds. For a further `stale_ttl` seconds it is still served
+while a single refresh on the shared loader pool replaces it (stale-while-revalidate).
+Writes invalidate the affected entries through `invalidate` or `patch`, which also bump
+`generation`: a load that started before a write is not stored after it, so users never
+see stale data after their own writes. Expired entries are kept until they are evicted or
+invalidated, so get_or_load can fall back to the last known value when the backend fails
+fast (for example while its circuit breaker is open).
+
+Namespaces registered with `share` are also written through to a shared_cache.SharedStore,
+which other processes on the host read on a miss. Their keys must be tuples of
+(namespace, token or None, *query); entries keep their age across processes, so the TTL
+counts from the original backend fetch.
+"""
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a time-to-live."""
+
+    def __init__(
+        self,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_entries: int = 1024,
+        shared: Optional[shared_cache.SharedStore] = None,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        # namespace -> (encode, decode) for entries written through to the shared store
+        self._codecs: dict[str, tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {}
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        # Bumped by every invalidate and patch; loads started under an older one are not stored
+        self.generation = 0
+
+    def get(self, key: Hashable) -> tuple[bool, Any, bool]:
+        """Look up a key.
+
+        Returns:
+            tuple: (found, value, stale). `stale` is True when the entry is past its TTL but
+            still inside the stale-while-revalidate window.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None, False
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age >= self.ttl + self.stale_ttl:
+                # Kept as a fallback for get_or_load; LRU eviction still bounds it
+                return False, None, False
+            self._entries.move_to_end(key)
+            return True, value, age >= self.ttl
+
+    def set(self, key: Hashable, value: Any, age: float = 0.0, generation: Optional[int] = None) -> None:
+        """Store a value that is `age` seconds old, evicting the least recently used entries when full.
+
+        With a generation (read before loading the value), the value is dropped if the
+        cache has been invalidated or patched since.
+        """
+        if self.ttl <= 0:
+            return
+        if self._store(key, value, age, generation):
+            self._save_shared(key, value, age)
+
+    def _store(self, key: Hashable, value: Any, age: float, generation: Optional[int] = None) -> bool:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._entries[key] = (time.monotonic() - age, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def share(self, namespace: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]) -> None:
+        """Write the entries of a namespace through to the shared store, if there is one."""
+        self._codecs[namespace] = (encode, decode)
+
+    def _shared_key(self, key: Hashable) -> Optional[tuple[str, str, str]]:
+        """Return the (namespace, scope, key) of an entry in the shared store, or None if it is not shared."""
+        if self.shared is None or not isinstance(key, tuple) or key[0] not in self._codecs:
+            return None
+        scope = self.shared.scope_for(key[1])
+        return None if scope is None else (key[0], scope, repr(key[2:]))
+
+    def _save_shared(self, key: Hashable, value: Any, age: float) -> None:
+        shared_key = self._shared_key(key)
+        if shared_key is not None:
+            try:
+                encoded = self._codecs[shared_key[0]][0](value)
+            except Exception as e:
+                logging.error(e, exc_info=True)
+                return
+            self.shared.put(*shared_key, encoded, age)
+
+    def _load_shared(self, key: Hashable) -> bool:
+        """Copy an entry from the shared store into memory; return whether there was one."""
+        shared_key = self._shared_key(key)
+        found = self.shared.get(*shared_key) if shared_key is not None else None
+        if found is None:
+            return False
+        age, encoded = found
+        try:
+            value = self._codecs[shared_key[0]][1](encoded)
+        except Exception as e:
+            # Written by an incompatible model version; refetch and overwrite it
+            logging.error(e, exc_info=True)
+            return False
+        self._store(key, value, age)
+        return True
+
+    def invalidate_shared(self, namespace: str) -> None:
+        """Retire a namespace's entries in the shared store, for every process and user."""
+        if self.shared is not None and namespace in self._codecs:
+            self.shared.invalidate(namespace)
+
+    def invalidate(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Remove every entry for which predicate(key, value) is true and return the count."""
+        with self._lock:
+            self.generation += 1
+            keys = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+            for key in keys:
+                del self._entries[key]
+        for key in keys:
+            shared_key = self._shared_key(key)
+            if shared_key is not None:
+                self.shared.delete(*shared_key)
+        return len(keys)
+
+    def patch(self, predicate: Callable[[Hashable, Any], bool], transform: Callable[[Hashable, Any], Any]) -> int:
+        """Replace the value of every entry matching predicate(key, value) with transform(key, value).
+
+        Patched entries keep their age, so they are still revalidated when their TTL runs out.
+        A transform returning None removes the entry. Returns the number of entries matched.
+        """
+        with self._lock:
+            self.generation += 1
+            matched = [(key, entry) for key, entry in self._entries.items() if predicate(key, entry[1])]
+            results = []
+            for key, (stored_at, value) in matched:
+                patched = transform(key, value)
+                if patched is None:
+                    del self._entries[key]
+                else:
+                    self._entries[key] = (stored_at, patched)
+                results.append((key, patched, time.monotonic() - stored_at))
+        for key, patched, age in results:
+            if patched is not None:
+                self._save_shared(key, patched, age)
+            elif self._shared_key(key) is not None:
+                self.shared.delete(*self._shared_key(key))
+        return len(matched)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        fallback_errors: tuple[type[BaseException], ...] = (),
+        max_age: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for key, calling loader() on a miss.
+
+        On a miss, an entry another process wrote to the shared store is used if it is
+        still within the TTL and stale window. A stale entry is returned immediately and
+        refreshed in a background thread.
+        Exceptions raised by loader() on a miss propagate to the caller, except those listed
+        in fallback_errors when an expired entry for the key is still held; that entry is
+        returned instead. With max_age, entries older than max_age seconds count as misses
+        (for callers that poll and must see changes sooner than the TTL).
+        """
+        found, value, stale = self.get(key)
+        if not found and self._load_shared(key):
+            found, value, stale = self.get(key)
+        if found and (max_age is None or self._age(key) < max_age):
+            if stale:
+                self._refresh_async(key, loader)
+            return value
+        generation = self.generation
+        try:
+            value = loader()
+        except fallback_errors as e:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is None:
+                raise
+            logging.warning("Serving expired cache entry for %r: %s", key, e)
+            return entry[1]
+        self.set(key, value, generation=generation)
+        return value
+
+    def _age(self, key: Hashable) -> float:
+        with self._lock:
+            entry = self._entries.get(key)
+        return float("inf") if entry is None else time.monotonic() - entry[0]
+
+    def _refresh_async(self, key: Hashable, load: Callable[[], Any]) -> Optional[Future]:
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+            generation = self.generation
+
+        def refresh():
+            try:
+                self.set(key, load(), generation=generation)
+            except Exception as e:
+                # Keep serving the stale value; the next miss will surface the error
+                logging.error(e, exc_info=True)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        return loader.submit(refresh)
+
+
+# Store shared with the other processes on this host, if configured
+shared_store = (
+    shared_cache.SharedStore(
+        config.SHARED_CACHE_PATH,
+        max_bytes=config.SHARED_CACHE_MAX_BYTES,
+        max_age=config.CACHE_TTL_SECONDS + config.CACHE_STALE_SECONDS,
+    )
+    if config.SHARED_CACHE_PATH
+    else None
+)
+
+# Shared cache for forum pages and meeting lists
+data_cache = TTLCache(
+    ttl=config.CACHE_TTL_SECONDS,
+    stale_ttl=config.CACHE_STALE_SECONDS,
+    max_entries=config.CACHE_MAX_ENTRIES,
+    shared=shared_store,
+)
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+import requests
+
+from demo5_web_svc import config
+
+"""
+Circuit breakers for the backend endpoint groups.
+
+When the backend is slow or down, every rerun would otherwise block on its requests and
+Streamlit script threads pile up. Each endpoint group (auth, forum, meetings) has one
+breaker shared by all sessions in the process. It opens when the failure rate over a
+sliding window crosses a threshold; while open, calls fail immediately with
+CircuitOpenError so pages can fall back to cached data. After a cool-down one probe call
+is let through (half-open): success closes the circuit, failure opens it again.
+"""
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an endpoint group whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding time window."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = config.CIRCUIT_FAILURE_RATE,
+        minimum_calls: int = config.CIRCUIT_MINIMUM_CALLS,
+        window_seconds: float = config.CIRCUIT_WINDOW_SECONDS,
+        open_seconds: float = config.CIRCUIT_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._calls: deque[tuple[float, bool]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Check whether a call may go ahead.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe already in flight.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and self._clock() - self._opened_at < self.open_seconds:
+                raise CircuitOpenError(f"Circuit '{self.name}' is open")
+            if self._probe_in_flight:
+                raise CircuitOpenError(f"Circuit '{self.name}' is half-open")
+            self._state = HALF_OPEN
+            self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._probe_in_flight = False
+                self._calls.clear()
+                return
+            self._record(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._open()
+                return
+            self._record(False)
+            failures = sum(1 for _, ok in self._calls if not ok)
+            if len(self._calls) >= self.minimum_calls and failures / len(self._calls) >= self.failure_rate:
+                self._open()
+
+    def _record(self, ok: bool) -> None:
+        now = self._clock()
+        self._calls.append((now, ok))
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self._calls.clear()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def group_for(path: str) -> str:
+    """Return the endpoint group of a backend path."""
+    path = "/" + path.lstrip("/")
+    if path.startswith("/forum"):
+        return "forum"
+    if path.startswith("/api/meetings"):
+        return "meetings"
+    return "auth"
+
+
+def get_breaker(group: str) -> CircuitBreaker:
+    """Return the process-wide breaker for an endpoint group."""
+    with _breakers_lock:
+        if group not in _breakers:
+            _breakers[group] = CircuitBreaker(group)
+        return _breakers[group]
+
+
+def states() -> dict[str, str]:
+    """Return the state of every breaker created so far."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+def reset() -> None:
+    """Forget all breakers (and their state)."""
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,35 @@
+import base64
+import binascii
+import json
+from typing import Optional
+
+"""
+Unverified JWT claims.
+
+The app script decides which navigation entries to show from the role claim of the
+session's token before any page is chosen, so this module only imports the standard
+library; the session module, with the backend client and caches it pulls in, is loaded
+by the pages that need it.
+"""
+
+TOKEN_KEY = "jwt_token"
+
+
+def decode_claims(token: str) -> dict:
+    """Return the claims of a JWT without verifying it, or {} if the token is not a JWT."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return claims if isinstance(claims, dict) else {}
+    except (IndexError, ValueError, binascii.Error, AttributeError):
+        return {}
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Return True if the token carries an admin role claim."""
+    if not token:
+        return False
+    claims = decode_claims(token)
+    roles = claims.get("roles") or []
+    return claims.get("role") == "admin" or claims.get("is_admin") is True or (isinstance(roles, list) and "admin" in roles)
@@ -3,8 +3,91 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# The demo5_web_svc entry point starts SERVICE_WORKERS Streamlit processes on SERVICE_HOST,
+# listening on consecutive ports from SERVICE_PORT
 SERVICE_HOST = os.getenv("SERVICE_HOST", "0.0.0.0")
-SERVICE_PORT = os.getenv("SERVICE_PORT", 8000)
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", 8000))
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", 1))
 
 # Added AUTH_SERVICE_URL to avoid hardcoded auth-service URL in login page
 AUTH_SERVICE_URL = os.getenv("AUTH_SERVICE_URL", "http://localhost:8081")
+
+# Connection pool and timeout settings for the shared backend HTTP client
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 4))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 32))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+# Keep-alive connections each worker opens to the backend before it accepts traffic
+HTTP_WARM_CONNECTIONS = int(os.getenv("HTTP_WARM_CONNECTIONS", 2))
+
+# Read cache for forum posts and meetings. Entries are fresh for CACHE_TTL_SECONDS and are
+# then served stale (while being refreshed in the background) for CACHE_STALE_SECONDS more.
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 30))
+CACHE_STALE_SECONDS = float(os.getenv("CACHE_STALE_SECONDS", 60))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+
+# With SHARED_CACHE_PATH set, cached forum pages and meeting lists are also kept in a SQLite
+# database shared by every process on the host (keep it on local disk, readable only by the
+# service user). Its values are bounded to SHARED_CACHE_MAX_BYTES, least recently read first.
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", "")
+SHARED_CACHE_MAX_BYTES = int(os.getenv("SHARED_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Worker threads shared by all sessions for concurrent backend fetches
+LOADER_MAX_WORKERS = int(os.getenv("LOADER_MAX_WORKERS", 8))
+
+# Email validation: "deliverability" checks each domain's DNS records (cached per domain),
+# "syntax" only checks the address format and never touches the network.
+EMAIL_VALIDATION_MODE = os.getenv("EMAIL_VALIDATION_MODE", "deliverability")
+EMAIL_DNS_TIMEOUT = int(os.getenv("EMAIL_DNS_TIMEOUT", 5))
+EMAIL_DNS_CACHE_TTL_SECONDS = float(os.getenv("EMAIL_DNS_CACHE_TTL_SECONDS", 3600))
+EMAIL_DNS_CACHE_MAX_ENTRIES = int(os.getenv("EMAIL_DNS_CACHE_MAX_ENTRIES", 4096))
+
+# JWT handling: tokens are refreshed this many seconds before they expire, and treated as
+# expired this many seconds early to allow for clock skew with the auth-service.
+JWT_REFRESH_WINDOW_SECONDS = float(os.getenv("JWT_REFRESH_WINDOW_SECONDS", 60))
+JWT_EXPIRY_LEEWAY_SECONDS = float(os.getenv("JWT_EXPIRY_LEEWAY_SECONDS", 5))
+
+# Idempotent backend requests are retried this many times on connection errors
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 1))
+
+# Metrics are served in Prometheus text format on METRICS_PORT (0 disables the endpoint)
+# and/or written to METRICS_FILE every METRICS_FILE_INTERVAL_SECONDS.
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+METRICS_FILE_INTERVAL_SECONDS = float(os.getenv("METRICS_FILE_INTERVAL_SECONDS", 15))
+
+# Circuit breaker per backend endpoint group (auth, forum, meetings): the circuit opens when
+# at least CIRCUIT_MINIMUM_CALLS calls in the last CIRCUIT_WINDOW_SECONDS failed at a rate of
+# CIRCUIT_FAILURE_RATE or more, and a probe call is let through after CIRCUIT_OPEN_SECONDS.
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", 0.5))
+CIRCUIT_MINIMUM_CALLS = int(os.getenv("CIRCUIT_MINIMUM_CALLS", 5))
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", 30))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", 15))
+
+# Set to 1 to show forum writes immediately (marked as saving) and confirm them with the
+# backend in the background, instead of waiting for the backend before showing a write
+FORUM_OPTIMISTIC_WRITES = os.getenv("FORUM_OPTIMISTIC_WRITES", "0") == "1"
+
+# The meetings list refreshes itself every MEETINGS_REFRESH_SECONDS (0 disables auto-refresh)
+MEETINGS_REFRESH_SECONDS = float(os.getenv("MEETINGS_REFRESH_SECONDS", 30))
+
+# Backend responses are requested compressed (gzip/deflate, plus zstd when backports.zstd is
+# installed), and list reads as msgpack when the msgpack package is installed; JSON is always
+# accepted as the fallback. Set either to 0 to compare against plain JSON.
+HTTP_COMPRESSION = os.getenv("HTTP_COMPRESSION", "1") == "1"
+HTTP_BINARY_PAYLOADS = os.getenv("HTTP_BINARY_PAYLOADS", "1") == "1"
+
+# Search indexes are kept per user (at most SEARCH_MAX_INDEXES, least recently used dropped
+# first). With FORUM_DELTA_SYNC they pick up other writers' changes every
+# SEARCH_REFRESH_SECONDS; without it, by a full rebuild every SEARCH_REBUILD_SECONDS.
+SEARCH_MAX_INDEXES = int(os.getenv("SEARCH_MAX_INDEXES", 16))
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", 60))
+SEARCH_REBUILD_SECONDS = float(os.getenv("SEARCH_REBUILD_SECONDS", 3600))
+
+# Forum pages are served from a local copy of all posts that is synced with the backend at
+# most every FORUM_SYNC_SECONDS, fetching only the posts changed since the last sync. Copies
+# are kept per user, at most FORUM_SYNC_MAX_SCOPES of them.
+FORUM_DELTA_SYNC = os.getenv("FORUM_DELTA_SYNC", "0") == "1"
+FORUM_SYNC_SECONDS = float(os.getenv("FORUM_SYNC_SECONDS", 5))
+FORUM_SYNC_MAX_SCOPES = int(os.getenv("FORUM_SYNC_MAX_SCOPES", 16))
@@ -0,0 +1,312 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from demo5_web_svc import cache, circuit_breaker, config, loader, metrics, payloads, singleflight
+
+"""
+Shared HTTP client for all backend calls.
+
+Streamlit reruns the page script on every interaction, so issuing one-off
+requests.get/post calls opens a new TCP (and TLS) connection each time. This module
+keeps a single process-wide requests.Session whose connection pool is reused by every
+page and every session, resolves the backend base URL once from config.AUTH_SERVICE_URL
+and applies a default timeout to every call. Every call is recorded in the metrics module
+(latency, status, payload sizes and retries per endpoint). Calls go through the circuit
+breaker of their endpoint group, so a failing backend is not called again until it has
+had time to recover. warm_up opens pooled connections before a worker accepts traffic.
+
+List endpoints are read through get_json, which remembers the ETag/Last-Modified
+validators of each response together with its parsed body and revalidates with
+If-None-Match/If-Modified-Since, so an unchanged list is neither re-sent nor re-decoded.
+Bodies are requested compressed, and as msgpack where available, and decoded in whatever
+format the backend chose (see the payloads module). Identical get_json calls that overlap
+in time (same path, query and Authorization header, typically from concurrent sessions)
+share one backend call and one parsed result, unless a write invalidated the read cache
+in between.
+"""
+
+BASE_URL = config.AUTH_SERVICE_URL.rstrip("/")
+DEFAULT_TIMEOUT = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# (path, params, authorization) -> (etag, last_modified, body size, parsed body)
+_validators: OrderedDict[tuple, tuple[Optional[str], Optional[str], int, Any]] = OrderedDict()
+_validators_lock = threading.Lock()
+_conditional_stats = {"hits": 0, "misses": 0, "bytes_saved": 0}
+_flights = singleflight.Group()
+
+
+def build_url(path: str) -> str:
+    """Return the absolute backend URL for the given path."""
+    return f"{BASE_URL}/{path.lstrip('/')}"
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # pool_connections is the number of hosts kept in the pool manager,
+                # pool_maxsize the number of keep-alive connections kept per host.
+                adapter = HTTPAdapter(
+                    pool_connections=config.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=config.HTTP_POOL_MAXSIZE,
+                    # Only connection failures of idempotent requests are retried
+                    max_retries=Retry(
+                        total=config.HTTP_MAX_RETRIES,
+                        read=0,
+                        status=0,
+                        other=0,
+                        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                        raise_on_status=False,
+                    ),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Connection": "keep-alive", "Accept-Encoding": payloads.accept_encoding()})
+                _session = session
+    return _session
+
+
+def warm_up(connections: int = config.HTTP_WARM_CONNECTIONS) -> int:
+    """Open pooled keep-alive connections to the backend ahead of traffic.
+
+    Sends `connections` concurrent HEAD requests for the base URL, bypassing the circuit
+    breakers and metrics; any answer will do, since only the connection is wanted.
+
+    Returns:
+        int: The number of connections opened.
+    """
+    session = get_session()
+
+    def probe() -> None:
+        session.head(build_url("/"), timeout=DEFAULT_TIMEOUT).close()
+
+    futures = [loader.submit(probe) for _ in range(min(connections, config.HTTP_POOL_MAXSIZE))]
+    return sum(loader.join(future)[0] for future in futures)
+
+
+def close_session() -> None:
+    """Close the process-wide session and release its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def request(method: str, path: str, **kwargs) -> requests.Response:
+    """Send a request to the backend through the pooled session.
+
+    Args:
+        method (str): HTTP method
+        path (str): Path relative to the backend base URL
+        **kwargs: Extra arguments passed on to requests.Session.request
+
+    Returns:
+        requests.Response: The backend response
+
+    Raises:
+        circuit_breaker.CircuitOpenError: If the circuit of the endpoint group is open.
+        requests.RequestException: If the request itself fails.
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    breaker = circuit_breaker.get_breaker(circuit_breaker.group_for(path))
+    try:
+        breaker.before_call()
+    except circuit_breaker.CircuitOpenError:
+        metrics.record_request(method, path, "circuit_open", 0.0)
+        raise
+    started = time.perf_counter()
+    try:
+        response = get_session().request(method, build_url(path), **kwargs)
+    except requests.RequestException:
+        breaker.record_failure()
+        metrics.record_request(method, path, "error", time.perf_counter() - started)
+        raise
+    # Server errors count against the circuit; client errors are the caller's problem
+    if response.status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    metrics.record_request(
+        method,
+        path,
+        response.status_code,
+        time.perf_counter() - started,
+        request_bytes=_request_size(response),
+        response_bytes=_response_size(response, kwargs.get("stream", False)),
+        retries=_retry_count(response),
+    )
+    return response
+
+
+def _request_size(response: requests.Response) -> int:
+    body = response.request.body if response.request is not None else None
+    return len(body) if body else 0
+
+
+def _response_size(response: requests.Response, streamed: bool) -> int:
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit():
+        return int(length)
+    # Reading .content of a streamed response would consume it before the caller can
+    return 0 if streamed else len(response.content)
+
+
+def _retry_count(response: requests.Response) -> int:
+    retries = getattr(response.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+def get(path: str, **kwargs) -> requests.Response:
+    """Send a GET request to the backend."""
+    return request("GET", path, **kwargs)
+
+
+def post(path: str, **kwargs) -> requests.Response:
+    """Send a POST request to the backend."""
+    return request("POST", path, **kwargs)
+
+
+def put(path: str, **kwargs) -> requests.Response:
+    """Send a PUT request to the backend."""
+    return request("PUT", path, **kwargs)
+
+
+def delete(path: str, **kwargs) -> requests.Response:
+    """Send a DELETE request to the backend."""
+    return request("DELETE", path, **kwargs)
+
+
+def _validator_key(path: str, headers: Optional[dict], params: Optional[dict]) -> tuple:
+    authorization = (headers or {}).get("Authorization")
+    return path, tuple(sorted((params or {}).items())), authorization
+
+
+def get_json(
+    path: str,
+    headers: Optional[dict] = None,
+    params: Optional[dict] = None,
+    parse: Optional[Callable[[requests.Response], Any]] = None,
+    loads: Optional[Callable[[bytes], Any]] = None,
+    **kwargs,
+) -> Any:
+    """GET a list resource, revalidating a previously parsed body with conditional headers.
+
+    On a 304 Not Modified the body parsed from the earlier 200 response is returned as-is
+    (callers must treat it as read-only). Validators are kept per path, query and
+    Authorization header so users never share a revalidated body. For the same reason,
+    concurrent identical calls are coalesced into one backend call only when their
+    Authorization headers match and no cache invalidation happened between them; parse
+    must depend on nothing but the path and query.
+
+    Args:
+        path (str): Path relative to the backend base URL
+        headers (dict, optional): Request headers
+        params (dict, optional): Query parameters
+        parse (Callable, optional): Reads the body of a 200 response instead of
+            payloads.decode. When given, the request is streamed so parse can consume
+            response.iter_content incrementally.
+        loads (Callable, optional): Decodes a whole JSON body from its bytes; passed on to
+            payloads.decode when parse is not given.
+
+    Raises:
+        requests.HTTPError: If the backend answers with anything but 200 or 304.
+    """
+    key = _validator_key(path, headers, params)
+    # A call issued after a write must not join one that started before it
+    flight = (key, cache.data_cache.generation)
+    data, shared = _flights.do(flight, lambda: _get_json(key, path, headers, params, parse, loads, **kwargs))
+    if shared:
+        metrics.record_coalesced("GET", path)
+    return data
+
+
+def _get_json(
+    key: tuple,
+    path: str,
+    headers: Optional[dict],
+    params: Optional[dict],
+    parse: Optional[Callable[[requests.Response], Any]],
+    loads: Optional[Callable[[bytes], Any]],
+    **kwargs,
+) -> Any:
+    with _validators_lock:
+        known = _validators.get(key)
+    request_headers = {"Accept": payloads.accept(), **(headers or {})}
+    if known is not None:
+        etag, last_modified, _, _ = known
+        if etag:
+            request_headers["If-None-Match"] = etag
+        if last_modified:
+            request_headers["If-Modified-Since"] = last_modified
+
+    if parse is not None:
+        kwargs["stream"] = True
+    response = get(path, headers=request_headers, params=params, **kwargs)
+    try:
+        if response.status_code == 304 and known is not None:
+            with _validators_lock:
+                _conditional_stats["hits"] += 1
+                _conditional_stats["bytes_saved"] += known[2]
+                if key in _validators:
+                    _validators.move_to_end(key)
+            return known[3]
+        if response.status_code != 200:
+            raise requests.HTTPError(f"HTTP {response.status_code} Error", response=response)
+        data = payloads.decode(response, loads=loads) if parse is None else parse(response)
+    finally:
+        if parse is not None:
+            # Release the pooled connection even if the body was not fully read
+            response.close()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    with _validators_lock:
+        _conditional_stats["misses"] += 1
+        if etag or last_modified:
+            size = response.headers.get("Content-Length")
+            size = int(size) if size else (0 if parse is not None else len(response.content))
+            _validators[key] = (etag, last_modified, size, data)
+            _validators.move_to_end(key)
+            while len(_validators) > config.CACHE_MAX_ENTRIES:
+                _validators.popitem(last=False)
+        else:
+            _validators.pop(key, None)
+    return data
+
+
+def get_conditional_stats() -> dict:
+    """Return conditional GET counters.
+
+    Returns:
+        dict: "hits" (304 responses served from the parsed body), "misses" (full
+        responses) and "bytes_saved" (body bytes not re-sent thanks to 304s).
+    """
+    with _validators_lock:
+        return dict(_conditional_stats)
+
+
+def get_coalescing_stats() -> dict:
+    """Return the number of get_json backend calls and of calls that shared one in flight."""
+    return _flights.stats()
+
+
+def clear_validators() -> None:
+    """Forget all stored validators and reset the conditional GET and coalescing counters."""
+    with _validators_lock:
+        _validators.clear()
+        for name in _conditional_stats:
+            _conditional_stats[name] = 0
+    _flights.reset_stats()
@@ -0,0 +1,48 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from demo5_web_svc import config
+
+"""
+Concurrent data loader.
+
+Pages run on the Streamlit script thread, so fetching several resources one after the
+other costs the sum of their latencies. This module owns a bounded, process-wide thread
+pool that pages use to issue independent backend fetches in parallel (or in the
+background) and join the results before rendering.
+
+Tasks run outside the Streamlit script thread and must not call Streamlit APIs; they
+should raise on failure and leave rendering of errors to the page.
+"""
+
+_executor = ThreadPoolExecutor(max_workers=config.LOADER_MAX_WORKERS, thread_name_prefix="loader")
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """Schedule fn(*args, **kwargs) on the shared pool and return its future."""
+    return _executor.submit(fn, *args, **kwargs)
+
+
+def join(future: Future, timeout: Optional[float] = None) -> tuple[bool, Any]:
+    """Wait for a future and return (True, result) or (False, exception)."""
+    try:
+        return True, future.result(timeout=timeout)
+    except Exception as e:
+        logging.error(e, exc_info=True)
+        return False, e
+
+
+def load_all(tasks: dict[str, Callable[[], Any]], timeout: Optional[float] = None) -> dict[str, tuple[bool, Any]]:
+    """Run independent fetches concurrently and wait for all of them.
+
+    Args:
+        tasks (dict): Mapping of a name to a callable taking no arguments.
+        timeout (float, optional): Maximum seconds to wait for each task.
+
+    Returns:
+        dict: For each name, (True, result) on success or (False, exception) on failure.
+        One failing task never hides the results of the others.
+    """
+    futures = {name: submit(task) for name, task in tasks.items()}
+    return {name: join(future, timeout) for name, future in futures.items()}
@@ -0,0 +1,227 @@
+import argparse
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from demo5_web_svc import config
+
+"""
+Service entry point (the demo5_web_svc console script).
+
+Streamlit serves every session of a process from one Python interpreter, so a single
+process uses a single core for page scripts. `demo5_web_svc` starts config.SERVICE_WORKERS
+Streamlit processes on config.SERVICE_HOST, listening on consecutive ports from
+config.SERVICE_PORT, behind whatever load balancer the host uses. That balancer must keep
+each browser session on one worker, since Streamlit session state lives in its process.
+Set config.SHARED_CACHE_PATH so the workers share cached pages.
+
+Each worker imports the page modules and opens backend connections before its Streamlit
+server starts listening, so its first sessions do not pay for them. The supervisor
+reports how long each worker took until its health check passed, and restarts workers
+that exit, backing off when they keep failing. SIGINT and SIGTERM stop all workers.
+
+Options not recognised here are passed on to `streamlit run`, e.g.
+`demo5_web_svc --workers 4 --server.maxUploadSize 10`.
+"""
+
+APP_PATH = Path(__file__).with_name("app.py")
+# The package's parent directory, so workers import this copy of the package
+SOURCE_DIR = str(Path(__file__).resolve().parent.parent)
+
+POLL_SECONDS = 0.5
+STOP_TIMEOUT_SECONDS = 10.0
+RESTART_DELAY_SECONDS = 1.0
+MAX_RESTART_DELAY_SECONDS = 30.0
+# A worker that ran this long before exiting restarts without backoff
+STABLE_SECONDS = 60.0
+
+
+def _probe_host(host: str) -> str:
+    """Return the address to health-check a server bound to host."""
+    return {"0.0.0.0": "127.0.0.1", "::": "::1", "": "127.0.0.1"}.get(host, host)
+
+
+class Worker:
+    """A Streamlit worker process on one port, restarted by the Supervisor when it exits."""
+
+    def __init__(self, index: int, host: str, port: int, streamlit_args: Optional[list[str]] = None):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.streamlit_args = streamlit_args or []
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.ready = False
+        self.restarts = 0
+        self.failures = 0
+        self.restart_at: Optional[float] = None
+
+    def command(self) -> list[str]:
+        return [
+            sys.executable, "-m", "demo5_web_svc.main", "--worker",
+            "--host", self.host, "--port", str(self.port), *self.streamlit_args,
+        ]
+
+    def env(self) -> dict[str, str]:
+        """Return the worker's environment; per-process metrics exporters get their own port and file."""
+        env = dict(os.environ, SERVICE_HOST=self.host, SERVICE_PORT=str(self.port))
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [SOURCE_DIR, env.get("PYTHONPATH")]))
+        if config.METRICS_PORT:
+            env["METRICS_PORT"] = str(config.METRICS_PORT + self.index)
+        if config.METRICS_FILE:
+            env["METRICS_FILE"] = f"{config.METRICS_FILE}.{self.index}"
+        return env
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(self.command(), env=self.env())
+        self.started_at = time.monotonic()
+        self.ready = False
+        self.restart_at = None
+
+    def is_healthy(self) -> bool:
+        try:
+            return requests.get(f"http://{_probe_host(self.host)}:{self.port}/_stcore/health", timeout=1).ok
+        except requests.RequestException:
+            return False
+
+    def stop(self) -> None:
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+
+class Supervisor:
+    """Starts the workers, reports when they are ready and restarts the ones that exit."""
+
+    def __init__(self, workers: list[Worker]):
+        self.workers = workers
+        self.started_at = 0.0
+        self.all_ready = False
+        self.stopping = False
+
+    def start(self) -> None:
+        self.started_at = time.monotonic()
+        for worker in self.workers:
+            worker.start()
+            logging.info("Started worker %d (pid %d) on port %d", worker.index, worker.process.pid, worker.port)
+
+    def poll(self) -> None:
+        """Check every worker once: report readiness and restart exited workers when due."""
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.restart_at is not None:
+                if now >= worker.restart_at:
+                    worker.restarts += 1
+                    worker.start()
+                    logging.info("Restarted worker %d (pid %d) on port %d", worker.index, worker.process.pid, worker.port)
+                continue
+            status = worker.process.poll()
+            if status is not None:
+                ran = now - worker.started_at
+                worker.failures = 0 if ran >= STABLE_SECONDS else worker.failures + 1
+                delay = min(MAX_RESTART_DELAY_SECONDS, RESTART_DELAY_SECONDS * 2 ** max(0, worker.failures - 1))
+                worker.ready = False
+                worker.restart_at = now + delay
+                logging.error(
+                    "Worker %d on port %d exited with status %d after %.1fs; restarting in %.1fs",
+                    worker.index, worker.port, status, ran, delay,
+                )
+            elif not worker.ready and worker.is_healthy():
+                worker.ready = True
+                logging.info("Worker %d ready on port %d in %.2fs", worker.index, worker.port, now - worker.started_at)
+        if not self.all_ready and all(worker.ready for worker in self.workers):
+            self.all_ready = True
+            logging.info("All %d workers ready in %.2fs", len(self.workers), time.monotonic() - self.started_at)
+
+    def run(self) -> None:
+        """Supervise the workers until stop() is called."""
+        self.start()
+        try:
+            while not self.stopping:
+                self.poll()
+                time.sleep(POLL_SECONDS)
+        finally:
+            self.shutdown()
+
+    def stop(self, *_) -> None:
+        self.stopping = True
+
+    def shutdown(self) -> None:
+        """Terminate the workers, killing those still running after STOP_TIMEOUT_SECONDS."""
+        for worker in self.workers:
+            worker.stop()
+        deadline = time.monotonic() + STOP_TIMEOUT_SECONDS
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            try:
+                worker.process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                worker.process.kill()
+                worker.process.wait()
+
+
+def warm_worker() -> None:
+    """Import the pages and open backend connections, logging how long each took."""
+    from demo5_web_svc import http_client, page_registry
+
+    started = time.perf_counter()
+    pages = page_registry.warm_pages()
+    pages_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    connections = http_client.warm_up()
+    logging.info(
+        "Warmed %d pages in %.2fs and %d backend connections in %.2fs",
+        len(pages), pages_seconds, connections, time.perf_counter() - started,
+    )
+
+
+def run_worker(host: str, port: int, streamlit_args: list[str]) -> int:
+    """Warm this process, then serve the app with Streamlit in it."""
+    from streamlit.web import cli
+
+    warm_worker()
+    return cli.main(
+        [
+            "run", str(APP_PATH),
+            "--server.headless=true",
+            f"--server.address={host}",
+            f"--server.port={port}",
+            *streamlit_args,
+        ],
+        prog_name="streamlit",
+    )
+
+
+def parse_args(argv=None) -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=config.SERVICE_WORKERS, help="Number of Streamlit processes")
+    parser.add_argument("--host", default=config.SERVICE_HOST, help="Address the workers listen on")
+    parser.add_argument("--port", type=int, default=config.SERVICE_PORT, help="Port of the first worker")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_known_args(argv)
+
+
+def main(argv=None) -> int:
+    args, streamlit_args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.worker:
+        return run_worker(args.host, args.port, streamlit_args)
+
+    supervisor = Supervisor([
+        Worker(index, args.host, args.port + index, streamlit_args) for index in range(max(1, args.workers))
+    ])
+    signal.signal(signal.SIGINT, supervisor.stop)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    supervisor.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from demo5_web_svc import config
+
+"""
+Backend call and page render metrics.
+
+http_client records latency, status code, request/response payload size and retry count
+for every backend call, the number of reads coalesced into another session's call, and
+the decode time and wire/decoded size of list bodies per format, grouped by endpoint
+(method plus path with numeric ids replaced by {id}). The page registry records the
+render time of every navigation entry. Metrics are exported in Prometheus text format on
+a local port and/or to a file, and recent samples are kept so the admin metrics page can
+show p50/p95/p99 per endpoint.
+"""
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+RECENT_SAMPLES = 1024
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+class Histogram:
+    """Cumulative latency histogram with a window of recent samples for percentiles."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds: float) -> None:
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Return the pct-th percentile (0-100) of the recent samples."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+_lock = threading.Lock()
+_request_latency: dict[str, Histogram] = defaultdict(Histogram)
+_request_status: dict[tuple[str, str], int] = defaultdict(int)
+_request_bytes: dict[str, int] = defaultdict(int)
+_response_bytes: dict[str, int] = defaultdict(int)
+_retries: dict[str, int] = defaultdict(int)
+_coalesced: dict[str, int] = defaultdict(int)
+_decode_latency: dict[str, Histogram] = defaultdict(Histogram)
+# (endpoint, format) -> [responses, wire bytes, decoded bytes]
+_payloads: dict[tuple[str, str], list[int]] = defaultdict(lambda: [0, 0, 0])
+_page_render: dict[str, Histogram] = defaultdict(Histogram)
+
+_exporters_started = False
+_exporter_lock = threading.Lock()
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Return the metrics label for a request, e.g. 'PUT /forum/{id}'."""
+    path = "/" + path.split("?", 1)[0].strip("/")
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+def record_request(
+    method: str,
+    path: str,
+    status: str,
+    seconds: float,
+    request_bytes: int = 0,
+    response_bytes: int = 0,
+    retries: int = 0,
+) -> None:
+    """Record one backend call. `status` is the HTTP status code, 'error' or 'circuit_open'."""
+    endpoint = endpoint_name(method, path)
+    with _lock:
+        _request_latency[endpoint].observe(seconds)
+        _request_status[(endpoint, str(status))] += 1
+        _request_bytes[endpoint] += request_bytes
+        _response_bytes[endpoint] += response_bytes
+        _retries[endpoint] += retries
+
+
+def record_coalesced(method: str, path: str) -> None:
+    """Record a read that shared an identical in-flight backend call instead of making one."""
+    with _lock:
+        _coalesced[endpoint_name(method, path)] += 1
+
+
+def record_payload(
+    method: str, path: str, payload_format: str, seconds: float, wire_bytes: int, body_bytes: int
+) -> None:
+    """Record the decode of one response body.
+
+    `payload_format` is the body format and content encoding, e.g. 'msgpack+gzip';
+    `wire_bytes` is the size as received and `body_bytes` the size after decompression.
+    """
+    endpoint = endpoint_name(method, path)
+    with _lock:
+        _decode_latency[endpoint].observe(seconds)
+        totals = _payloads[(endpoint, payload_format)]
+        totals[0] += 1
+        totals[1] += wire_bytes
+        totals[2] += body_bytes
+
+
+def record_page_render(page: str, seconds: float) -> None:
+    """Record how long a whole page render took."""
+    with _lock:
+        _page_render[page].observe(seconds)
+
+
+def reset() -> None:
+    """Forget all recorded metrics."""
+    with _lock:
+        for store in (
+            _request_latency,
+            _request_status,
+            _request_bytes,
+            _response_bytes,
+            _retries,
+            _coalesced,
+            _decode_latency,
+            _payloads,
+            _page_render,
+        ):
+            store.clear()
+
+
+def endpoint_summary() -> list[dict]:
+    """Return per-endpoint counts, percentiles, payload sizes and retries."""
+    with _lock:
+        rows = []
+        for endpoint, histogram in sorted(_request_latency.items()):
+            statuses = {status: count for (name, status), count in _request_status.items() if name == endpoint}
+            rows.append({
+                "endpoint": endpoint,
+                "requests": histogram.count,
+                "p50_ms": _milliseconds(histogram.percentile(50)),
+                "p95_ms": _milliseconds(histogram.percentile(95)),
+                "p99_ms": _milliseconds(histogram.percentile(99)),
+                "statuses": ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())),
+                "response_bytes": _response_bytes[endpoint],
+                "retries": _retries[endpoint],
+                "coalesced": _coalesced.get(endpoint, 0),
+            })
+        return rows
+
+
+def payload_summary() -> list[dict]:
+    """Return per-endpoint and format response counts, body sizes and decode percentiles."""
+    with _lock:
+        rows = []
+        for (endpoint, payload_format), (responses, wire_bytes, body_bytes) in sorted(_payloads.items()):
+            histogram = _decode_latency[endpoint]
+            rows.append({
+                "endpoint": endpoint,
+                "format": payload_format,
+                "responses": responses,
+                "wire_bytes": wire_bytes,
+                "decoded_bytes": body_bytes,
+                "bytes_saved": body_bytes - wire_bytes,
+                "decode_p50_ms": _milliseconds(histogram.percentile(50)),
+                "decode_p99_ms": _milliseconds(histogram.percentile(99)),
+            })
+        return rows
+
+
+def page_summary() -> list[dict]:
+    """Return per-page render counts and percentiles."""
+    with _lock:
+        return [
+            {
+                "page": page,
+                "renders": histogram.count,
+                "p50_ms": _milliseconds(histogram.percentile(50)),
+                "p95_ms": _milliseconds(histogram.percentile(95)),
+                "p99_ms": _milliseconds(histogram.percentile(99)),
+            }
+            for page, histogram in sorted(_page_render.items())
+        ]
+
+
+def _milliseconds(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, label: str, histograms: dict[str, Histogram]) -> list[str]:
+    lines = [f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        labels = f'{label}="{_label(key)}"'
+        for bound, count in zip(LATENCY_BUCKETS, histogram.bucket_counts):
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def _counter_lines(name: str, values: dict[str, int]) -> list[str]:
+    lines = [f"# TYPE {name} counter"]
+    for endpoint, value in sorted(values.items()):
+        lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {value}')
+    return lines
+
+
+def render_prometheus() -> str:
+    """Return all metrics in Prometheus text exposition format."""
+    with _lock:
+        lines = _histogram_lines("demo5_backend_request_duration_seconds", "endpoint", _request_latency)
+        lines.append("# TYPE demo5_backend_requests_total counter")
+        for (endpoint, status), count in sorted(_request_status.items()):
+            lines.append(f'demo5_backend_requests_total{{endpoint="{_label(endpoint)}",status="{status}"}} {count}')
+        lines += _counter_lines("demo5_backend_request_bytes_total", _request_bytes)
+        lines += _counter_lines("demo5_backend_response_bytes_total", _response_bytes)
+        lines += _counter_lines("demo5_backend_retries_total", _retries)
+        lines += _counter_lines("demo5_backend_requests_coalesced_total", _coalesced)
+        lines += _histogram_lines("demo5_backend_payload_decode_duration_seconds", "endpoint", _decode_latency)
+        for name, column in (("wire", 1), ("decoded", 2)):
+            lines.append(f"# TYPE demo5_backend_payload_{name}_bytes_total counter")
+            for (endpoint, payload_format), totals in sorted(_payloads.items()):
+                labels = f'endpoint="{_label(endpoint)}",format="{_label(payload_format)}"'
+                lines.append(f"demo5_backend_payload_{name}_bytes_total{{{labels}}} {totals[column]}")
+        lines += _histogram_lines("demo5_page_render_duration_seconds", "page", _page_render)
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics_file(path: str) -> None:
+    """Write the Prometheus text to a file, replacing it atomically."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as output:
+        output.write(render_prometheus())
+    os.replace(temporary, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(host: str, port: int) -> ThreadingHTTPServer:
+    """Serve /metrics on the given local address from a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def _write_periodically(path: str, interval: float) -> None:
+    while True:
+        try:
+            write_metrics_file(path)
+        except OSError as e:
+            logging.error(e, exc_info=True)
+        time.sleep(interval)
+
+
+def ensure_exporters() -> None:
+    """Start the configured metrics endpoint and file writer once per process."""
+    global _exporters_started
+    with _exporter_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if config.METRICS_PORT:
+        try:
+            start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+        except OSError as e:
+            logging.error(e, exc_info=True)
+    if config.METRICS_FILE:
+        threading.Thread(
+            target=_write_periodically,
+            args=(config.METRICS_FILE, config.METRICS_FILE_INTERVAL_SECONDS),
+            name="metrics-file-writer",
+            daemon=True,
+        ).start()
@@ -0,0 +1,107 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from pydantic import TypeAdapter
+from pydantic.dataclasses import dataclass
+
+"""
+Typed models for forum posts and meetings.
+
+List responses are validated in one batch through prebuilt TypeAdapters, and the models
+use __slots__ so the lists kept in the read cache are compact. Cached models are shared
+between reruns and sessions, so they are frozen: derive changed copies with
+dataclasses.replace instead of mutating them.
+
+MeetingIndex keeps meetings sorted by time so "next N meetings" and date-range filters
+are bisect lookups rather than scans over the whole list.
+"""
+
+
+@dataclass(slots=True, frozen=True)
+class Post:
+    """A forum post."""
+
+    id: Optional[int] = None
+    title: str = ""
+    content: str = ""
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+@dataclass(slots=True, frozen=True)
+class Meeting:
+    """A scheduled meeting."""
+
+    time: datetime
+    location: str = ""
+    participants: tuple[str, ...] = ()
+    id: Optional[int] = None
+
+    def to_row(self) -> dict:
+        """Return the meeting as a row for st.table."""
+        return {
+            "time": self.time.strftime("%Y-%m-%d %H:%M"),
+            "location": self.location,
+            "participants": ", ".join(self.participants),
+        }
+
+
+POSTS_ADAPTER = TypeAdapter(list[Post])
+MEETINGS_ADAPTER = TypeAdapter(list[Meeting])
+# A cached page with its total, as kept in the shared on-disk cache
+POSTS_PAGE_ADAPTER = TypeAdapter(tuple[list[Post], int])
+MEETINGS_PAGE_ADAPTER = TypeAdapter(tuple[list[Meeting], Optional[int]])
+
+
+def parse_posts(items: list[dict[str, Any]]) -> list[Post]:
+    """Validate a list of post dicts in one batch."""
+    return POSTS_ADAPTER.validate_python(items)
+
+
+def parse_meetings(data: Union[bytes, str, list]) -> list[Meeting]:
+    """Validate a meetings list, decoding it straight from JSON when given bytes or text."""
+    if isinstance(data, (bytes, str)):
+        return MEETINGS_ADAPTER.validate_json(data)
+    return MEETINGS_ADAPTER.validate_python(data)
+
+
+def _time_key(value: datetime) -> datetime:
+    """Return a naive local datetime so aware and naive times compare consistently."""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class MeetingIndex:
+    """Meetings sorted by time, supporting bisect range lookups."""
+
+    __slots__ = ("_meetings", "_times")
+
+    def __init__(self, meetings: Iterable[Meeting] = ()):
+        keyed = sorted(((_time_key(meeting.time), meeting) for meeting in meetings), key=lambda item: item[0])
+        self._times = [time for time, _ in keyed]
+        self._meetings = [meeting for _, meeting in keyed]
+
+    def __len__(self) -> int:
+        return len(self._meetings)
+
+    def __iter__(self) -> Iterator[Meeting]:
+        return iter(self._meetings)
+
+    def add(self, meeting: Meeting) -> None:
+        """Insert a meeting at its position in time order."""
+        position = bisect_right(self._times, _time_key(meeting.time))
+        self._times.insert(position, _time_key(meeting.time))
+        self._meetings.insert(position, meeting)
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> list[Meeting]:
+        """Return meetings with start <= time < end; a missing bound is open."""
+        low = bisect_left(self._times, _time_key(start)) if start else 0
+        high = bisect_left(self._times, _time_key(end)) if end else len(self._times)
+        return self._meetings[low:high]
+
+    def upcoming(self, now: datetime, limit: int) -> list[Meeting]:
+        """Return the next `limit` meetings at or after now."""
+        low = bisect_left(self._times, _time_key(now))
+        return self._meetings[low:low + limit]
@@ -0,0 +1,103 @@
+import importlib
+import logging
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from demo5_web_svc import metrics
+
+"""
+Declarative page registry.
+
+Maps each sidebar navigation entry to the module and function that renders it. Page
+modules (and the heavy libraries they pull in, such as requests and email_validator)
+are only imported the first time a page is shown or warmed, and the registry records
+how long that import and the first render took so cold-start cost can be measured and
+paid ahead of traffic with warm_pages(). Every render is also recorded in the metrics
+module. Admin-only entries are left out of the navigation for other users.
+"""
+
+
+class PageEntry:
+    """A navigation entry whose render function is imported on first use."""
+
+    def __init__(self, label: str, module: str, attr: str, admin_only: bool = False):
+        self.label = label
+        self.module = module
+        self.attr = attr
+        self.admin_only = admin_only
+        self.import_seconds: Optional[float] = None
+        self.first_render_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Callable[[], None]:
+        """Import the page module if needed and return its render function."""
+        with self._lock:
+            if self.import_seconds is None:
+                started = time.perf_counter()
+                importlib.import_module(self.module)
+                self.import_seconds = time.perf_counter() - started
+        # Resolve the attribute on every call so a replaced render function is honoured
+        return getattr(importlib.import_module(self.module), self.attr)
+
+    def render(self) -> None:
+        """Render the page, recording its render time."""
+        render = self.load()
+        started = time.perf_counter()
+        try:
+            render()
+        finally:
+            elapsed = time.perf_counter() - started
+            if self.first_render_seconds is None:
+                self.first_render_seconds = elapsed
+            metrics.record_page_render(self.label, elapsed)
+
+
+PAGES: dict[str, PageEntry] = {
+    entry.label: entry
+    for entry in (
+        PageEntry("Signup", "demo5_web_svc.pages.signup", "render_signup_page"),
+        PageEntry("Login", "demo5_web_svc.pages.login", "login"),
+        PageEntry("Forum", "demo5_web_svc.pages.forum", "render_forum_page"),
+        PageEntry("Meetings", "demo5_web_svc.pages.meeting_appointment", "render_meeting_appointment_page"),
+        PageEntry("Metrics", "demo5_web_svc.pages.admin_metrics", "render_metrics_page", admin_only=True),
+    )
+}
+
+
+def navigation_labels(is_admin: bool = False) -> tuple[str, ...]:
+    """Return the navigation entries visible to the current user."""
+    return tuple(label for label, entry in PAGES.items() if is_admin or not entry.admin_only)
+
+
+def render_page(label: str) -> None:
+    """Render the page registered under the given navigation label."""
+    PAGES[label].render()
+
+
+def warm_pages(labels: Optional[Iterable[str]] = None) -> dict[str, float]:
+    """Import page modules ahead of traffic.
+
+    Args:
+        labels (Iterable[str], optional): Pages to warm; all registered pages by default.
+
+    Returns:
+        dict: Import time in seconds for each warmed page.
+    """
+    timings = {}
+    for label in labels or PAGES:
+        entry = PAGES[label]
+        try:
+            entry.load()
+            timings[label] = entry.import_seconds
+        except Exception as e:
+            logging.error(e, exc_info=True)
+    return timings
+
+
+def get_page_timings() -> dict[str, dict[str, Optional[float]]]:
+    """Return import and first-render time in seconds for every registered page."""
+    return {
+        label: {"import_seconds": entry.import_seconds, "first_render_seconds": entry.first_render_seconds}
+        for label, entry in PAGES.items()
+    }
@@ -0,0 +1,70 @@
+import streamlit as st
+
+from demo5_web_svc import cache, circuit_breaker, config, http_client, metrics, post_sync, session
+
+"""
+Admin-only metrics page.
+
+Shows backend call latency percentiles, status codes, payload sizes and retries per
+endpoint, decode times and compression savings per payload encoding, page render times
+per navigation entry, circuit breaker states, conditional GET savings, coalesced reads,
+shared cache usage and forum delta syncs for this Streamlit process. The same data is
+exported in Prometheus format by the metrics module.
+"""
+
+
+def render_metrics_page() -> None:
+    """Render the metrics page for admin users."""
+    st.title("Metrics")
+
+    if not session.is_admin(session.get_token()):
+        st.error("Admin access required.")
+        return
+
+    if st.button("Refresh"):
+        pass  # The page is re-rendered with current numbers on click
+
+    st.subheader("Backend endpoints")
+    endpoints = metrics.endpoint_summary()
+    if endpoints:
+        st.table(endpoints)
+    else:
+        st.info("No backend calls recorded yet.")
+
+    st.subheader("Payload encodings")
+    encodings = metrics.payload_summary()
+    if encodings:
+        st.table(encodings)
+    else:
+        st.info("No list responses decoded yet.")
+
+    st.subheader("Page renders")
+    pages = metrics.page_summary()
+    if pages:
+        st.table(pages)
+    else:
+        st.info("No page renders recorded yet.")
+
+    st.subheader("Circuit breakers")
+    breakers = circuit_breaker.states()
+    if breakers:
+        st.table([{"group": group, "state": state} for group, state in sorted(breakers.items())])
+    else:
+        st.info("No backend calls recorded yet.")
+
+    st.subheader("Conditional GET")
+    st.json(http_client.get_conditional_stats())
+
+    st.subheader("Request coalescing")
+    st.json(http_client.get_coalescing_stats())
+
+    if cache.shared_store is not None:
+        st.subheader("Shared cache")
+        st.json(cache.shared_store.stats())
+
+    if config.FORUM_DELTA_SYNC:
+        st.subheader("Forum sync")
+        st.json(post_sync.stats())
+
+    with st.expander("Prometheus text"):
+        st.code(metrics.render_prometheus(), language="text")
@@ -1,15 +1,86 @@
 import streamlit as st
-import requests
+import functools
+import itertools
 import logging
-from demo5_web_svc import config
+import math
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
+from typing import Optional
+import requests
+from demo5_web_svc import cache, circuit_breaker, config, http_client, loader, payloads, post_sync, search, session
+from demo5_web_svc.models import POSTS_PAGE_ADAPTER, Post, parse_posts
 
 """
 Module for rendering the Forum page using Streamlit.
 This page fetches, creates, updates, and deletes forum posts by interfacing with the backend forum API endpoints.
-It uses the authentication token stored in session_state as 'jwt_token'.
+It uses the authentication token stored in session_state as 'jwt_token', read through the
+session module so that expired tokens never reach the backend and 401s are handled centrally.
+
+Posts are requested from the backend one page at a time (limit plus offset, or the
+cursor returned with the previous page when the backend provides one), and the next
+page is prefetched in the background into the read cache so paging forward does not
+wait on the backend. Pages are kept in the shared read cache per token and page, and
+writes invalidate only the forum entries they affect. With config.SHARED_CACHE_PATH set,
+cached pages are shared with the other processes on the host. While the forum circuit
+breaker is open, the last cached copy of a page is shown instead of an error.
+
+With config.FORUM_OPTIMISTIC_WRITES (off by default), a create, edit or delete is shown on
+the page right away, marked "Saving...", and sent to the backend on the loader pool. When
+the backend confirms it, the cached pages are patched with the server's copy of the post
+(id, timestamps) instead of being refetched and a success message is shown; when it
+fails, the change disappears again and an error is shown. While writes are pending, a
+small fragment polls them and reruns the page as soon as they have all settled.
+
+Admins can select posts across pages, or every post matching the search (every post
+when not searching), and delete or edit them in bulk. Bulk operations
+are sent to /forum/batch in chunks of BULK_BATCH_SIZE; against a backend without that
+endpoint they fan out as individual requests on the bounded loader pool.
+
+With config.FORUM_DELTA_SYNC, pages are instead served from the user's local copy of all
+posts in the post_sync module, which is loaded in full once and then only fetches the
+posts changed since its last sync. Write paths update that copy too, and a backend that
+does not support delta sync falls back to the paged requests above.
+
+The search box pages through matches from the user's in-memory index in the search
+module, which every write path here keeps up to date.
+
+Each post's edit and delete controls are a Streamlit fragment, so working with them does
+not rerun the page; only a successful write reruns it.
 """
 
 POSTS_PER_PAGE = 5
+MAX_PREFETCHED_PAGES = 64
+PENDING_WRITES_KEY = "forum_pending_writes"
+PENDING_POLL_SECONDS = 1.0
+SELECTED_POSTS_KEY = "forum_selected_posts"
+BULK_RESULTS_KEY = "forum_bulk_results"
+BATCH_PATH = "/forum/batch"
+BULK_BATCH_SIZE = 100
+
+# Set once the backend has answered the batch endpoint with 404/405
+_batch_unsupported = False
+
+_prefetch_lock = threading.Lock()
+# In-flight prefetches only; finished ones are in the read cache
+_prefetched_pages: dict[tuple, Future] = {}
+# Bumped by every write, so a prefetch started before the write does not cache its result
+_prefetch_generation = 0
+_page_cursors: dict[tuple, str] = {}
+# Optimistically created posts get negative ids until the backend assigns the real one
+_temporary_ids = itertools.count(-1, -1)
+
+# Cached pages are also kept in the store shared by the processes of this host, if configured
+cache.data_cache.share("posts", POSTS_PAGE_ADAPTER.dump_json, POSTS_PAGE_ADAPTER.validate_json)
+
+
+class PendingWrite:
+    """A forum write shown on the page before the backend has confirmed it."""
+
+    def __init__(self, kind: str, post: Post, future: Future):
+        self.kind = kind
+        self.post = post
+        self.future = future
 
 
 def paginate_posts(posts: list, page_number: int, posts_per_page: int = POSTS_PER_PAGE) -> list:
@@ -19,61 +90,706 @@ def paginate_posts(posts: list, page_number: int, posts_per_page: int = POSTS_PE
     return posts[start_idx:end_idx]
 
 
-def fetch_posts(token: str) -> list:
-    """Fetch forum posts from the backend service."""
+def _remember(store: dict, key: tuple, value) -> None:
+    """Store a value in a bounded dict, dropping the oldest entries first."""
+    store[key] = value
+    while len(store) > MAX_PREFETCHED_PAGES:
+        store.pop(next(iter(store)))
+
+
+def _parse_posts_body(response, start: int, stop: int) -> dict:
+    """Stream-parse a /forum body and validate the kept posts into Post models in one batch."""
+    data = payloads.parse_window(response, start, stop)
+    data["items"] = parse_posts(data.get("items", []))
+    return data
+
+
+def _request_posts_page(token: str, page_number: int, posts_per_page: int) -> tuple[list[Post], int]:
+    """Request a single page of posts from the backend.
+
+    The backend is expected to answer with {"items": [...], "total": N} and may add a
+    "next_cursor" for keyset pagination. A plain list (a backend without server-side
+    pagination) is parsed as a stream, keeping only the requested page and the count.
+
+    Raises:
+        requests.RequestException: If the backend call fails.
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    start = (page_number - 1) * posts_per_page
+    params = {"limit": posts_per_page, "offset": start}
+    cursor = _page_cursors.get((token, posts_per_page, page_number))
+    if cursor:
+        params["cursor"] = cursor
+    data = http_client.get_json(
+        "/forum",
+        headers=headers,
+        params=params,
+        parse=lambda response: _parse_posts_body(response, start, start + posts_per_page),
+    )
+
+    posts = data.get("items", [])
+    total = data.get("total", start + len(posts))
+    next_cursor = data.get("next_cursor")
+    if next_cursor:
+        with _prefetch_lock:
+            _remember(_page_cursors, (token, posts_per_page, page_number + 1), next_cursor)
+    return posts, total
+
+
+def _posts_cache_key(token: str, page_number: int, posts_per_page: int) -> tuple:
+    return ("posts", token, posts_per_page, page_number)
+
+
+def prefetch_posts(token: str, page_number: int, posts_per_page: int = POSTS_PER_PAGE) -> None:
+    """Start fetching a page of posts in the background so a later fetch_posts call returns immediately."""
+    if session.is_expired(token) or circuit_breaker.get_breaker("forum").state == circuit_breaker.OPEN:
+        return
+    if post_sync.supported():
+        # Every page is served from the synced copy
+        return
+    key = (token, posts_per_page, page_number)
+    found, _, stale = cache.data_cache.get(_posts_cache_key(token, page_number, posts_per_page))
+    if found and not stale:
+        return
+    with _prefetch_lock:
+        if key in _prefetched_pages:
+            return
+        future = loader.submit(_prefetch, token, page_number, posts_per_page, _prefetch_generation)
+        _remember(_prefetched_pages, key, future)
+    future.add_done_callback(lambda done: _forget_prefetch(key, done))
+
+
+def _prefetch(token: str, page_number: int, posts_per_page: int, generation: int) -> tuple[list[Post], int]:
+    """Fetch a page and store it in the read cache, where it ages like any other entry."""
+    cache_generation = cache.data_cache.generation
+    result = _request_posts_page(token, page_number, posts_per_page)
+    with _prefetch_lock:
+        current = generation == _prefetch_generation
+    if current:
+        cache.data_cache.set(
+            _posts_cache_key(token, page_number, posts_per_page), result, generation=cache_generation
+        )
+    return result
+
+
+def _forget_prefetch(key: tuple, future: Future) -> None:
+    with _prefetch_lock:
+        if _prefetched_pages.get(key) is future:
+            del _prefetched_pages[key]
+
+
+def clear_prefetched_pages() -> None:
+    """Drop prefetched pages and cursors, which are stale once posts have been written."""
+    global _prefetch_generation
+    with _prefetch_lock:
+        _prefetched_pages.clear()
+        _page_cursors.clear()
+        _prefetch_generation += 1
+
+
+def invalidate_posts(post_id: Optional[int] = None) -> None:
+    """Invalidate cached forum pages after a write.
+
+    Args:
+        post_id (int, optional): When given, only pages containing this post are dropped
+            (an edit does not move posts between pages). Otherwise every cached forum page
+            is dropped, since creating or deleting a post shifts page boundaries and totals.
+    """
+    clear_prefetched_pages()
+    post_sync.expire()
+    # Other processes' pages may hold the post too; the shared store cannot tell which
+    cache.data_cache.invalidate_shared("posts")
+    if post_id is None:
+        cache.data_cache.invalidate(lambda key, value: key[0] == "posts")
+    else:
+        cache.data_cache.invalidate(
+            lambda key, value: key[0] == "posts" and any(post.id == post_id for post in value[0])
+        )
+
+
+def _load_posts_page(token: str, page_number: int, posts_per_page: int) -> tuple[list[Post], int]:
+    """Return a page of posts, reusing an in-flight prefetch when there is one.
+
+    A finished prefetch has already been stored in the read cache, so only prefetches
+    still in flight (and therefore fresh) are joined here.
+    """
+    with _prefetch_lock:
+        future = _prefetched_pages.pop((token, posts_per_page, page_number), None)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            # Fall back to a direct request below
+            logging.error(e, exc_info=True)
+    return _request_posts_page(token, page_number, posts_per_page)
+
+
+def _report_error(error: Exception, message: str) -> None:
+    """Log a failed backend call and show either the session-expired notice or the message."""
+    if session.is_unauthorized(error):
+        session.handle_unauthorized()
+        return
+    logging.error(error, exc_info=True)
+    st.error(message)
+
+
+def load_posts(token: str, page_number: int = 1, posts_per_page: int = POSTS_PER_PAGE) -> tuple[list[Post], int]:
+    """Load one page of forum posts, served from the read cache when possible.
+
+    Safe to run on the loader pool: it does not touch Streamlit.
+
+    Raises:
+        session.SessionExpiredError: If the token is known to be expired.
+        requests.RequestException: If the page is not cached and the backend call fails.
+    """
+    session.ensure_valid(token)
+    if post_sync.supported():
+        try:
+            return post_sync.load_page(token, page_number, posts_per_page)
+        except post_sync.SyncUnsupportedError as e:
+            logging.warning("%s; fetching forum pages instead", e)
+    return cache.data_cache.get_or_load(
+        _posts_cache_key(token, page_number, posts_per_page),
+        lambda: _load_posts_page(token, page_number, posts_per_page),
+        fallback_errors=(circuit_breaker.CircuitOpenError,),
+    )
+
+
+def fetch_posts(token: str, page_number: int = 1, posts_per_page: int = POSTS_PER_PAGE) -> tuple[list[Post], int]:
+    """Fetch one page of forum posts, served from the read cache when possible.
+
+    Args:
+        token (str): JWT token of the current user
+        page_number (int): 1-based page number
+        posts_per_page (int): Number of posts per page
+
+    Returns:
+        tuple: The posts on the requested page and the total number of posts.
+    """
     try:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.get(f"{config.AUTH_SERVICE_URL}/forum", headers=headers)
-        response.raise_for_status()
-        posts = response.json()
-        return posts
+        return load_posts(token, page_number, posts_per_page)
     except Exception as e:
-        logging.error(e, exc_info=True)
-        st.error("Error fetching forum posts")
-        return []
+        _report_error(e, "Error fetching forum posts")
+        return [], 0
+
+
+def _server_post(response: requests.Response, fallback: Post) -> Post:
+    """Return the post echoed back by a write, or the fallback when the backend sent none."""
+    try:
+        data = response.json()
+    except ValueError:
+        return fallback
+    if isinstance(data, dict) and data.get("id") is not None:
+        return parse_posts([data])[0]
+    return fallback
+
+
+def _send_create(token: str, title: str, content: str) -> Post:
+    session.ensure_valid(token)
+    payload = {"title": title, "content": content}
+    headers = {"Authorization": f"Bearer {token}"}
+    response = http_client.post("/forum", json=payload, headers=headers)
+    response.raise_for_status()
+    post = _server_post(response, Post(title=title, content=content))
+    search.update(token, [post])
+    post_sync.apply(token, [post])
+    return post
+
+
+def _send_update(token: str, post_id: int, title: str, content: str) -> Post:
+    session.ensure_valid(token)
+    payload = {"title": title, "content": content}
+    headers = {"Authorization": f"Bearer {token}"}
+    response = http_client.put(f"/forum/{post_id}", json=payload, headers=headers)
+    response.raise_for_status()
+    post = _server_post(response, Post(id=post_id, title=title, content=content))
+    search.update(token, [post])
+    post_sync.apply(token, [post])
+    return post
+
+
+def _send_delete(token: str, post_id: int) -> None:
+    session.ensure_valid(token)
+    headers = {"Authorization": f"Bearer {token}"}
+    response = http_client.delete(f"/forum/{post_id}", headers=headers)
+    response.raise_for_status()
+    search.update(token, deleted=[post_id])
+    post_sync.apply(token, deleted=[post_id])
 
 
 def create_post(token: str, title: str, content: str) -> bool:
     """Create a new forum post."""
     try:
-        payload = {"title": title, "content": content}
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.post(f"{config.AUTH_SERVICE_URL}/forum", json=payload, headers=headers)
-        response.raise_for_status()
+        _send_create(token, title, content)
+        invalidate_posts()
         return True
     except Exception as e:
-        logging.error(e, exc_info=True)
-        st.error("Error creating forum post")
+        _report_error(e, "Error creating forum post")
         return False
 
 
 def update_post(token: str, post_id: int, title: str, content: str) -> bool:
     """Update an existing forum post."""
     try:
-        payload = {"title": title, "content": content}
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.put(f"{config.AUTH_SERVICE_URL}/forum/{post_id}", json=payload, headers=headers)
-        response.raise_for_status()
+        _send_update(token, post_id, title, content)
+        invalidate_posts(post_id)
         return True
     except Exception as e:
-        logging.error(e, exc_info=True)
-        st.error(f"Error updating forum post with id {post_id}")
+        _report_error(e, f"Error updating forum post with id {post_id}")
         return False
 
 
 def delete_post(token: str, post_id: int) -> bool:
     """Delete a forum post."""
     try:
-        headers = {"Authorization": f"Bearer {token}"}
-        response = requests.delete(f"{config.AUTH_SERVICE_URL}/forum/{post_id}", headers=headers)
-        response.raise_for_status()
+        _send_delete(token, post_id)
+        invalidate_posts()
         return True
     except Exception as e:
-        logging.error(e, exc_info=True)
-        st.error(f"Error deleting forum post with id {post_id}")
+        _report_error(e, f"Error deleting forum post with id {post_id}")
         return False
 
 
+def _describe_error(error: Exception) -> str:
+    response = getattr(error, "response", None)
+    if response is not None:
+        return f"HTTP {response.status_code}"
+    return str(error) or type(error).__name__
+
+
+def _send_batch(token: str, operations: list[dict]) -> Optional[dict[int, Optional[str]]]:
+    """Send moderation operations to the batch endpoint.
+
+    A chunk whose request fails is reported as failed for each of its posts, and the
+    remaining chunks are still sent: earlier chunks have already been applied.
+
+    Returns:
+        dict: Post id -> None on success or an error message, or None when the backend has
+        no batch endpoint.
+    """
+    global _batch_unsupported
+    if _batch_unsupported:
+        return None
+    headers = {"Authorization": f"Bearer {token}"}
+    results: dict[int, Optional[str]] = {}
+    for start in range(0, len(operations), BULK_BATCH_SIZE):
+        chunk = operations[start:start + BULK_BATCH_SIZE]
+        try:
+            response = http_client.post(BATCH_PATH, json={"operations": chunk}, headers=headers)
+            if response.status_code in (404, 405) and not results:
+                _batch_unsupported = True
+                return None
+            response.raise_for_status()
+            items = response.json().get("results", [])
+        except (requests.RequestException, ValueError) as e:
+            logging.error(e, exc_info=True)
+            results.update({operation["id"]: _describe_error(e) for operation in chunk})
+            continue
+        chunk_results = {operation["id"]: "No result returned" for operation in chunk}
+        for item in items:
+            status = item.get("status", 200)
+            chunk_results[item.get("id")] = None if 200 <= status < 300 else item.get("error") or f"HTTP {status}"
+        results.update(chunk_results)
+    return results
+
+
+def _fan_out(token: str, operations: list[dict]) -> dict[int, Optional[str]]:
+    """Send moderation operations as individual requests on the loader pool."""
+    tasks = {}
+    for operation in operations:
+        if operation["op"] == "delete":
+            tasks[operation["id"]] = functools.partial(_send_delete, token, operation["id"])
+        else:
+            tasks[operation["id"]] = functools.partial(
+                _send_update, token, operation["id"], operation["title"], operation["content"]
+            )
+    return {
+        post_id: None if ok else _describe_error(value)
+        for post_id, (ok, value) in loader.load_all(tasks).items()
+    }
+
+
+def run_bulk(token: str, operations: list[dict]) -> dict[int, Optional[str]]:
+    """Apply moderation operations to many posts.
+
+    Args:
+        token (str): JWT token of the current user
+        operations (list): {"op": "delete", "id": ...} or {"op": "update", "id": ..., "title": ..., "content": ...}
+
+    Returns:
+        dict: Post id -> None on success or an error message.
+
+    Raises:
+        session.SessionExpiredError: If the token is known to be expired.
+    """
+    session.ensure_valid(token)
+    results = _send_batch(token, operations)
+    if results is None:
+        results = _fan_out(token, operations)
+    else:
+        for operation in operations:
+            if results.get(operation["id"]) is not None:
+                continue
+            if operation["op"] == "delete":
+                search.update(token, deleted=[operation["id"]])
+                post_sync.apply(token, deleted=[operation["id"]])
+            else:
+                post = Post(id=operation["id"], title=operation["title"], content=operation["content"])
+                search.update(token, [post])
+                post_sync.apply(token, [post])
+    if any(error is None for error in results.values()):
+        invalidate_posts()
+    return results
+
+
+def bulk_delete(token: str, post_ids: list[int]) -> dict[int, Optional[str]]:
+    """Delete many posts; see run_bulk."""
+    return run_bulk(token, [{"op": "delete", "id": post_id} for post_id in post_ids])
+
+
+def bulk_update(token: str, posts: list[Post]) -> dict[int, Optional[str]]:
+    """Save the title and content of many posts; see run_bulk."""
+    return run_bulk(
+        token, [{"op": "update", "id": post.id, "title": post.title, "content": post.content} for post in posts]
+    )
+
+
+def _toggle_selected(post: Post) -> None:
+    """on_change callback of a post's selection checkbox."""
+    selected = st.session_state.setdefault(SELECTED_POSTS_KEY, {})
+    if st.session_state.get(f"select_{post.id}"):
+        selected[post.id] = post
+    else:
+        selected.pop(post.id, None)
+
+
+def _select_posts(posts: list[Post], selected: bool) -> None:
+    """on_click callback selecting or deselecting every post on the page."""
+    selection = st.session_state.setdefault(SELECTED_POSTS_KEY, {})
+    for post in posts:
+        st.session_state[f"select_{post.id}"] = selected
+        if selected:
+            selection[post.id] = post
+        else:
+            selection.pop(post.id, None)
+
+
+def _select_matching(token: str, query: Optional[str], total: int) -> None:
+    """on_click callback selecting every search match, or every post when query is None."""
+    try:
+        if query is None:
+            posts, _ = load_posts(token, 1, max(1, total))
+        else:
+            index = search.find(token)
+            posts = index.page(query, 1, max(1, total))[0] if index is not None else []
+    except Exception as e:
+        _report_error(e, "Could not select the matching posts")
+        return
+    _select_posts(posts, True)
+
+
+def _run_bulk_action(token: str, action: str) -> None:
+    """on_click callback of the bulk delete and bulk edit buttons."""
+    selected: dict[int, Post] = st.session_state.get(SELECTED_POSTS_KEY, {})
+    if not selected:
+        return
+    try:
+        if action == "delete":
+            results = bulk_delete(token, list(selected))
+        else:
+            title = st.session_state.get("bulk_title", "")
+            content = st.session_state.get("bulk_content", "")
+            if not title and not content:
+                st.error("Enter a new title or content for the selected posts.")
+                return
+            results = bulk_update(
+                token,
+                [replace(post, title=title or post.title, content=content or post.content) for post in selected.values()],
+            )
+    except Exception as e:
+        _report_error(e, "Bulk moderation failed")
+        return
+    done = "deleted" if action == "delete" else "updated"
+    st.session_state[BULK_RESULTS_KEY] = [
+        {"post": post_id, "title": selected[post_id].title, "result": results.get(post_id) or done}
+        for post_id in selected
+    ]
+    # Failed posts stay selected so the action can be retried
+    st.session_state[SELECTED_POSTS_KEY] = {post_id: post for post_id, post in selected.items() if results.get(post_id)}
+    for post_id in selected:
+        st.session_state.pop(f"select_{post_id}", None)
+
+
+def _render_moderation(token: str, posts: list[Post], query: Optional[str], total: int) -> None:
+    """Render the bulk moderation controls for admins.
+
+    Args:
+        token (str): JWT token of the current user
+        posts (list[Post]): Posts on the current page
+        query (Optional[str]): Search query the page shows matches of, or None for all posts
+        total (int): Number of matching posts across all pages
+    """
+    selected = st.session_state.get(SELECTED_POSTS_KEY, {})
+    with st.expander(f"Moderation ({len(selected)} selected)", expanded=bool(selected)):
+        st.button("Select all on this page", key="bulk_select_page", on_click=_select_posts, args=(posts, True))
+        st.button(
+            f"Select all {total} matching posts" if query is not None else f"Select all {total} posts",
+            key="bulk_select_matching",
+            on_click=_select_matching,
+            args=(token, query, total),
+        )
+        st.button("Clear selection", key="bulk_clear", on_click=_select_posts, args=(list(selected.values()), False))
+        st.button(
+            f"Delete {len(selected)} selected posts",
+            key="bulk_delete",
+            disabled=not selected,
+            on_click=_run_bulk_action,
+            args=(token, "delete"),
+        )
+        with st.form(key="bulk_edit_form"):
+            st.text_input("New title (leave blank to keep)", key="bulk_title")
+            st.text_area("New content (leave blank to keep)", key="bulk_content")
+            st.form_submit_button(
+                label=f"Edit {len(selected)} selected posts", on_click=_run_bulk_action, args=(token, "edit")
+            )
+        results = st.session_state.get(BULK_RESULTS_KEY)
+        if results:
+            failed = sum(1 for row in results if row["result"] not in ("deleted", "updated"))
+            st.caption(f"Last bulk action: {len(results) - failed} succeeded, {failed} failed")
+            st.table(results)
+
+
+def _is_token_page(token: str):
+    return lambda key, value: key[0] == "posts" and key[1] == token
+
+
+def reconcile_created(token: str, post: Post) -> None:
+    """Add a confirmed new post to the cached pages of a token.
+
+    New posts are listed last, so the post is appended to the last page when that page
+    is cached and has room, and every cached page's total grows by one.
+    """
+    clear_prefetched_pages()
+
+    def patch(key, value):
+        posts, total = value
+        per_page, page = key[2], key[3]
+        if page == total // per_page + 1 and len(posts) < per_page and all(p.id != post.id for p in posts):
+            posts = posts + [post]
+        return posts, total + 1
+
+    cache.data_cache.patch(_is_token_page(token), patch)
+
+
+def reconcile_updated(token: str, post: Post) -> None:
+    """Replace a post in the cached pages of a token with the backend's copy."""
+    cache.data_cache.patch(
+        _is_token_page(token),
+        lambda key, value: ([post if p.id == post.id else p for p in value[0]], value[1]),
+    )
+
+
+def reconcile_deleted(token: str, post_id: int) -> None:
+    """Remove a deleted post from the cached pages of a token.
+
+    The page that held the post is patched; other pages are dropped, since the posts
+    after the deleted one have moved up by one.
+    """
+    clear_prefetched_pages()
+
+    def patch(key, value):
+        posts, total = value
+        if any(p.id == post_id for p in posts):
+            return [p for p in posts if p.id != post_id], total - 1
+        return None
+
+    cache.data_cache.patch(_is_token_page(token), patch)
+
+
+def _write_in_background(token: str, kind: str, post: Post) -> Optional[Post]:
+    """Send an optimistic write to the backend and patch the cached pages with its result.
+
+    Runs on the loader pool, so it must not touch Streamlit.
+    """
+    # Retire the shared copies first; the pages patched below are written back afterwards
+    if kind == "create":
+        saved = _send_create(token, post.title, post.content)
+        cache.data_cache.invalidate_shared("posts")
+        reconcile_created(token, saved)
+        _invalidate_other_tokens(token)
+        return saved
+    if kind == "update":
+        saved = _send_update(token, post.id, post.title, post.content)
+        cache.data_cache.invalidate_shared("posts")
+        reconcile_updated(token, saved)
+        _invalidate_other_tokens(token, saved.id)
+        return saved
+    _send_delete(token, post.id)
+    cache.data_cache.invalidate_shared("posts")
+    reconcile_deleted(token, post.id)
+    _invalidate_other_tokens(token)
+    return None
+
+
+def _invalidate_other_tokens(token: str, post_id: Optional[int] = None) -> None:
+    """Drop the cached forum pages of every other token after an optimistic write.
+
+    Only the writer's pages are patched; the others are dropped as in invalidate_posts.
+    """
+    post_sync.expire()
+    if post_id is None:
+        cache.data_cache.invalidate(lambda key, value: key[0] == "posts" and key[1] != token)
+    else:
+        cache.data_cache.invalidate(
+            lambda key, value: key[0] == "posts"
+            and key[1] != token
+            and any(post.id == post_id for post in value[0])
+        )
+
+
+def queue_write(token: str, kind: str, post: Post) -> None:
+    """Show a create, update or delete immediately and send it to the backend in the background.
+
+    Args:
+        token (str): JWT token of the current user
+        kind (str): "create", "update" or "delete"
+        post (Post): The post as it should look after the write (a temporary negative id for a create)
+    """
+    future = loader.submit(_write_in_background, token, kind, post)
+    st.session_state.setdefault(PENDING_WRITES_KEY, []).append(PendingWrite(kind, post, future))
+
+
+def settle_pending_writes() -> list[PendingWrite]:
+    """Report finished background writes and return the writes to overlay on the page.
+
+    Failed writes are rolled back: they are dropped from the overlay and an error is shown.
+    Writes that succeeded are reported, and still overlaid once in case the page was read
+    from the cache before the write patched it.
+    """
+    overlay, pending = [], []
+    for write in st.session_state.get(PENDING_WRITES_KEY, []):
+        if not write.future.done():
+            pending.append(write)
+            overlay.append(write)
+            continue
+        error = write.future.exception()
+        if error is not None:
+            title = write.post.title or f"post {write.post.id}"
+            _report_error(error, f"Could not {write.kind} '{title}'. The change has been rolled back.")
+            continue
+        st.success(f"Post {write.kind}d successfully!")
+        if write.kind != "create":
+            overlay.append(write)
+    st.session_state[PENDING_WRITES_KEY] = pending
+    return overlay
+
+
+def apply_pending_writes(posts: list[Post], writes: list[PendingWrite]) -> list[Post]:
+    """Return the posts of a page with optimistic writes applied."""
+    for write in writes:
+        if write.kind == "delete":
+            posts = [p for p in posts if p.id != write.post.id]
+        elif write.kind == "update":
+            post = write.future.result() if write.future.done() else write.post
+            posts = [post if p.id == post.id else p for p in posts]
+        elif all(p.id != write.post.id for p in posts):
+            posts = posts + [write.post]
+    return posts
+
+
+@st.fragment(run_every=PENDING_POLL_SECONDS)
+def render_pending_writes() -> None:
+    """Rerun the whole page once every pending write has been confirmed or rolled back."""
+    if all(write.future.done() for write in st.session_state.get(PENDING_WRITES_KEY, [])):
+        st.rerun()
+
+
+def _save_edit(token: str, post: Post, title: str, content: str) -> Optional[str]:
+    """Write an edited post.
+
+    Returns:
+        str: The message to show after the page reruns, "" for an optimistic write (reported
+        once confirmed), or None on failure.
+    """
+    if config.FORUM_OPTIMISTIC_WRITES:
+        queue_write(token, "update", replace(post, title=title, content=content))
+        return ""
+    if update_post(token, post.id, title, content):
+        return "Post updated successfully!"
+    return None
+
+
+def _save_delete(token: str, post: Post) -> Optional[str]:
+    """Delete a post; returns the same as _save_edit."""
+    if config.FORUM_OPTIMISTIC_WRITES:
+        queue_write(token, "delete", post)
+        return ""
+    if delete_post(token, post.id):
+        return "Post deleted successfully!"
+    return None
+
+
+def _finish_write(message: Optional[str], failure: str) -> None:
+    """Rerun the whole page after a successful write; report a failure inside the fragment."""
+    if message is None:
+        st.error(failure)
+        return
+    if message:
+        st.session_state.forum_notice = message
+    st.rerun()
+
+
+@st.fragment
+def render_post_actions(token: str, post: Post) -> None:
+    """Edit and delete controls of one post.
+
+    Opening, cancelling and submitting the edit form or the delete confirmation reruns
+    only this fragment, so none of it refetches the page. The whole page reruns once,
+    after a write went through, to show the changed list.
+    """
+    # Per-post flags: each post's fragment reruns alone, so a shared "post being edited"
+    # key would leave another post's form on screen after it had moved on
+    editing_key, deleting_key = f"editing_{post.id}", f"deleting_{post.id}"
+    if st.session_state.get(editing_key):
+        with st.form(key=f"edit_form_{post.id}"):
+            title = st.text_input("Title", value=post.title, key=f"edit_title_{post.id}")
+            content = st.text_area("Content", value=post.content, key=f"edit_content_{post.id}")
+            submitted = st.form_submit_button(label="Submit Edit")
+        if submitted:
+            if not title or not content:
+                st.error("Title and Content are required for editing.")
+            else:
+                message = _save_edit(token, post, title, content)
+                # A failed edit keeps the form open with the user's changes
+                if message is not None:
+                    st.session_state[editing_key] = False
+                _finish_write(message, "Failed to update post.")
+        st.button("Cancel", key=f"cancel_edit_{post.id}", on_click=st.session_state.update, kwargs={editing_key: False})
+    else:
+        st.button(
+            label=f"Edit Post {post.id}",
+            key=f"edit_{post.id}",
+            on_click=st.session_state.update,
+            kwargs={editing_key: True},
+        )
+
+    if st.session_state.get(deleting_key):
+        st.warning("Are you sure you want to delete this post?")
+        if st.button(label="Confirm Delete", key=f"confirm_delete_{post.id}"):
+            message = _save_delete(token, post)
+            if message is not None:
+                st.session_state[deleting_key] = False
+            _finish_write(message, "Failed to delete post.")
+        st.button("Cancel", key=f"cancel_delete_{post.id}", on_click=st.session_state.update, kwargs={deleting_key: False})
+    else:
+        st.button(
+            label=f"Delete Post {post.id}",
+            key=f"delete_{post.id}",
+            on_click=st.session_state.update,
+            kwargs={deleting_key: True},
+        )
+
+
 def render_forum_page() -> None:
     """Render the forum page UI with pagination and CRUD operations."""
     try:
@@ -82,14 +798,33 @@ def render_forum_page() -> None:
         logging.error(e, exc_info=True)
 
     st.title("Forum")
+    notice = st.session_state.pop("forum_notice", None)
+    if notice:
+        st.success(notice)
 
-    # Check for authentication token in session state
-    if 'jwt_token' not in st.session_state or not st.session_state.jwt_token:
-        st.error("Please login to view the forum.")
+    # Check for a usable authentication token; expired tokens are dropped without a backend call
+    token = session.get_token()
+    if not token:
+        st.error(session.login_required_message("Please login to view the forum."))
         return
 
-    token = st.session_state.jwt_token
-    
+    # Search matches come from the user's index once it is built; until then the plain listing is shown
+    query = st.text_input("Search posts", key="forum_search", on_change=lambda: st.session_state.update(page_number=1))
+    searching = False
+    if search.tokenize(query):
+        # Only users who search get an index; see search.ensure_index
+        searching = search.ensure_index(token)
+        index = search.index_for(token)
+        if not searching:
+            st.info(f"The search index is being built ({len(index)} posts indexed). Showing all posts for now.")
+
+    # Start loading the selected page on the loader pool while the creation form renders
+    page_number = int(st.session_state.get("page_number", 1))
+    if searching:
+        posts_future = loader.submit(index.page, query, page_number, POSTS_PER_PAGE)
+    else:
+        posts_future = loader.submit(load_posts, token, page_number)
+
     # Section to create a new post
     st.subheader("Create New Post")
     with st.form(key="create_post_form"):
@@ -99,54 +834,70 @@ def render_forum_page() -> None:
         if submit_new:
             if not new_title or not new_content:
                 st.error("Title and Content are required.")
-            else:
-                if create_post(token, new_title, new_content):
-                    st.success("Post created successfully!")
-                    # Rerun to fetch new posts
-                    st.experimental_rerun()
+            elif config.FORUM_OPTIMISTIC_WRITES:
+                queue_write(token, "create", Post(id=next(_temporary_ids), title=new_title, content=new_content))
+            elif create_post(token, new_title, new_content):
+                st.success("Post created successfully!")
+                # The page started loading before the post existed; load it again
+                if not searching:
+                    posts_future = loader.submit(load_posts, token, page_number)
 
-    # Fetch posts
-    posts = fetch_posts(token)
+    # Join the page fetch; the total count bounds the page selector
+    loaded, result = loader.join(posts_future)
+    if loaded:
+        posts, total = result
+    else:
+        _report_error(result, "Error fetching forum posts")
+        return
+    page_count = max(1, math.ceil(total / POSTS_PER_PAGE))
+    if page_number > page_count:
+        # Posts were removed since the page was selected; show the last page instead
+        page_number = page_count
+        st.session_state.page_number = page_number
+        if searching:
+            posts, total = index.page(query, page_number, POSTS_PER_PAGE)
+        else:
+            posts, total = fetch_posts(token, page_number)
+
+    writes = settle_pending_writes()
+    posts = apply_pending_writes(posts, writes)
+    unconfirmed = {write.post.id for write in writes if not write.future.done()}
+    if unconfirmed:
+        render_pending_writes()
 
     if not posts:
-        st.info("No posts available.")
+        st.info("No posts match your search." if searching else "No posts available.")
         return
 
     # Pagination logic
-    page_number = st.number_input("Page", min_value=1, value=1, step=1, key="page_number")
-    current_posts = paginate_posts(posts, page_number)
+    page_number = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="page_number")
+    st.caption(f"Page {page_number} of {page_count} ({total} {'matching ' if searching else ''}posts)")
+    if page_number < page_count and not searching:
+        prefetch_posts(token, page_number + 1)
+
+    moderator = session.is_admin(token)
+    if moderator:
+        _render_moderation(
+            token, [post for post in posts if post.id not in unconfirmed], query if searching else None, total
+        )
 
     # Display posts
     st.subheader("Posts")
-    for post in current_posts:
-        st.markdown(f"**{post.get('title', 'No Title')}**")
-        st.write(post.get('content', ''))
-
-        # Edit post functionality
-        edit_button = st.button(label=f"Edit Post {post.get('id')}", key=f"edit_{post.get('id')}")
-        if edit_button:
-            with st.expander(f"Edit Post {post.get('id')}"):
-                new_title_edit = st.text_input("Title", value=post.get('title', ''), key=f"edit_title_{post.get('id')}")
-                new_content_edit = st.text_area("Content", value=post.get('content', ''), key=f"edit_content_{post.get('id')}")
-                if st.button(label="Submit Edit", key=f"submit_edit_{post.get('id')}"):
-                    if not new_title_edit or not new_content_edit:
-                        st.error("Title and Content are required for editing.")
-                    else:
-                        if update_post(token, post.get('id'), new_title_edit, new_content_edit):
-                            st.success("Post updated successfully!")
-                            st.experimental_rerun()
-
-        # Delete post functionality
-        delete_button = st.button(label=f"Delete Post {post.get('id')}", key=f"delete_{post.get('id')}")
-        if delete_button:
-            st.warning("Are you sure you want to delete this post?")
-            confirm_delete = st.button(label="Confirm Delete", key=f"confirm_delete_{post.get('id')}")
-            if confirm_delete:
-                if delete_post(token, post.get('id')):
-                    st.success("Post deleted successfully!")
-                    st.experimental_rerun()
-                else:
-                    st.error("Failed to delete post.")
+    for post in posts:
+        st.markdown(f"**{post.title or 'No Title'}**")
+        st.write(post.content)
+        if post.id in unconfirmed:
+            # Not confirmed by the backend yet; it cannot be edited or deleted until it is
+            st.caption("Saving...")
+            continue
+
+        if moderator:
+            # Selections live in SELECTED_POSTS_KEY, since checkbox state is dropped on other pages
+            st.session_state.setdefault(f"select_{post.id}", post.id in st.session_state.get(SELECTED_POSTS_KEY, {}))
+            st.checkbox("Select", key=f"select_{post.id}", on_change=_toggle_selected, args=(post,))
+
+        # Edit and delete controls rerun on their own; see render_post_actions
+        render_post_actions(token, post)
 
 # For Streamlit to run the page when executed
 if __name__ == "__main__":
@@ -1,20 +1,17 @@
 import streamlit as st
-import requests
 import logging
-from email_validator import validate_email, EmailNotValidError
-from demo5_web_svc import config
+from email_validator import EmailNotValidError
+from demo5_web_svc import http_client, session, validation
 
 """
 Login Page Module
 
 This module implements the Login UI using Streamlit. It captures user credentials,
-validates input using the email_validator library, and integrates with the auth-service
-for authentication. The auth-service URL is configured in config.AUTH_SERVICE_URL to avoid hardcoding.
+validates input through the shared email validation service, and integrates with the auth-service
+for authentication. Requests go through the shared http_client, which resolves the
+auth-service URL from config.AUTH_SERVICE_URL.
 """
 
-# Configure the Streamlit page
-st.set_page_config(page_title="Login Page", layout="centered")
-
 
 def attempt_login(email: str, password: str, oauth_token: str) -> dict:
     """Attempt to login using the provided credentials by calling the auth-service.
@@ -29,9 +26,6 @@ def attempt_login(email: str, password: str, oauth_token: str) -> dict:
               {'success': True, 'token': <JWT token>}. On failure, returns
               {'success': False, 'error': <error message>}.
     """
-    # Build the auth-service URL from the configuration
-    url = f"{config.AUTH_SERVICE_URL}/api/login"
-
     # Prepare payload; include oauth_token only if provided
     payload = {
         "email": email,
@@ -43,7 +37,7 @@ def attempt_login(email: str, password: str, oauth_token: str) -> dict:
     headers = {"Content-Type": "application/json"}
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=5)
+        response = http_client.post("/api/login", json=payload, headers=headers, timeout=5)
         if response.status_code == 200:
             result = response.json()
             return {"success": True, "token": result.get("token")}
@@ -66,9 +60,9 @@ def login() -> None:
         submit = st.form_submit_button("Login")
 
     if submit:
-        # Validate email using email-validator
+        # Validate email; domain DNS lookups are cached across logins
         try:
-            validate_email(email)
+            validation.validate_address(email)
         except EmailNotValidError as e:
             st.error(f"Invalid email: {str(e)}")
             return
@@ -84,10 +78,12 @@ def login() -> None:
         if result.get("success"):
             st.success("Login successful!")
             # Store the token in session state
-            st.session_state['jwt_token'] = result.get("token")
+            session.store_token(result.get("token"))
         else:
             st.error(f"Login failed: {result.get('error')}")
 
 
 if __name__ == "__main__":
+    # Configure the Streamlit page when run standalone; app.py configures it otherwise
+    st.set_page_config(page_title="Login Page", layout="centered")
     login()
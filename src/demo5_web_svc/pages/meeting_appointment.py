@@ -1,8 +1,74 @@
 import streamlit as st
+import json
 import logging
-from datetime import datetime
+import math
+from datetime import datetime, timedelta
+from typing import Optional
 import requests
-from email_validator import validate_email, EmailNotValidError
+
+from demo5_web_svc import cache, circuit_breaker, config, http_client, payloads, session, validation
+from demo5_web_svc.models import MEETINGS_PAGE_ADAPTER, MeetingIndex, parse_meetings
+
+"""
+Module for rendering the Meeting Appointment page.
+
+The creation form and the meetings list are separate Streamlit fragments: submitting the
+form only reruns the form (and the whole page only once a meeting has been created), and
+the list reruns on its own every config.MEETINGS_REFRESH_SECONDS. Each list run
+revalidates the page with the backend at most once per interval (a conditional GET, so an
+unchanged list costs a 304), and the table rows are only rebuilt when the meetings
+actually changed.
+
+Windows are requested from the backend with their start rounded down to the hour, so the
+"Upcoming" window keeps the same cache entries and validators for an hour instead of
+changing with the clock; meetings that already started are skipped client-side. A backend
+that ignores windows (and returns every meeting) is remembered, after which the full list
+is fetched and cached once per user and every window is selected from its index.
+"""
+
+MEETINGS_PER_PAGE = 20
+MEETINGS_VIEW_KEY = "meetings_view"
+MEETING_WINDOWS = ("Upcoming", "Today", "This week", "All")
+
+# Set once the backend has answered a windowed request with every meeting
+_windows_unsupported = False
+
+
+def meeting_window(name: str, now: Optional[datetime] = None) -> tuple[Optional[datetime], Optional[datetime]]:
+    """Return the [start, end) range for a named window; None means unbounded.
+
+    Bounds are truncated to the minute; fetch_meetings rounds them further for the request.
+    """
+    now = (now or datetime.now()).replace(second=0, microsecond=0)
+    today = now.replace(hour=0, minute=0)
+    if name == "Upcoming":
+        return now, None
+    if name == "Today":
+        return today, today + timedelta(days=1)
+    if name == "This week":
+        monday = today - timedelta(days=today.weekday())
+        return monday, monday + timedelta(days=7)
+    return None, None
+
+
+def _encode_meetings(value: tuple[MeetingIndex, Optional[int]]) -> bytes:
+    index, total = value
+    return MEETINGS_PAGE_ADAPTER.dump_json((list(index), total))
+
+
+def _decode_meetings(data: bytes) -> tuple[MeetingIndex, Optional[int]]:
+    meetings, total = MEETINGS_PAGE_ADAPTER.validate_json(data)
+    return MeetingIndex(meetings), total
+
+
+# Cached lists are also kept in the store shared by the processes of this host, if configured
+cache.data_cache.share("meetings", _encode_meetings, _decode_meetings)
+
+
+def invalidate_meetings() -> None:
+    """Drop cached meeting lists, here and in the shared store, after a meeting has been created."""
+    cache.data_cache.invalidate(lambda key, value: key[0] == "meetings")
+    cache.data_cache.invalidate_shared("meetings")
 
 
 def create_meeting(payload: dict) -> tuple[bool, str]:
@@ -16,8 +82,9 @@ def create_meeting(payload: dict) -> tuple[bool, str]:
     """
     try:
         headers = {"Content-Type": "application/json"}
-        response = requests.post("http://localhost:8081/api/meetings", json=payload, headers=headers)
+        response = http_client.post("/api/meetings", json=payload, headers=headers)
         if response.status_code in (200, 201):
+            invalidate_meetings()
             return True, "Meeting created successfully!"
         else:
             logging.error("API POST error: %s", response.text)
@@ -27,30 +94,167 @@ def create_meeting(payload: dict) -> tuple[bool, str]:
         return False, "An error occurred while creating the meeting."
 
 
-def fetch_meetings() -> tuple[bool, any]:
-    """Fetch the list of meetings from the API.
+def _loads_meetings(body: bytes):
+    """Decode a JSON meetings body; an array is validated into models straight from its bytes."""
+    if body.lstrip()[:1] == b"{":
+        return json.loads(body)
+    return parse_meetings(body)
+
+
+def _meetings_page(data) -> tuple[MeetingIndex, Optional[int]]:
+    """Turn a decoded meetings body into a time-sorted index.
 
     Returns:
-        tuple: A tuple where the first element is a boolean indicating success, and the second is either the meetings list or an error message.
+        tuple: The index and the total number of meetings in the requested window, or
+        None as the total when the backend ignored the window and returned every meeting.
     """
+    # Models decoded by _loads_meetings pass through parse_meetings again untouched
+    if isinstance(data, dict):
+        return MeetingIndex(parse_meetings(data.get("items", []))), data.get("total")
+    return MeetingIndex(parse_meetings(data)), None
+
+
+def _parse_meetings_body(response) -> tuple[MeetingIndex, Optional[int]]:
+    """Parse a whole meetings response into a time-sorted index; see _meetings_page."""
+    return _meetings_page(payloads.decode(response, loads=_loads_meetings))
+
+
+def _window_params(start: Optional[datetime], end: Optional[datetime], page_number: int, per_page: int) -> dict:
+    params = {"limit": per_page, "offset": (page_number - 1) * per_page}
+    if start:
+        params["start"] = start.isoformat()
+    if end:
+        params["end"] = end.isoformat()
+    return params
+
+
+def _request_meetings(token: Optional[str], params: Optional[dict] = None) -> tuple[MeetingIndex, Optional[int]]:
+    """Request meetings from the API: one page of a time window, or every meeting without params.
+
+    Raises:
+        requests.HTTPError: If the API answers with a non-200 status.
+    """
+    headers = {"Authorization": f"Bearer {token}"} if token else None
     try:
-        response = requests.get("http://localhost:8081/api/meetings")
-        if response.status_code == 200:
-            meetings = response.json()
-            return True, meetings
-        else:
-            logging.error("API GET error: %s", response.text)
-            return False, f"Failed to fetch meetings. Status: {response.status_code}"
+        # Not streamed: the whole body is needed anyway, and an error body stays readable for the log
+        data = http_client.get_json("/api/meetings", headers=headers, params=params, loads=_loads_meetings)
+    except requests.HTTPError as e:
+        logging.error("API GET error: %s", e.response.text)
+        raise requests.HTTPError(f"Failed to fetch meetings. Status: {e.response.status_code}") from e
+    return _meetings_page(data)
+
+
+class _WindowsUnsupported(Exception):
+    """The backend answered a windowed request with every meeting."""
+
+
+def _load(key: tuple, load, max_age: Optional[float]) -> tuple[MeetingIndex, Optional[int]]:
+    return cache.data_cache.get_or_load(
+        key, load, fallback_errors=(circuit_breaker.CircuitOpenError,), max_age=max_age
+    )
+
+
+def _load_all(token: Optional[str], max_age: Optional[float]) -> MeetingIndex:
+    """Return every meeting, fetched and cached once per user, for a backend without windows."""
+    return _load(("meetings", token), lambda: _request_meetings(token), max_age)[0]
+
+
+def _load_window_page(
+    token: Optional[str], start: Optional[datetime], end: Optional[datetime], page_number: int, per_page: int,
+    max_age: Optional[float],
+) -> tuple[MeetingIndex, int]:
+    """Return one backend page of a window and the window's total.
+
+    Raises:
+        _WindowsUnsupported: If the backend ignored the window; its full list is then
+            cached for _load_all.
+    """
+    global _windows_unsupported
+    index, total = _load(
+        ("meetings", token, start, end, page_number, per_page),
+        lambda: _request_meetings(token, _window_params(start, end, page_number, per_page)),
+        max_age,
+    )
+    if total is None:
+        _windows_unsupported = True
+        cache.data_cache.invalidate(lambda key, value: key[0] == "meetings" and len(key) > 2)
+        cache.data_cache.set(("meetings", token), (index, None))
+        raise _WindowsUnsupported()
+    return index, total
+
+
+def _window_slice(
+    token: Optional[str], start: Optional[datetime], end: Optional[datetime], page_number: int, per_page: int,
+    max_age: Optional[float],
+) -> tuple[list, int]:
+    """Return a page of meetings in [start, end) from the backend's pages of the rounded window."""
+    request_start = start.replace(minute=0, second=0, microsecond=0) if start else None
+    skipped = 0
+    if request_start != start:
+        # Meetings in [request_start, start) come first in the window; count them
+        number = 1
+        while True:
+            index, total = _load_window_page(token, request_start, end, number, per_page, max_age)
+            before = len(index.between(None, start))
+            skipped += before
+            if before < len(index) or number * per_page >= total:
+                break
+            number += 1
+    offset = (page_number - 1) * per_page + skipped
+    number = offset // per_page + 1
+    index, total = _load_window_page(token, request_start, end, number, per_page, max_age)
+    meetings = list(index)[offset - (number - 1) * per_page:]
+    if len(meetings) < per_page and number * per_page < total:
+        meetings += list(_load_window_page(token, request_start, end, number + 1, per_page, max_age)[0])
+    return meetings[:per_page], max(0, total - skipped)
+
+
+def fetch_meetings(
+    token: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    page_number: int = 1,
+    per_page: int = MEETINGS_PER_PAGE,
+    max_age: Optional[float] = None,
+) -> tuple[bool, any]:
+    """Fetch one page of meetings in a time window, served from the read cache when possible.
+
+    While the meetings circuit breaker is open, an expired cached copy is served if one exists.
+
+    Args:
+        token (str, optional): JWT token of the current user
+        start (datetime, optional): Earliest meeting time (inclusive)
+        end (datetime, optional): Latest meeting time (exclusive)
+        page_number (int): 1-based page number
+        per_page (int): Number of meetings per page
+        max_age (float, optional): Refetch a cached page older than this many seconds
+
+    Returns:
+        tuple: A tuple where the first element is a boolean indicating success, and the second is either
+        a (meetings on the page, total meetings in the window) tuple or an error message.
+    """
+    try:
+        if not _windows_unsupported:
+            try:
+                return True, _window_slice(token, start, end, page_number, per_page, max_age)
+            except _WindowsUnsupported:
+                pass
+        # The backend returns every meeting; select the window from the index
+        window = _load_all(token, max_age).between(start, end)
+        offset = (page_number - 1) * per_page
+        return True, (window[offset:offset + per_page], len(window))
+    except circuit_breaker.CircuitOpenError:
+        return False, "The meetings service is unavailable. Please try again shortly."
+    except requests.HTTPError as e:
+        return False, str(e)
     except Exception as e:
         logging.error(e, exc_info=True)
         return False, "An error occurred while fetching the meetings."
 
 
-def render_meeting_appointment_page() -> None:
-    """Render the Meeting Appointment Page with creation form and meetings listing."""
-    st.header("Meeting Appointment Page")
-
-    # Meeting creation form
+@st.fragment
+def render_meeting_form() -> None:
+    """Render the meeting creation form; only a successful creation reruns the whole page."""
     with st.form("meeting_form", clear_on_submit=True):
         meeting_date = st.date_input("Meeting Date")
         meeting_time = st.time_input("Meeting Time")
@@ -67,14 +271,13 @@ def render_meeting_appointment_page() -> None:
                 elif not location.strip():
                     st.error("Location cannot be empty.")
                 else:
-                    participants = [email.strip() for email in participants_input.split(",") if email.strip()]
-                    # Validate participant emails if provided
-                    for email in participants:
-                        try:
-                            validate_email(email)
-                        except EmailNotValidError:
+                    participants = list(dict.fromkeys(email.strip() for email in participants_input.split(",") if email.strip()))
+                    # Validate participant emails if provided; distinct domains are checked concurrently
+                    invalid = [email for email, error in validation.validate_many(participants).items() if error]
+                    if invalid:
+                        for email in invalid:
                             st.error(f"Invalid email: {email}")
-                            return
+                        return
                     payload = {
                         "time": meeting_datetime.isoformat(),
                         "location": location.strip(),
@@ -82,26 +285,78 @@ def render_meeting_appointment_page() -> None:
                     }
                     success, message = create_meeting(payload)
                     if success:
-                        st.success(message)
+                        st.session_state.meeting_created = message
+                        # Show the new meeting in the list
+                        st.rerun()
                     else:
                         st.error(message)
             except Exception as e:
                 logging.error(e, exc_info=True)
                 st.error("An error occurred while processing the form.")
 
-    # Meeting listing section
+
+def _meetings_view(meetings: list, total: int) -> tuple[list[dict], int, str]:
+    """Return the table rows for a page of meetings, reusing the previous rows if nothing changed."""
+    fingerprint = hash((tuple(meetings), total))
+    view = st.session_state.get(MEETINGS_VIEW_KEY)
+    if view is None or view[0] != fingerprint:
+        view = (fingerprint, [meeting.to_row() for meeting in meetings], datetime.now().strftime("%H:%M:%S"))
+        st.session_state[MEETINGS_VIEW_KEY] = view
+    return view[1], total, view[2]
+
+
+@st.fragment(run_every=config.MEETINGS_REFRESH_SECONDS or None)
+def render_meetings_list() -> None:
+    """Render the meetings list; reruns on its own to pick up meetings created elsewhere."""
     st.subheader("Meetings List")
 
-    # A refresh button - when clicked, the page will rerun
+    # Changing the window starts again from its first page
+    st.radio(
+        "Show",
+        MEETING_WINDOWS,
+        horizontal=True,
+        key="meetings_window",
+        on_change=lambda: st.session_state.update(meetings_page=1),
+    )
+
+    # A refresh button - when clicked, this list is refetched; other users' cached lists are left alone
+    max_age = config.MEETINGS_REFRESH_SECONDS or None
     if st.button("Refresh Meetings"):
-        pass  # The page refreshes naturally on button click
+        max_age = 0
 
-    success, meetings_or_error = fetch_meetings()
-    if success:
-        meetings = meetings_or_error
-        if meetings:
-            st.table(meetings)
-        else:
-            st.info("No meetings scheduled.")
-    else:
+    token = session.get_token()
+    start, end = meeting_window(st.session_state.get("meetings_window", MEETING_WINDOWS[0]))
+    page_number = int(st.session_state.get("meetings_page", 1))
+    success, meetings_or_error = fetch_meetings(token, start, end, page_number, max_age=max_age)
+    if not success:
         st.error(meetings_or_error)
+        return
+
+    meetings, total = meetings_or_error
+    page_count = max(1, math.ceil(total / MEETINGS_PER_PAGE))
+    if page_number > page_count:
+        # Meetings left the window since the page was selected; show the last page instead
+        page_number = page_count
+        st.session_state.meetings_page = page_number
+        success, meetings_or_error = fetch_meetings(token, start, end, page_number, max_age=max_age)
+        meetings, total = meetings_or_error if success else ([], 0)
+
+    if not meetings:
+        st.info("No meetings scheduled.")
+        return
+
+    rows, total, changed_at = _meetings_view(meetings, total)
+    st.table(rows)
+    if page_count > 1:
+        st.number_input("Page", min_value=1, max_value=page_count, step=1, key="meetings_page")
+    st.caption(f"{total} meetings (last change seen at {changed_at})")
+
+
+def render_meeting_appointment_page() -> None:
+    """Render the Meeting Appointment Page with creation form and meetings listing."""
+    st.header("Meeting Appointment Page")
+    message = st.session_state.pop("meeting_created", None)
+    if message:
+        st.success(message)
+    render_meeting_form()
+    render_meetings_list()
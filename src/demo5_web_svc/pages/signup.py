@@ -1,12 +1,9 @@
-import os
 import logging
 
 import streamlit as st
-import requests
-from email_validator import validate_email, EmailNotValidError
+from email_validator import EmailNotValidError
 
-# Set page configuration
-st.set_page_config(page_title="Signup", layout="centered")
+from demo5_web_svc import http_client, session, validation
 
 
 def validate_inputs(email: str, password: str, oauth_token: str) -> (bool, str):
@@ -19,8 +16,8 @@ def validate_inputs(email: str, password: str, oauth_token: str) -> (bool, str):
     :return: Tuple of (is_valid, error_message)
     """
     try:
-        # Validate email using email_validator with deliverability check disabled
-        validate_email(email, check_deliverability=False)
+        # Validate email syntax only; deliverability is not checked at signup
+        validation.validate_address(email, check_deliverability=False)
     except EmailNotValidError as e:
         return False, f"Invalid email: {str(e)}"
 
@@ -42,8 +39,6 @@ def perform_signup_request(email: str, password: str, oauth_token: str) -> (bool
     :param oauth_token: Google OAuth token/authorization code
     :return: Tuple of (is_success, message_or_token)
     """
-    auth_service_url = os.getenv("AUTH_SERVICE_URL", "http://localhost:5000")
-    url = f"{auth_service_url}/api/signup"
     payload = {
         "email": email,
         "password": password,
@@ -52,7 +47,7 @@ def perform_signup_request(email: str, password: str, oauth_token: str) -> (bool
     headers = {"Content-Type": "application/json"}
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=5)
+        response = http_client.post("/api/signup", json=payload, headers=headers, timeout=5)
         response.raise_for_status()
         data = response.json()
         if "jwt_token" in data:
@@ -85,10 +80,12 @@ def render_signup_page() -> None:
             if success:
                 st.success("Signup successful!")
                 # Store JWT token in session state
-                st.session_state['jwt_token'] = result
+                session.store_token(result)
             else:
                 st.error(result)
 
 
 if __name__ == "__main__":
+    # Set page configuration when run standalone; app.py configures it otherwise
+    st.set_page_config(page_title="Signup", layout="centered")
     render_signup_page()
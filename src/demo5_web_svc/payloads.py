@@ -0,0 +1,203 @@
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import requests
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+
+from demo5_web_svc import config, metrics, streaming
+
+try:
+    import msgpack
+except ImportError:  # Optional: installed with the fast-payloads extra
+    msgpack = None
+
+"""
+Content negotiation and decoding of backend list responses.
+
+Every backend request advertises the compressions urllib3 can decode: gzip and deflate,
+plus zstd with urllib3 2.6 or later when backports.zstd is installed (Python 3.14 has it
+built in). The response body is decompressed transparently while it is read. List reads
+through http_client.get_json additionally accept msgpack when the msgpack package is
+installed and config.HTTP_BINARY_PAYLOADS is on, with JSON as the fallback, so a backend
+that only speaks JSON keeps working.
+
+The functions below decode a response in whichever format the backend chose, streaming
+the body chunk by chunk where the JSON path in the streaming module does, and record the
+decode time and the wire and decoded body sizes per endpoint in the metrics module.
+"""
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+
+def accept_encoding() -> str:
+    """Return the Accept-Encoding header sent with every backend request."""
+    return DEFAULT_ACCEPT_ENCODING if config.HTTP_COMPRESSION else "identity"
+
+
+def accept() -> str:
+    """Return the Accept header for list reads: msgpack first when available, JSON always."""
+    if msgpack is not None and config.HTTP_BINARY_PAYLOADS:
+        return f"{MSGPACK}, {JSON};q=0.9"
+    return JSON
+
+
+def content_format(response: requests.Response) -> str:
+    """Return "msgpack" or "json" for a response, from its Content-Type."""
+    content_type = response.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+    return "msgpack" if content_type in _MSGPACK_TYPES else "json"
+
+
+class _CountedChunks:
+    """Iterates over the decompressed body chunks of a response, counting their bytes."""
+
+    def __init__(self, response: requests.Response):
+        self._chunks = response.iter_content(streaming.CHUNK_SIZE)
+        self.size = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self.size += len(chunk)
+            yield chunk
+
+
+def _wire_size(response: requests.Response, body_size: int) -> int:
+    """Bytes received for the body, before decompression."""
+    raw = getattr(response, "raw", None)
+    if raw is not None and hasattr(raw, "tell"):
+        try:
+            return raw.tell()
+        except (OSError, ValueError):
+            pass
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else body_size
+
+
+def _record(response: requests.Response, started: float, body_size: int) -> None:
+    request = getattr(response, "request", None)
+    if request is None:
+        return
+    encoding = response.headers.get("Content-Encoding", "identity").lower()
+    metrics.record_payload(
+        request.method,
+        request.path_url,
+        f"{content_format(response)}+{encoding}",
+        time.perf_counter() - started,
+        _wire_size(response, body_size),
+        body_size,
+    )
+
+
+class _MsgpackStream:
+    """Msgpack objects unpacked from a byte-chunk iterator as the chunks arrive."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        if msgpack is None:
+            raise ValueError("Received a msgpack body but the msgpack package is not installed")
+        self._chunks = iter(chunks)
+        self._unpacker = msgpack.Unpacker(raw=False)
+        self._first = b""
+
+    def _next(self, read):
+        while True:
+            try:
+                return read()
+            except msgpack.OutOfData:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    raise ValueError("Truncated msgpack body")
+                self._unpacker.feed(chunk)
+
+    def is_array(self) -> bool:
+        """Whether the body is a top-level array, judged by its first byte."""
+        while not self._first:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                raise ValueError("Empty msgpack body")
+            self._first = chunk[:1]
+            self._unpacker.feed(chunk)
+        marker = self._first[0]
+        return 0x90 <= marker <= 0x9F or marker in (0xDC, 0xDD)
+
+    def value(self) -> Any:
+        """Unpack the next complete object."""
+        return self._next(self._unpacker.unpack)
+
+    def elements(self) -> Iterator[Any]:
+        """Yield the elements of a top-level array one at a time."""
+        for _ in range(self._next(self._unpacker.read_array_header)):
+            yield self.value()
+
+
+def decode(response: requests.Response, loads: Optional[Callable[[bytes], Any]] = None) -> Any:
+    """Decode a whole response body.
+
+    Args:
+        response (requests.Response): A response with a JSON or msgpack body
+        loads (Callable, optional): Decodes a JSON body from its bytes instead of
+            response.json(), e.g. straight into models
+    """
+    started = time.perf_counter()
+    body = response.content
+    if content_format(response) == "msgpack":
+        if msgpack is None:
+            raise ValueError("Received a msgpack body but the msgpack package is not installed")
+        data = msgpack.unpackb(body, raw=False)
+    else:
+        data = response.json() if loads is None else loads(body)
+    _record(response, started, len(body))
+    return data
+
+
+def parse_window(response: requests.Response, start: int, stop: int) -> dict:
+    """Stream-decode a list body, keeping only the elements in [start, stop).
+
+    Returns:
+        dict: For an array body, {"items": <window>, "total": <element count>}. An object
+        body (an already paginated response) is decoded and returned unchanged.
+    """
+    started = time.perf_counter()
+    chunks = _CountedChunks(response)
+    if content_format(response) != "msgpack":
+        data = streaming.parse_window(chunks, start, stop)
+    else:
+        stream = _MsgpackStream(chunks)
+        if stream.is_array():
+            items, total = [], 0
+            for value in stream.elements():
+                if start <= total < stop:
+                    items.append(value)
+                total += 1
+            data = {"items": items, "total": total}
+        else:
+            data = stream.value()
+    _record(response, started, chunks.size)
+    return data
+
+
+def iter_items(response: requests.Response) -> tuple[Optional[dict], Iterator[Any]]:
+    """Iterate over the list items of a streamed body.
+
+    Returns:
+        tuple: For an array body, None and a lazy iterator over its elements. For an object
+        body (an already paginated response), the decoded object and an iterator over its
+        "items". The decode is recorded once the iterator is exhausted.
+    """
+    started = time.perf_counter()
+    chunks = _CountedChunks(response)
+    if content_format(response) != "msgpack":
+        envelope, items = streaming.iter_items(chunks)
+    else:
+        stream = _MsgpackStream(chunks)
+        if stream.is_array():
+            envelope, items = None, stream.elements()
+        else:
+            envelope = stream.value()
+            items = iter(envelope.get("items", []))
+
+    def recorded() -> Iterator[Any]:
+        yield from items
+        _record(response, started, chunks.size)
+
+    return envelope, recorded()
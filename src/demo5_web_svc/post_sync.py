@@ -0,0 +1,273 @@
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import requests
+
+from demo5_web_svc import circuit_breaker, config, http_client, payloads, search, session, singleflight
+from demo5_web_svc.models import Post, parse_posts
+
+"""
+Delta sync of forum posts.
+
+Refreshing a page of the forum normally re-downloads it even though usually only a
+handful of posts changed. With config.FORUM_DELTA_SYNC, the forum page is served from a
+local copy of every post instead. The copy is loaded in full once, then kept current by
+asking the backend only for what changed since the last sync:
+
+    GET /forum?updated_since=<cursor>
+    -> {"items": [<changed post>, {"id": 7, "deleted": true}, ...], "cursor": "<next>"}
+
+Created and updated posts are merged into the copy by id, and tombstones ("deleted":
+true) remove posts. The cursor is opaque and comes from the previous answer; "0" asks
+for every live post. When the backend no longer has the changes since a cursor (410 Gone,
+a sync gap), the copy is reloaded in full. A backend that ignores updated_since (no
+"cursor" in the answer) is remembered as unsupported, and the forum falls back to
+fetching pages.
+
+What the backend returns depends on the token, so like the search indexes there is one
+copy per scope (session.scope_for), synced with tokens of that scope only; a token that
+did not come from the auth service gets a copy of its own, so the backend sees it before
+it is served anything. At most config.FORUM_SYNC_MAX_SCOPES copies are kept, dropping the
+least recently used. Syncs run at most every config.FORUM_SYNC_SECONDS, and sessions of
+a scope that need one at the same time share a single backend call.
+"""
+
+FULL_SYNC_CURSOR = "0"
+
+
+class SyncUnsupportedError(Exception):
+    """Raised when the backend does not support delta sync."""
+
+
+class PostList:
+    """Every live forum post, ordered by id, with the cursor it is current as of."""
+
+    def __init__(self):
+        self._posts: dict[int, Post] = {}
+        self._ids: list[int] = []  # Sorted, so pages are slices
+        self._lock = threading.Lock()
+        self.cursor: Optional[str] = None
+        self.synced_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def replace(self, posts: Iterable[Post], cursor: str) -> list[int]:
+        """Replace the whole list with a full load; return the ids it no longer has."""
+        loaded = {post.id: post for post in posts if post.id is not None}
+        with self._lock:
+            removed = [post_id for post_id in self._ids if post_id not in loaded]
+            self._posts = loaded
+            self._ids = sorted(loaded)
+            self.cursor = cursor
+            self.synced_at = time.monotonic()
+        return removed
+
+    def apply(self, changed: Iterable[Post], deleted: Iterable[int], cursor: Optional[str] = None) -> None:
+        """Merge created and updated posts and drop deleted ones.
+
+        Without a cursor (a write this process made itself), the cursor and sync time are
+        left alone, so the next sync still fetches the change and applies it again. Such
+        writes are ignored until the list has been loaded.
+        """
+        with self._lock:
+            if cursor is None and self.cursor is None:
+                return
+            for post in changed:
+                if post.id is None:
+                    continue
+                if post.id not in self._posts:
+                    insort(self._ids, post.id)
+                self._posts[post.id] = post
+            for post_id in deleted:
+                if self._posts.pop(post_id, None) is not None:
+                    del self._ids[bisect_left(self._ids, post_id)]
+            if cursor is not None:
+                self.cursor = cursor
+                self.synced_at = time.monotonic()
+
+    def page(self, page_number: int, per_page: int) -> tuple[list[Post], int]:
+        """Return one page of posts and the total number of posts."""
+        start = (page_number - 1) * per_page
+        with self._lock:
+            return [self._posts[post_id] for post_id in self._ids[start:start + per_page]], len(self._ids)
+
+    def all(self) -> list[Post]:
+        """Return every post, in id order."""
+        with self._lock:
+            return [self._posts[post_id] for post_id in self._ids]
+
+    def expire(self) -> None:
+        """Make the next load sync first."""
+        self.synced_at = 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._posts = {}
+            self._ids = []
+            self.cursor = None
+            self.synced_at = 0.0
+
+
+_lists: OrderedDict[str, PostList] = OrderedDict()
+_lists_lock = threading.Lock()
+_flights = singleflight.Group()
+_stats_lock = threading.Lock()
+_stats = {"full_syncs": 0, "delta_syncs": 0, "changes": 0, "gaps": 0}
+# Set once the backend has ignored updated_since
+_unsupported = False
+
+
+def supported() -> bool:
+    """Whether delta sync is enabled and not known to be unsupported by the backend."""
+    return config.FORUM_DELTA_SYNC and not _unsupported
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _request_changes(token: str, cursor: str) -> Optional[tuple[list[Post], list[int], str]]:
+    """Ask the backend for the posts changed since cursor.
+
+    Returns:
+        tuple: Changed posts, deleted ids and the new cursor, or None on a sync gap.
+
+    Raises:
+        SyncUnsupportedError: If the backend ignored updated_since.
+        requests.RequestException: If the backend call fails.
+    """
+    global _unsupported
+    headers = {"Authorization": f"Bearer {token}", "Accept": payloads.accept()}
+    response = http_client.get("/forum", headers=headers, params={"updated_since": cursor}, stream=True)
+    try:
+        if response.status_code == 410:
+            return None
+        response.raise_for_status()
+        envelope, items = payloads.iter_items(response)
+        if envelope is None or envelope.get("cursor") is None:
+            _unsupported = True
+            raise SyncUnsupportedError("The backend does not support updated_since")
+        changed, deleted = [], []
+        for item in items:
+            if item.get("deleted"):
+                deleted.append(item["id"])
+            else:
+                changed.append(item)
+        return parse_posts(changed), deleted, str(envelope["cursor"])
+    finally:
+        response.close()
+
+
+def posts_for(token: str) -> PostList:
+    """Return the copy of the token's scope, adding an empty one if there is none."""
+    scope = session.scope_for(token)
+    with _lists_lock:
+        posts = _lists.get(scope)
+        if posts is None:
+            posts = _lists[scope] = PostList()
+            while len(_lists) > config.FORUM_SYNC_MAX_SCOPES:
+                _lists.popitem(last=False)
+        else:
+            _lists.move_to_end(scope)
+        return posts
+
+
+def apply(token: str, changed: Iterable[Post] = (), deleted: Iterable[int] = ()) -> None:
+    """Apply a write made with a token to the copy of its scope, if there is one."""
+    with _lists_lock:
+        posts = _lists.get(session.scope_for(token))
+    if posts is not None:
+        posts.apply(changed, deleted)
+
+
+def expire() -> None:
+    """Make the next load of every copy sync first."""
+    with _lists_lock:
+        for posts in _lists.values():
+            posts.expire()
+
+
+def _sync(posts: PostList, token: str) -> None:
+    if posts.cursor is not None:
+        changes = _request_changes(token, posts.cursor)
+        if changes is not None:
+            changed, deleted, cursor = changes
+            posts.apply(changed, deleted, cursor)
+            _count("delta_syncs")
+            _count("changes", len(changed) + len(deleted))
+            # Keep search current with changes made elsewhere; a build in progress handles them too
+            search.update(token, changed, deleted)
+            return
+        logging.info("Forum sync gap after cursor %s; reloading all posts", posts.cursor)
+        _count("gaps")
+    changes = _request_changes(token, FULL_SYNC_CURSOR)
+    if changes is None:
+        raise requests.HTTPError("The backend refused a full forum sync")
+    changed, _, cursor = changes
+    reloaded = posts.cursor is not None
+    removed = posts.replace(changed, cursor)
+    _count("full_syncs")
+    if reloaded:
+        # A search index built from the previous copy must follow it
+        search.update(token, changed, removed)
+
+
+def sync(token: str) -> None:
+    """Bring the token's copy up to date, sharing the backend call with concurrent callers of its scope."""
+    posts = posts_for(token)
+    _flights.do(session.scope_for(token), lambda: _sync(posts, token))
+
+
+def load_page(token: str, page_number: int, per_page: int) -> tuple[list[Post], int]:
+    """Return a page of posts from the token's copy, syncing it first when it is due.
+
+    Raises:
+        SyncUnsupportedError: If the backend does not support delta sync.
+        requests.RequestException: If a sync is due and fails.
+    """
+    ensure_synced(token)
+    return posts_for(token).page(page_number, per_page)
+
+
+def ensure_synced(token: str) -> None:
+    """Sync the token's copy if it was never loaded or is older than config.FORUM_SYNC_SECONDS.
+
+    While the forum circuit is open, the copy is left as it is, if there is one.
+
+    Raises:
+        SyncUnsupportedError: If the backend does not support delta sync.
+        requests.RequestException: If a sync is due and fails.
+    """
+    posts = posts_for(token)
+    if posts.cursor is None or time.monotonic() - posts.synced_at >= config.FORUM_SYNC_SECONDS:
+        try:
+            sync(token)
+        except circuit_breaker.CircuitOpenError as e:
+            if posts.cursor is None:
+                raise
+            logging.warning("Serving the forum as of cursor %s: %s", posts.cursor, e)
+
+
+def stats() -> dict:
+    """Return full and delta sync counts, changes applied, sync gaps, the number of copies and their posts."""
+    with _lists_lock:
+        lists = list(_lists.values())
+    with _stats_lock:
+        return dict(_stats, scopes=len(lists), posts=sum(len(posts) for posts in lists))
+
+
+def reset() -> None:
+    """Drop the local copies and the counters, and forget an unsupported backend."""
+    global _unsupported
+    with _lists_lock:
+        _lists.clear()
+    _unsupported = False
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
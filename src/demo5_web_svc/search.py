@@ -0,0 +1,299 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from demo5_web_svc import config, http_client, payloads, session
+from demo5_web_svc.models import Post, parse_posts
+
+"""
+In-memory inverted index for forum search.
+
+Maps every lower-cased word of a post's title and content to the ids of the posts that
+contain it, so a query only intersects the posting sets of its words instead of scanning
+every post. The last query word also matches as a prefix, which keeps results useful while
+the user is still typing. Results are ordered by post id, like the forum listing.
+
+What the backend returns depends on the token, so there is one index per scope
+(session.scope_for), built with a token of that scope when the scope first searches; at
+most config.SEARCH_MAX_INDEXES are kept, dropping the least recently used. An index is
+built once, on a single background worker of its own so that it never holds up page
+loads on the loader pool, and then updated incrementally: the forum page's write paths
+and the post_sync module call update. With delta sync (config.FORUM_DELTA_SYNC), the
+index is built from the scope's synced copy of the forum, and a search syncs that copy
+every config.SEARCH_REFRESH_SECONDS, which brings in the posts other processes and
+clients changed. Otherwise the whole forum is streamed from the backend, and the index
+is rebuilt in place every config.SEARCH_REBUILD_SECONDS; the previous contents keep
+serving searches meanwhile.
+"""
+
+BUILD_PAGE_SIZE = 1000
+MAX_CACHED_QUERIES = 64
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-cased words."""
+    return _WORD.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index from words to post ids, updated incrementally."""
+
+    def __init__(self):
+        self._postings: dict[str, set[int]] = {}
+        self._vocabulary: list[str] = []  # Sorted, for prefix lookups
+        self._posts: dict[int, Post] = {}
+        self._lock = threading.Lock()
+        # Sorted ids per normalized query, dropped whenever the index changes
+        self._results: OrderedDict[tuple, list[int]] = OrderedDict()
+        # Ids written while a build is streaming the forum; the build must not overwrite them
+        self._touched: Optional[set[int]] = None
+        self.ready = False
+        self.built_at = 0.0
+        self.refreshed_at = 0.0
+        self.building: Optional[Future] = None
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def add(self, post: Post, from_build: bool = False) -> None:
+        """Index a post, replacing the previous version with the same id."""
+        if post.id is None:
+            return
+        with self._lock:
+            if from_build and self._touched is not None and post.id in self._touched:
+                return
+            if not from_build and self._touched is not None:
+                self._touched.add(post.id)
+            self._remove(post.id)
+            self._posts[post.id] = post
+            for word in set(tokenize(post.title) + tokenize(post.content)):
+                ids = self._postings.get(word)
+                if ids is None:
+                    ids = self._postings[word] = set()
+                    insort(self._vocabulary, word)
+                ids.add(post.id)
+            self._results.clear()
+
+    def remove(self, post_id: int) -> None:
+        """Drop a post from the index."""
+        with self._lock:
+            if self._touched is not None:
+                self._touched.add(post_id)
+            self._remove(post_id)
+            self._results.clear()
+
+    def _remove(self, post_id: int) -> None:
+        post = self._posts.pop(post_id, None)
+        if post is None:
+            return
+        for word in set(tokenize(post.title) + tokenize(post.content)):
+            ids = self._postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(post_id)
+            if not ids:
+                del self._postings[word]
+                del self._vocabulary[bisect_left(self._vocabulary, word)]
+
+    def _matching(self, word: str, prefix: bool) -> set[int]:
+        if not prefix:
+            return self._postings.get(word, set())
+        ids: set[int] = set()
+        index = bisect_left(self._vocabulary, word)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(word):
+            ids |= self._postings[self._vocabulary[index]]
+            index += 1
+        return ids
+
+    def search(self, query: str) -> list[int]:
+        """Return the ids of posts containing every word of the query, in id order."""
+        words = tuple(tokenize(query))
+        if not words:
+            return []
+        with self._lock:
+            cached = self._results.get(words)
+            if cached is not None:
+                self._results.move_to_end(words)
+                return cached
+            sets = [self._matching(word, prefix=False) for word in words[:-1]]
+            sets.append(self._matching(words[-1], prefix=True))
+            sets.sort(key=len)
+            ids = set(sets[0])
+            for other in sets[1:]:
+                ids &= other
+                if not ids:
+                    break
+            result = sorted(ids)
+            self._results[words] = result
+            while len(self._results) > MAX_CACHED_QUERIES:
+                self._results.popitem(last=False)
+            return result
+
+    def page(self, query: str, page_number: int, per_page: int) -> tuple[list[Post], int]:
+        """Return one page of matching posts and the number of matches."""
+        ids = self.search(query)
+        start = (page_number - 1) * per_page
+        with self._lock:
+            posts = [self._posts[post_id] for post_id in ids[start:start + per_page] if post_id in self._posts]
+        return posts, len(ids)
+
+    def build(self, posts: Iterable[Post]) -> int:
+        """Index posts streamed from the backend and mark the index ready.
+
+        On a rebuild, posts that were not streamed are dropped, unless they were written
+        while the build ran.
+        """
+        with self._lock:
+            self._touched = set()
+        count = 0
+        streamed = set()
+        try:
+            for post in posts:
+                self.add(post, from_build=True)
+                streamed.add(post.id)
+                count += 1
+            with self._lock:
+                for post_id in set(self._posts) - streamed - self._touched:
+                    self._remove(post_id)
+                self._results.clear()
+            self.ready = True
+            self.built_at = self.refreshed_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._touched = None
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._vocabulary.clear()
+            self._posts.clear()
+            self._results.clear()
+            self.ready = False
+            self.built_at = self.refreshed_at = 0.0
+            self.building = None
+
+
+def _stream_posts(token: str) -> Iterable[Post]:
+    """Yield every forum post, a page of BUILD_PAGE_SIZE at a time.
+
+    A backend without server-side pagination returns the whole forum in the first
+    response, which is parsed as a stream.
+    """
+    headers = {"Authorization": f"Bearer {token}", "Accept": payloads.accept()}
+    offset = 0
+    while True:
+        response = http_client.get(
+            "/forum", headers=headers, params={"limit": BUILD_PAGE_SIZE, "offset": offset}, stream=True
+        )
+        try:
+            response.raise_for_status()
+            envelope, items = payloads.iter_items(response)
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) == BUILD_PAGE_SIZE:
+                    yield from parse_posts(batch)
+                    batch = []
+            yield from parse_posts(batch)
+        finally:
+            response.close()
+        if envelope is None:
+            return
+        count = len(envelope.get("items", []))
+        offset += count
+        if count == 0 or offset >= envelope.get("total", offset):
+            return
+
+
+def _synced_posts(token: str) -> Optional[list[Post]]:
+    """Sync the token's copy of the forum and return its posts, or None without delta sync."""
+    # post_sync imports this module to keep indexes current
+    from demo5_web_svc import post_sync
+
+    if not post_sync.supported():
+        return None
+    try:
+        post_sync.ensure_synced(token)
+    except post_sync.SyncUnsupportedError:
+        return None
+    return post_sync.posts_for(token).all()
+
+
+def _build(index: SearchIndex, token: str) -> int:
+    posts = _synced_posts(token)
+    count = index.build(_stream_posts(token) if posts is None else posts)
+    logging.info("Search index built with %d posts", count)
+    return count
+
+
+def _refresh(index: SearchIndex, token: str) -> None:
+    """Bring an index up to date through delta sync, which updates it with the changes."""
+    if _synced_posts(token) is not None:
+        index.refreshed_at = time.monotonic()
+
+
+_indexes: OrderedDict[str, SearchIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+# Builds and refreshes run one at a time, off the loader pool that pages load with
+_builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index")
+
+
+def find(token: str) -> Optional[SearchIndex]:
+    """Return the index of the token's scope, or None if the scope has none."""
+    with _indexes_lock:
+        return _indexes.get(session.scope_for(token))
+
+
+def index_for(token: str) -> SearchIndex:
+    """Return the index of the token's scope, adding an empty one if there is none."""
+    scope = session.scope_for(token)
+    with _indexes_lock:
+        index = _indexes.get(scope)
+        if index is None:
+            index = _indexes[scope] = SearchIndex()
+            while len(_indexes) > config.SEARCH_MAX_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(scope)
+        return index
+
+
+def ensure_index(token: str) -> bool:
+    """Start building or refreshing the token's index in the background if due; return whether it is ready."""
+    index = index_for(token)
+    now = time.monotonic()
+    task = None
+    if not index.ready or now - index.built_at >= config.SEARCH_REBUILD_SECONDS:
+        task = _build
+    elif now - index.refreshed_at >= config.SEARCH_REFRESH_SECONDS:
+        task = _refresh
+    if task is not None:
+        with _indexes_lock:
+            if index.building is None or index.building.done():
+                index.building = _builder.submit(task, index, token)
+    return index.ready
+
+
+def update(token: str, changed: Iterable[Post] = (), deleted: Iterable[int] = ()) -> None:
+    """Apply posts written or synced with a token to the index of its scope, if there is one."""
+    index = find(token)
+    if index is None:
+        return
+    for post in changed:
+        index.add(post)
+    for post_id in deleted:
+        index.remove(post_id)
+
+
+def clear() -> None:
+    """Drop every index."""
+    with _indexes_lock:
+        _indexes.clear()
@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import requests
+import streamlit as st
+
+from demo5_web_svc import cache, config, http_client, shared_cache
+from demo5_web_svc.claims import TOKEN_KEY, decode_claims, is_admin
+
+"""
+JWT-aware session layer.
+
+The token returned by login or signup is kept in st.session_state['jwt_token']. This
+module decodes its expiry locally (the signature is not verified; that is the backend's
+job) so pages can skip backend calls that are sure to fail, refreshes the token shortly
+before it expires, and handles 401 responses in one place by dropping the token and
+asking the user to log in again.
+
+Data kept process-wide rather than per session (the search indexes, the synced forum
+posts) is keyed by scope_for, following the shared store's scoping: a token stored here
+came from the auth service and shares its user's scope, any other token gets its own.
+"""
+
+EXPIRED_KEY = "jwt_expired"
+MAX_SCOPED_TOKENS = 10000
+
+# Set once the backend has answered the refresh endpoint with 404/405
+_refresh_unsupported = False
+# Scopes of the tokens stored by this process, least recently used first
+_scopes: OrderedDict[str, str] = OrderedDict()
+_scopes_lock = threading.Lock()
+
+
+class SessionExpiredError(Exception):
+    """Raised instead of calling the backend with a token known to be expired."""
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """Return the token's expiry as a UNIX timestamp, or None if it has none."""
+    exp = decode_claims(token).get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def is_expired(token: str, leeway: float = config.JWT_EXPIRY_LEEWAY_SECONDS) -> bool:
+    """Return True if the token is known to be expired. Tokens without an expiry never are."""
+    expiry = token_expiry(token)
+    return expiry is not None and expiry - leeway <= time.time()
+
+
+def ensure_valid(token: str) -> None:
+    """Raise SessionExpiredError if the token is known to be expired.
+
+    Safe to call from the loader pool: it does not touch Streamlit.
+    """
+    if is_expired(token):
+        raise SessionExpiredError("Session token has expired")
+
+
+def is_unauthorized(error: Exception) -> bool:
+    """Return True if an exception means the session is no longer authorized."""
+    if isinstance(error, SessionExpiredError):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 401
+
+
+def scope_for(token: str) -> str:
+    """Return the scope of the process-wide data loaded with a token.
+
+    Safe to call from the loader pool: it does not touch Streamlit.
+    """
+    with _scopes_lock:
+        scope = _scopes.get(token)
+        if scope is not None:
+            _scopes.move_to_end(token)
+            return scope
+    if cache.shared_store is not None:
+        scope = cache.shared_store.scope_for(token)
+        if scope is not None:
+            return scope
+    return shared_cache.token_scope(token)
+
+
+def store_token(token: str) -> None:
+    """Store a freshly issued token in the session.
+
+    The token came from the auth service, so it is mapped to its user's scope, here and in
+    the store shared between processes, which then serves this user's entries for it.
+    """
+    st.session_state[TOKEN_KEY] = token
+    st.session_state[EXPIRED_KEY] = False
+    if not token:
+        return
+    subject = decode_claims(token).get("sub")
+    with _scopes_lock:
+        _scopes[token] = shared_cache.token_scope(token, subject)
+        _scopes.move_to_end(token)
+        while len(_scopes) > MAX_SCOPED_TOKENS:
+            _scopes.popitem(last=False)
+    if cache.shared_store is not None:
+        cache.shared_store.trust(token, subject, token_expiry(token))
+
+
+def clear_token() -> None:
+    """Drop the session's token and remember that it expired."""
+    st.session_state[TOKEN_KEY] = None
+    st.session_state[EXPIRED_KEY] = True
+
+
+def handle_unauthorized() -> None:
+    """Central handling for expired or rejected tokens."""
+    clear_token()
+    st.error("Your session has expired. Please log in again.")
+
+
+def refresh_token(token: str) -> Optional[str]:
+    """Exchange a still-valid token for a new one; return None if that is not possible."""
+    global _refresh_unsupported
+    if _refresh_unsupported:
+        return None
+    try:
+        response = http_client.post("/api/refresh", headers={"Authorization": f"Bearer {token}"})
+        if response.status_code in (404, 405):
+            _refresh_unsupported = True
+            return None
+        response.raise_for_status()
+        data = response.json()
+        return data.get("token") or data.get("jwt_token")
+    except (requests.RequestException, ValueError) as e:
+        logging.error(e, exc_info=True)
+        return None
+
+
+def get_token() -> Optional[str]:
+    """Return the session's token if it is usable.
+
+    An expired token is dropped without calling the backend. A token that expires within
+    JWT_REFRESH_WINDOW_SECONDS is refreshed first when the backend supports it.
+    """
+    token = st.session_state.get(TOKEN_KEY)
+    if not token:
+        return None
+    if is_expired(token):
+        clear_token()
+        return None
+    expiry = token_expiry(token)
+    if expiry is not None and expiry - time.time() <= config.JWT_REFRESH_WINDOW_SECONDS:
+        refreshed = refresh_token(token)
+        if refreshed:
+            store_token(refreshed)
+            return refreshed
+    return token
+
+
+def login_required_message(default: str) -> str:
+    """Return the message to show when there is no usable token."""
+    if st.session_state.get(EXPIRED_KEY):
+        return "Your session has expired. Please log in again."
+    return default
@@ -0,0 +1,236 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+"""
+On-disk cache shared by the Streamlit processes of a host.
+
+Each process keeps its own in-memory read cache (the cache module), which starts empty
+when a process is started or restarted. SharedStore backs it with a SQLite database that
+every process on the host opens, so a fresh process serves forum pages and meeting lists
+another process fetched moments ago instead of cold-fetching them from the backend.
+
+Entries are stored as encoded bytes under a namespace ("posts", "meetings"), a scope and
+a key, and are versioned twice over:
+- Each namespace has a generation. A write in any process bumps it, which retires every
+  entry of the namespace at once, including entries no process holds in memory.
+- The database carries FORMAT_VERSION; a database written by an incompatible version of
+  this module is emptied on open.
+The total size of the stored values is kept under max_bytes by dropping the least
+recently read entries, and entries older than max_age are dropped along the way.
+
+Authenticated data is scoped per user. A token is only mapped to a scope once it is known
+to be genuine, that is, once the auth service issued it to this app (session.store_token
+calls trust). Tokens are not verified locally, so scoping by the unverified subject claim
+alone would let a forged token read another user's entries; other tokens are simply not
+shared.
+
+SQLite errors are logged and treated as misses, so a missing or locked database never
+breaks a page.
+"""
+
+FORMAT_VERSION = 1
+PUBLIC_SCOPE = "public"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (namespace, scope, key)
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS generations (namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS principals (token_hash TEXT PRIMARY KEY, scope TEXT NOT NULL, expires_at REAL);
+"""
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def token_scope(token: str, subject: Optional[str] = None) -> str:
+    """Return the scope of a token: its user's for a genuine token with a subject, else its own."""
+    return f"user:{subject}" if subject else f"token:{_token_hash(token)}"
+
+
+class SharedStore:
+    """SQLite-backed byte store shared between processes."""
+
+    def __init__(self, path: str, max_bytes: int, max_age: float, timeout: float = 5.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.timeout = timeout
+        self._local = threading.local()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._stats_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening (and if needed creating) the database."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+            # Only the service user may read cached user data
+            os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                if connection.execute("PRAGMA user_version").fetchone()[0] != FORMAT_VERSION:
+                    for table in ("entries", "generations", "principals"):
+                        connection.execute(f"DROP TABLE IF EXISTS {table}")
+                    for statement in _SCHEMA.split(";"):
+                        if statement.strip():
+                            connection.execute(statement)
+                    connection.execute(f"PRAGMA user_version = {FORMAT_VERSION}")
+            self._local.connection = connection
+        return connection
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    @staticmethod
+    def _generation(connection: sqlite3.Connection, namespace: str) -> int:
+        row = connection.execute("SELECT generation FROM generations WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def get(self, namespace: str, scope: str, key: str) -> Optional[tuple[float, bytes]]:
+        """Return (age in seconds, value) of a current entry, or None."""
+        try:
+            connection = self._connection()
+            row = connection.execute(
+                "SELECT generation, stored_at, value FROM entries WHERE namespace = ? AND scope = ? AND key = ?",
+                (namespace, scope, key),
+            ).fetchone()
+            now = time.time()
+            if row is None or row[0] != self._generation(connection, namespace) or now - row[1] >= self.max_age:
+                self._count("misses")
+                return None
+            connection.execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND scope = ? AND key = ?",
+                (now, namespace, scope, key),
+            )
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+            return None
+        self._count("hits")
+        return max(0.0, now - row[1]), row[2]
+
+    def put(self, namespace: str, scope: str, key: str, value: bytes, age: float = 0.0) -> None:
+        """Store a value that is `age` seconds old, then evict down to max_bytes."""
+        try:
+            connection = self._connection()
+            now = time.time()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (namespace, scope, key, self._generation(connection, namespace), now - age, now, len(value), value),
+                )
+                self._evict(connection, now)
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+            return
+        self._count("writes")
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        evicted = connection.execute("DELETE FROM entries WHERE stored_at <= ?", (now - self.max_age,)).rowcount
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total > self.max_bytes:
+            rows = connection.execute("SELECT rowid, size FROM entries ORDER BY accessed_at").fetchall()
+            victims = []
+            for rowid, size in rows:
+                if total <= self.max_bytes:
+                    break
+                victims.append((rowid,))
+                total -= size
+            connection.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+            evicted += len(victims)
+        connection.execute("DELETE FROM principals WHERE expires_at <= ?", (now,))
+        if evicted:
+            self._count("evictions", evicted)
+
+    def delete(self, namespace: str, scope: str, key: str) -> None:
+        """Remove one entry."""
+        try:
+            self._connection().execute(
+                "DELETE FROM entries WHERE namespace = ? AND scope = ? AND key = ?", (namespace, scope, key)
+            )
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+
+    def invalidate(self, namespace: str) -> None:
+        """Retire every entry of a namespace, in every process, by bumping its generation."""
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(
+                    "INSERT INTO generations VALUES (?, 1) "
+                    "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                    (namespace,),
+                )
+                connection.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+
+    def trust(self, token: str, subject: Optional[str], expires_at: Optional[float]) -> None:
+        """Record a token known to be genuine, mapping it to its user's scope."""
+        scope = token_scope(token, subject)
+        try:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO principals VALUES (?, ?, ?)", (_token_hash(token), scope, expires_at)
+            )
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+
+    def scope_for(self, token: Optional[str]) -> Optional[str]:
+        """Return the scope of a token's entries, or None for a token not known to be genuine."""
+        if token is None:
+            return PUBLIC_SCOPE
+        try:
+            row = self._connection().execute(
+                "SELECT scope, expires_at FROM principals WHERE token_hash = ?", (_token_hash(token),)
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+            return None
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def clear(self) -> None:
+        """Remove every entry, generation and trusted token."""
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                for table in ("entries", "generations", "principals"):
+                    connection.execute(f"DELETE FROM {table}")
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+
+    def stats(self) -> dict:
+        """Return this process's hit/miss/write/eviction counts and the store's size."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        try:
+            entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            stats.update(entries=entries, bytes=size)
+        except (sqlite3.Error, OSError) as e:
+            logging.error(e, exc_info=True)
+        return stats
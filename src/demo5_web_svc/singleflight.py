@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+"""
+Single-flight execution of identical concurrent calls.
+
+Every Streamlit session runs its script in the same process, so many sessions sitting on
+the same page rerun into the same backend reads at the same time. A Group lets the first
+caller of a key run the call while callers arriving before it finishes wait for and share
+its result (or exception) instead of issuing their own. Nothing is cached once the call
+has finished; that is the read cache's job.
+"""
+
+
+class Group:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """Run fn() unless a call with the same key is already in flight.
+
+        Returns:
+            tuple: The result and whether it was shared from another caller's call.
+
+        Raises:
+            Exception: Whatever fn() raised, in the caller that ran it and in every caller
+            that shared the call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = self._calls[key] = Future()
+                self._stats["calls"] += 1
+                leader = True
+            else:
+                self._stats["coalesced"] += 1
+                leader = False
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self) -> dict:
+        """Return the number of calls run and the number of calls that shared one."""
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for name in self._stats:
+                self._stats[name] = 0
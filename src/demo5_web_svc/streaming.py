@@ -0,0 +1,141 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+"""
+Incremental JSON parsing for large list responses.
+
+A backend without server-side pagination answers /forum with the whole collection. Rather
+than buffering that body as bytes, then as a string, then as a list of dicts, the
+functions below decode it chunk by chunk from response.iter_content and parse one array
+element at a time, so only the elements a page shows are kept and peak memory stays
+bounded regardless of forum size.
+"""
+
+CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\n\r"
+# Drop consumed text from the buffer once this much has accumulated
+_COMPACT_THRESHOLD = 256 * 1024
+
+
+class _TextStream:
+    """Decoded text of a byte-chunk iterator, consumed through a growing buffer."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.finished = False
+
+    def fill(self) -> bool:
+        """Append the next chunk to the buffer; return False once the stream is exhausted."""
+        if self.finished:
+            return False
+        if self.pos > _COMPACT_THRESHOLD:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.buffer += self._decoder.decode(chunk)
+                return True
+        self.buffer += self._decoder.decode(b"", final=True)
+        self.finished = True
+        return False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end of stream)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def rest(self) -> str:
+        """Consume and return the remaining text."""
+        while self.fill():
+            pass
+        text = self.buffer[self.pos:]
+        self.pos = len(self.buffer)
+        return text
+
+
+def _iter_array(stream: _TextStream) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    if stream.peek() != "[":
+        raise ValueError("Expected a JSON array")
+    stream.pos += 1
+    if stream.peek() == "]":
+        stream.pos += 1
+        return
+    while True:
+        stream.peek()
+        try:
+            value, end = decoder.raw_decode(stream.buffer, stream.pos)
+            # A number cut by a chunk boundary ("1." or "2e") decodes as a shorter one, so a
+            # value only counts once the separator after it has arrived
+            follow = end
+            while follow < len(stream.buffer) and stream.buffer[follow] in _WHITESPACE:
+                follow += 1
+            complete = stream.finished or (follow < len(stream.buffer) and stream.buffer[follow] in ",]")
+        except json.JSONDecodeError:
+            complete = False
+        if not complete:
+            if not stream.fill():
+                # No more input: decode once more to raise a meaningful error
+                value, end = decoder.raw_decode(stream.buffer, stream.pos)
+            continue
+        stream.pos = end
+        yield value
+        separator = stream.peek()
+        stream.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Unexpected {separator!r} in JSON array")
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a JSON array streamed as byte chunks, one at a time."""
+    return _iter_array(_TextStream(chunks))
+
+
+def iter_items(chunks: Iterable[bytes]) -> tuple[Optional[dict], Iterator[Any]]:
+    """Iterate over the list items of a streamed JSON body.
+
+    Returns:
+        tuple: For an array body, None and a lazy iterator over its elements. For an object
+        body (an already paginated response), the decoded object and an iterator over its
+        "items".
+    """
+    stream = _TextStream(chunks)
+    if stream.peek() != "[":
+        data = json.loads(stream.rest())
+        return data, iter(data.get("items", []))
+    return None, _iter_array(stream)
+
+
+def parse_window(chunks: Iterable[bytes], start: int, stop: int) -> dict:
+    """Parse a streamed JSON body, keeping only the elements in [start, stop) of a list.
+
+    Args:
+        chunks (Iterable[bytes]): Body chunks, e.g. response.iter_content(CHUNK_SIZE)
+        start (int): Index of the first element to keep
+        stop (int): Index after the last element to keep
+
+    Returns:
+        dict: For an array body, {"items": <window>, "total": <element count>}. An object
+        body (an already paginated response) is decoded and returned unchanged.
+    """
+    stream = _TextStream(chunks)
+    if stream.peek() != "[":
+        return json.loads(stream.rest())
+    items = []
+    total = 0
+    for value in _iter_array(stream):
+        if start <= total < stop:
+            items.append(value)
+        total += 1
+    return {"items": items, "total": total}
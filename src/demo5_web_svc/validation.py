@@ -0,0 +1,108 @@
+import logging
+from typing import Iterable, Optional
+
+from email_validator import EmailNotValidError, EmailUndeliverableError, validate_email
+from email_validator.deliverability import validate_email_deliverability
+
+from demo5_web_svc import cache, config, loader
+
+"""
+Shared email validation service.
+
+Two modes are supported: syntax-only, which never touches the network, and
+deliverability, which additionally checks that the domain has mail DNS records. DNS
+results are kept per domain in an LRU/TTL cache shared by all sessions, so repeated
+logins and meeting participants from the same domain do not repeat the lookup. Lists of
+addresses are deduplicated and their distinct domains are resolved concurrently on the
+loader pool.
+"""
+
+# ascii domain -> None when deliverable, otherwise the undeliverable error message
+_domain_cache = cache.TTLCache(
+    ttl=config.EMAIL_DNS_CACHE_TTL_SECONDS,
+    max_entries=config.EMAIL_DNS_CACHE_MAX_ENTRIES,
+)
+
+
+def _default_deliverability() -> bool:
+    return config.EMAIL_VALIDATION_MODE == "deliverability"
+
+
+def check_domain(ascii_domain: str, domain: Optional[str] = None) -> None:
+    """Check that a domain accepts email, using the per-domain DNS cache.
+
+    Raises:
+        EmailUndeliverableError: If the domain does not accept email.
+    """
+    found, error, _ = _domain_cache.get(ascii_domain)
+    if not found:
+        try:
+            info = validate_email_deliverability(ascii_domain, domain or ascii_domain, timeout=config.EMAIL_DNS_TIMEOUT)
+            error = None
+            if "unknown-deliverability" in info:
+                # DNS timed out; accept the address but do not remember the outcome
+                return
+        except EmailUndeliverableError as e:
+            error = str(e)
+        _domain_cache.set(ascii_domain, error)
+    if error is not None:
+        raise EmailUndeliverableError(error)
+
+
+def validate_address(email: str, check_deliverability: Optional[bool] = None) -> str:
+    """Validate a single email address.
+
+    Args:
+        email (str): Address to validate
+        check_deliverability (bool, optional): Whether to check the domain's DNS records.
+            Defaults to config.EMAIL_VALIDATION_MODE.
+
+    Returns:
+        str: The normalized address.
+
+    Raises:
+        EmailNotValidError: If the address is malformed or its domain does not accept email.
+    """
+    if check_deliverability is None:
+        check_deliverability = _default_deliverability()
+    validated = validate_email(email, check_deliverability=False)
+    if check_deliverability:
+        check_domain(validated.ascii_domain, validated.domain)
+    return validated.normalized
+
+
+def validate_many(emails: Iterable[str], check_deliverability: Optional[bool] = None) -> dict[str, Optional[str]]:
+    """Validate a list of addresses, resolving each distinct domain once and concurrently.
+
+    Returns:
+        dict: Each distinct address mapped to None when valid, or to the error message.
+    """
+    if check_deliverability is None:
+        check_deliverability = _default_deliverability()
+
+    results: dict[str, Optional[str]] = {}
+    domains: dict[str, tuple[str, list[str]]] = {}
+    for email in dict.fromkeys(emails):
+        try:
+            validated = validate_email(email, check_deliverability=False)
+        except EmailNotValidError as e:
+            results[email] = str(e)
+            continue
+        results[email] = None
+        if check_deliverability:
+            domains.setdefault(validated.ascii_domain, (validated.domain, []))[1].append(email)
+
+    checks = loader.load_all({
+        ascii_domain: (lambda ascii_domain=ascii_domain, domain=domain: check_domain(ascii_domain, domain))
+        for ascii_domain, (domain, _) in domains.items()
+    })
+    for ascii_domain, (success, error) in checks.items():
+        if success:
+            continue
+        if not isinstance(error, EmailNotValidError):
+            # Unexpected resolver failure: do not block the user on it
+            logging.error(error)
+            continue
+        for email in domains[ascii_domain][1]:
+            results[email] = str(error)
+    return results
@@ -0,0 +1,19 @@
+import pytest
+
+from demo5_web_svc import cache, circuit_breaker, http_client, post_sync, search
+
+
+@pytest.fixture(autouse=True)
+def clear_data_cache():
+    # Cached reads, breaker state, the search index and the synced posts must not leak between tests
+    cache.data_cache.clear()
+    http_client.clear_validators()
+    circuit_breaker.reset()
+    search.clear()
+    post_sync.reset()
+    yield
+    cache.data_cache.clear()
+    http_client.clear_validators()
+    circuit_breaker.reset()
+    search.clear()
+    post_sync.reset()
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from demo5_web_svc.cache import TTLCache
+
+
+def test_get_or_load_caches_value():
+    cache = TTLCache(ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_load("key", loader) == "value"
+    assert cache.get_or_load("key", loader) == "value"
+    assert len(calls) == 1
+
+
+def test_expired_entry_is_reloaded():
+    cache = TTLCache(ttl=0.01)
+    cache.set("key", "old")
+    time.sleep(0.02)
+    assert cache.get("key") == (False, None, False)
+    assert cache.get_or_load("key", lambda: "new") == "new"
+
+
+def test_stale_entry_is_served_and_refreshed():
+    cache = TTLCache(ttl=0.01, stale_ttl=60)
+    cache.set("key", "old")
+    time.sleep(0.02)
+    assert cache.get_or_load("key", lambda: "new") == "old"
+    for _ in range(100):
+        if cache.get("key")[1] == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("key") == (True, "new", False)
+
+
+def test_invalidate_matches_predicate():
+    cache = TTLCache(ttl=60)
+    cache.set(("posts", "a", 1), "p1")
+    cache.set(("posts", "b", 1), "p2")
+    cache.set(("meetings",), "m")
+    assert cache.invalidate(lambda key, value: key[0] == "posts") == 2
+    assert cache.get(("meetings",))[0] is True
+    assert cache.get(("posts", "a", 1))[0] is False
+
+
+def test_lru_eviction():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b")[0] is False
+    assert cache.get("a")[0] is True
+
+
+def test_zero_ttl_disables_caching():
+    cache = TTLCache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a")[0] is False
+
+
+def test_patch_replaces_or_drops_matching_entries():
+    cache = TTLCache(ttl=60)
+    cache.set(("posts", 1), [1])
+    cache.set(("posts", 2), [2])
+    cache.set(("meetings", 1), [3])
+    patched = cache.patch(lambda key, value: key[0] == "posts", lambda key, value: value + [9] if key[1] == 1 else None)
+    assert patched == 2
+    assert cache.get(("posts", 1)) == (True, [1, 9], False)
+    assert cache.get(("posts", 2))[0] is False
+    assert cache.get(("meetings", 1))[0] is True
+
+
+def test_max_age_reloads_entries_younger_than_ttl():
+    cache = TTLCache(ttl=60)
+    cache.set("key", "old")
+    assert cache.get_or_load("key", lambda: "new", max_age=30) == "old"
+    time.sleep(0.02)
+    assert cache.get_or_load("key", lambda: "new", max_age=0.01) == "new"
+    assert cache.get("key") == (True, "new", False)
+
+
+def test_refresh_started_before_invalidate_is_not_stored():
+    cache = TTLCache(ttl=0.01, stale_ttl=60)
+    cache.set("key", "old")
+    time.sleep(0.02)
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return "before write"
+
+    assert cache.get_or_load("key", slow_loader) == "old"
+    assert started.wait(5)
+    cache.invalidate(lambda key, value: True)
+    release.set()
+    for _ in range(100):
+        if "key" not in cache._refreshing:
+            break
+        time.sleep(0.01)
+    assert cache.get("key") == (False, None, False)
+    assert cache.get_or_load("key", lambda: "after write") == "after write"
+
+
+def test_load_started_before_patch_is_not_stored():
+    cache = TTLCache(ttl=60)
+
+    def loader():
+        cache.patch(lambda key, value: True, lambda key, value: value)
+        return "before write"
+
+    assert cache.get_or_load("key", loader) == "before write"
+    assert cache.get("key") == (False, None, False)
@@ -0,0 +1,100 @@
+import pytest
+import requests
+
+from demo5_web_svc import cache, circuit_breaker, http_client
+from demo5_web_svc.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock):
+    return CircuitBreaker("forum", failure_rate=0.5, minimum_calls=4, window_seconds=30, open_seconds=10, clock=clock)
+
+
+def test_opens_when_failure_rate_crosses_threshold():
+    breaker = make_breaker(FakeClock())
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == circuit_breaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_failures_outside_window_are_forgotten():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now = 60
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 10
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    breaker.before_call()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == circuit_breaker.CLOSED
+    breaker.before_call()
+
+
+def test_group_for_paths():
+    assert circuit_breaker.group_for("/forum/3") == "forum"
+    assert circuit_breaker.group_for("api/meetings") == "meetings"
+    assert circuit_breaker.group_for("/api/login") == "auth"
+
+
+def test_request_fails_fast_when_circuit_open(monkeypatch):
+    calls = []
+
+    def failing_request(method, url, **kwargs):
+        calls.append(url)
+        raise requests.ConnectionError("backend down")
+
+    monkeypatch.setattr(http_client.get_session(), "request", failing_request)
+    for _ in range(circuit_breaker.get_breaker("forum").minimum_calls):
+        with pytest.raises(requests.ConnectionError):
+            http_client.get("/forum")
+    with pytest.raises(CircuitOpenError):
+        http_client.get("/forum")
+    assert len(calls) == circuit_breaker.get_breaker("forum").minimum_calls
+    # Other endpoint groups are unaffected
+    assert circuit_breaker.states() == {"forum": circuit_breaker.OPEN}
+
+
+def test_get_or_load_serves_expired_entry_on_fallback_error(monkeypatch):
+    data = cache.TTLCache(ttl=1)
+    data.set("key", "old")
+    clock = [cache.time.monotonic() + 5]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: clock[0])
+
+    def open_circuit():
+        raise CircuitOpenError("open")
+
+    assert data.get_or_load("key", open_circuit, fallback_errors=(CircuitOpenError,)) == "old"
+    with pytest.raises(CircuitOpenError):
+        data.get_or_load("key", open_circuit)
+    with pytest.raises(CircuitOpenError):
+        data.get_or_load("other", open_circuit, fallback_errors=(CircuitOpenError,))
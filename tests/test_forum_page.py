@@ -1,17 +1,31 @@
+import base64
+import json
+import time
 import requests
 import streamlit as st
 import pytest
+from demo5_web_svc import http_client, search
+from demo5_web_svc.models import Post
 from demo5_web_svc.pages import forum
 
 
 class DummyResponse:
-    def __init__(self, json_data, status_code):
+    def __init__(self, json_data, status_code, headers=None):
         self._json_data = json_data
         self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(json_data).encode()
 
     def json(self):
         return self._json_data
 
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
     def raise_for_status(self):
         if self.status_code >= 400:
             raise requests.HTTPError(f"HTTP {self.status_code} Error")
@@ -21,35 +35,111 @@ class DummyResponse:
 @pytest.fixture(autouse=True)
 def auth_token(monkeypatch):
     st.session_state.jwt_token = "dummy_token"
+    forum.clear_prefetched_pages()
     return st.session_state.jwt_token
 
 
 def test_fetch_posts_success(monkeypatch):
     dummy_posts = [{"id": 1, "title": "Test Post", "content": "Test Content"}]
 
-    def dummy_get(url, headers):
-        return DummyResponse(dummy_posts, 200)
+    def dummy_get(url, headers, params, **kwargs):
+        assert params == {"limit": forum.POSTS_PER_PAGE, "offset": 0}
+        return DummyResponse({"items": dummy_posts, "total": 1}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    posts, total = forum.fetch_posts("dummy_token")
+    assert posts == [Post(id=1, title="Test Post", content="Test Content")]
+    assert total == 1
+
+
+def test_fetch_posts_requests_offset_for_page(monkeypatch):
+    requested = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        requested.append(params)
+        return DummyResponse({"items": [{"id": 11}], "total": 42}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    posts, total = forum.fetch_posts("dummy_token", page_number=3)
+    assert requested == [{"limit": forum.POSTS_PER_PAGE, "offset": 2 * forum.POSTS_PER_PAGE}]
+    assert total == 42
+
+
+def test_fetch_posts_uses_next_cursor(monkeypatch):
+    requested = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        requested.append(params)
+        return DummyResponse({"items": [{"id": 1}], "total": 10, "next_cursor": "abc"}, 200)
 
-    monkeypatch.setattr(requests, "get", dummy_get)
-    posts = forum.fetch_posts("dummy_token")
-    assert posts == dummy_posts
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    forum.fetch_posts("dummy_token", page_number=1)
+    forum.fetch_posts("dummy_token", page_number=2)
+    assert "cursor" not in requested[0]
+    assert requested[1]["cursor"] == "abc"
+
+
+def test_fetch_posts_slices_unpaginated_backend(monkeypatch):
+    all_posts = [{"id": i} for i in range(1, 13)]
+
+    def dummy_get(url, headers, params, **kwargs):
+        return DummyResponse(all_posts, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    posts, total = forum.fetch_posts("dummy_token", page_number=3)
+    assert [post.id for post in posts] == [11, 12]
+    assert total == 12
 
 
 def test_fetch_posts_failure(monkeypatch):
-    def dummy_get(url, headers):
+    def dummy_get(url, headers, params, **kwargs):
         return DummyResponse({}, 500)
 
-    monkeypatch.setattr(requests, "get", dummy_get)
-    posts = forum.fetch_posts("dummy_token")
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    posts, total = forum.fetch_posts("dummy_token")
     # Verify that on error, empty list is returned
     assert posts == []
+    assert total == 0
+
+
+def test_prefetch_posts_serves_next_fetch(monkeypatch):
+    calls = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        calls.append(params)
+        return DummyResponse({"items": [{"id": 6}], "total": 10}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    forum.prefetch_posts("dummy_token", 2)
+    posts, total = forum.fetch_posts("dummy_token", page_number=2)
+    assert posts == [Post(id=6)]
+    assert len(calls) == 1
+
+
+def test_prefetched_page_expires_with_cache_ttl(monkeypatch):
+    title = ["Old"]
+
+    def dummy_get(url, headers, params, **kwargs):
+        return DummyResponse({"items": [{"id": 6, "title": title[0]}], "total": 10}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    monkeypatch.setattr(forum.cache.data_cache, "ttl", 0.2)
+    monkeypatch.setattr(forum.cache.data_cache, "stale_ttl", 0.0)
+    forum.prefetch_posts("dummy_token", 2)
+    deadline = time.monotonic() + 5
+    while forum._prefetched_pages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.3)
+    title[0] = "New"
+    posts, _ = forum.fetch_posts("dummy_token", page_number=2)
+    assert posts[0].title == "New"
 
 
 def test_create_post_success(monkeypatch):
     def dummy_post(url, json, headers):
         return DummyResponse({}, 200)
 
-    monkeypatch.setattr(requests, "post", dummy_post)
+    monkeypatch.setattr(http_client, "post", dummy_post)
     result = forum.create_post("dummy_token", "Title", "Content")
     assert result is True
 
@@ -58,7 +148,7 @@ def test_create_post_failure(monkeypatch):
     def dummy_post(url, json, headers):
         return DummyResponse({}, 500)
 
-    monkeypatch.setattr(requests, "post", dummy_post)
+    monkeypatch.setattr(http_client, "post", dummy_post)
     result = forum.create_post("dummy_token", "Title", "Content")
     assert result is False
 
@@ -67,7 +157,7 @@ def test_update_post_success(monkeypatch):
     def dummy_put(url, json, headers):
         return DummyResponse({}, 200)
 
-    monkeypatch.setattr(requests, "put", dummy_put)
+    monkeypatch.setattr(http_client, "put", dummy_put)
     result = forum.update_post("dummy_token", 1, "New Title", "New Content")
     assert result is True
 
@@ -76,7 +166,7 @@ def test_update_post_failure(monkeypatch):
     def dummy_put(url, json, headers):
         return DummyResponse({}, 500)
 
-    monkeypatch.setattr(requests, "put", dummy_put)
+    monkeypatch.setattr(http_client, "put", dummy_put)
     result = forum.update_post("dummy_token", 1, "New Title", "New Content")
     assert result is False
 
@@ -85,7 +175,7 @@ def test_delete_post_success(monkeypatch):
     def dummy_delete(url, headers):
         return DummyResponse({}, 200)
 
-    monkeypatch.setattr(requests, "delete", dummy_delete)
+    monkeypatch.setattr(http_client, "delete", dummy_delete)
     result = forum.delete_post("dummy_token", 1)
     assert result is True
 
@@ -94,11 +184,75 @@ def test_delete_post_failure(monkeypatch):
     def dummy_delete(url, headers):
         return DummyResponse({}, 500)
 
-    monkeypatch.setattr(requests, "delete", dummy_delete)
+    monkeypatch.setattr(http_client, "delete", dummy_delete)
     result = forum.delete_post("dummy_token", 1)
     assert result is False
 
 
+def test_fetch_posts_is_cached_until_write(monkeypatch):
+    calls = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        calls.append(params)
+        return DummyResponse({"items": [{"id": 1}], "total": 1}, 200)
+
+    def dummy_post(url, json, headers):
+        return DummyResponse({}, 201)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    monkeypatch.setattr(http_client, "post", dummy_post)
+    forum.fetch_posts("dummy_token")
+    forum.fetch_posts("dummy_token")
+    assert len(calls) == 1
+    forum.create_post("dummy_token", "Title", "Content")
+    forum.fetch_posts("dummy_token")
+    assert len(calls) == 2
+
+
+def test_update_post_invalidates_only_pages_with_post(monkeypatch):
+    calls = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        calls.append(params["offset"])
+        start = params["offset"] + 1
+        return DummyResponse({"items": [{"id": i} for i in range(start, start + 5)], "total": 10}, 200)
+
+    def dummy_put(url, json, headers):
+        return DummyResponse({}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    monkeypatch.setattr(http_client, "put", dummy_put)
+    forum.fetch_posts("dummy_token", page_number=1)
+    forum.fetch_posts("dummy_token", page_number=2)
+    forum.update_post("dummy_token", 7, "New Title", "New Content")
+    forum.fetch_posts("dummy_token", page_number=1)
+    forum.fetch_posts("dummy_token", page_number=2)
+    assert calls == [0, 5, 5]
+
+
+def test_fetch_posts_skips_backend_with_expired_token(monkeypatch):
+    claims = base64.urlsafe_b64encode(json.dumps({"exp": 1}).encode()).decode().rstrip("=")
+    expired_token = f"header.{claims}.signature"
+
+    def dummy_get(url, headers, params, **kwargs):
+        raise AssertionError("backend must not be called")
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    posts, total = forum.fetch_posts(expired_token)
+    assert (posts, total) == ([], 0)
+    assert st.session_state.jwt_token is None
+
+
+def test_fetch_posts_unauthorized_clears_token(monkeypatch):
+    def dummy_get(url, headers, params, **kwargs):
+        return DummyResponse({"error": "expired"}, 401)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    posts, total = forum.fetch_posts("dummy_token")
+    assert (posts, total) == ([], 0)
+    assert st.session_state.jwt_token is None
+
+
 def test_paginate_posts():
     # Create a dummy list of posts
     posts = [{'id': i, 'title': f'Title {i}', 'content': f'Content {i}'} for i in range(1, 11)]
@@ -108,3 +262,173 @@ def test_paginate_posts():
     assert len(paginated) == 5
     assert paginated[0]['id'] == 6
     assert paginated[-1]['id'] == 10
+
+
+def test_optimistic_update_patches_cache_without_refetch(monkeypatch):
+    calls = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        calls.append(params)
+        return DummyResponse({"items": [{"id": 1, "title": "Old"}, {"id": 2}], "total": 2}, 200)
+
+    def dummy_put(url, json, headers):
+        return DummyResponse({"id": 1, "title": json["title"], "content": json["content"], "updated_at": "2024-05-01T10:00:00"}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    monkeypatch.setattr(http_client, "put", dummy_put)
+    st.session_state[forum.PENDING_WRITES_KEY] = []
+    forum.fetch_posts("dummy_token")
+    forum.queue_write("dummy_token", "update", Post(id=1, title="New", content="Body"))
+    write = st.session_state[forum.PENDING_WRITES_KEY][0]
+    write.future.result(timeout=5)
+
+    posts, total = forum.fetch_posts("dummy_token")
+    assert len(calls) == 1
+    assert posts[0].title == "New"
+    assert posts[0].updated_at is not None
+    assert forum.settle_pending_writes() == [write]
+    assert st.session_state[forum.PENDING_WRITES_KEY] == []
+
+
+def test_optimistic_write_drops_other_tokens_pages(monkeypatch):
+    calls = []
+
+    def dummy_get(url, headers, params, **kwargs):
+        calls.append(headers["Authorization"])
+        return DummyResponse({"items": [{"id": 1, "title": "Old"}, {"id": 2}], "total": 2}, 200)
+
+    def dummy_put(url, json, headers):
+        return DummyResponse({"id": 1, "title": json["title"], "content": json["content"]}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    monkeypatch.setattr(http_client, "put", dummy_put)
+    st.session_state[forum.PENDING_WRITES_KEY] = []
+    forum.fetch_posts("dummy_token")
+    forum.fetch_posts("other_token")
+    forum.queue_write("dummy_token", "update", Post(id=1, title="New", content="Body"))
+    st.session_state[forum.PENDING_WRITES_KEY][0].future.result(timeout=5)
+
+    forum.fetch_posts("dummy_token")
+    forum.fetch_posts("other_token")
+    assert calls == ["Bearer dummy_token", "Bearer other_token", "Bearer other_token"]
+
+
+def test_failed_optimistic_write_is_rolled_back(monkeypatch):
+    def dummy_delete(url, headers):
+        return DummyResponse({}, 500)
+
+    monkeypatch.setattr(http_client, "delete", dummy_delete)
+    st.session_state[forum.PENDING_WRITES_KEY] = []
+    forum.queue_write("dummy_token", "delete", Post(id=3))
+    st.session_state[forum.PENDING_WRITES_KEY][0].future.exception(timeout=5)
+    writes = forum.settle_pending_writes()
+    assert writes == []
+    assert forum.apply_pending_writes([Post(id=3)], writes) == [Post(id=3)]
+
+
+def test_apply_pending_writes_overlays_unconfirmed_writes():
+    from concurrent.futures import Future
+
+    posts = [Post(id=1, title="A"), Post(id=2, title="B")]
+    writes = [
+        forum.PendingWrite("delete", Post(id=1), Future()),
+        forum.PendingWrite("update", Post(id=2, title="B2"), Future()),
+        forum.PendingWrite("create", Post(id=-1, title="C"), Future()),
+    ]
+    assert forum.apply_pending_writes(posts, writes) == [Post(id=2, title="B2"), Post(id=-1, title="C")]
+
+
+def test_reconcile_created_appends_to_last_cached_page(monkeypatch):
+    def dummy_get(url, headers, params, **kwargs):
+        start = params["offset"] + 1
+        return DummyResponse({"items": [{"id": i} for i in range(start, min(start + 5, 8))], "total": 7}, 200)
+
+    monkeypatch.setattr(http_client, "get", dummy_get)
+    forum.fetch_posts("dummy_token", page_number=1)
+    forum.fetch_posts("dummy_token", page_number=2)
+    forum.reconcile_created("dummy_token", Post(id=8))
+    monkeypatch.setattr(http_client, "get", lambda *args, **kwargs: pytest.fail("backend must not be called"))
+    first, total = forum.fetch_posts("dummy_token", page_number=1)
+    last, _ = forum.fetch_posts("dummy_token", page_number=2)
+    assert total == 8
+    assert [post.id for post in first] == [1, 2, 3, 4, 5]
+    assert [post.id for post in last] == [6, 7, 8]
+
+
+def test_bulk_delete_uses_batch_endpoint(monkeypatch):
+    requests_sent = []
+
+    def dummy_post(url, json, headers):
+        requests_sent.append(json)
+        results = [{"id": op["id"], "status": 404 if op["id"] == 3 else 204} for op in json["operations"]]
+        return DummyResponse({"results": results}, 200)
+
+    monkeypatch.setattr(forum, "_batch_unsupported", False)
+    monkeypatch.setattr(forum, "BULK_BATCH_SIZE", 2)
+    monkeypatch.setattr(http_client, "post", dummy_post)
+    results = forum.bulk_delete("dummy_token", [1, 2, 3])
+    assert results == {1: None, 2: None, 3: "HTTP 404"}
+    assert [len(body["operations"]) for body in requests_sent] == [2, 1]
+
+
+def test_bulk_update_falls_back_to_fan_out(monkeypatch):
+    updated = []
+
+    def dummy_post(url, json, headers):
+        return DummyResponse({"error": "not found"}, 404)
+
+    def dummy_put(url, json, headers):
+        updated.append(url)
+        return DummyResponse({}, 500 if url == "/forum/2" else 200)
+
+    monkeypatch.setattr(forum, "_batch_unsupported", False)
+    monkeypatch.setattr(http_client, "post", dummy_post)
+    monkeypatch.setattr(http_client, "put", dummy_put)
+    results = forum.bulk_update("dummy_token", [Post(id=1, title="T", content="C"), Post(id=2, title="T", content="C")])
+    assert results[1] is None
+    assert results[2] == "HTTP 500 Error"
+    assert sorted(updated) == ["/forum/1", "/forum/2"]
+    assert forum._batch_unsupported is True
+
+
+def test_save_delete_reports_success_only_after_write(monkeypatch):
+    statuses = [500, 204]
+    monkeypatch.setattr(http_client, "delete", lambda url, headers: DummyResponse({}, statuses.pop(0)))
+    monkeypatch.setattr(forum.config, "FORUM_OPTIMISTIC_WRITES", False)
+    assert forum._save_delete("dummy_token", Post(id=4)) is None
+    assert forum._save_delete("dummy_token", Post(id=4)) == "Post deleted successfully!"
+
+    monkeypatch.setattr(http_client, "put", lambda url, json, headers: DummyResponse(dict(json, id=4), 200))
+    monkeypatch.setattr(forum.config, "FORUM_OPTIMISTIC_WRITES", True)
+    st.session_state[forum.PENDING_WRITES_KEY] = []
+    # Queued, not confirmed yet: no success message until the write settles
+    assert forum._save_edit("dummy_token", Post(id=4), "T", "C") == ""
+    write = st.session_state[forum.PENDING_WRITES_KEY][0]
+    assert write.post.title == "T"
+    write.future.result(timeout=5)
+
+
+def test_select_matching_selects_every_search_match():
+    search.index_for("dummy_token").build([Post(id=i, title="Spam" if i % 2 else "Ham", content="") for i in range(1, 13)])
+    st.session_state[forum.SELECTED_POSTS_KEY] = {}
+    forum._select_matching("dummy_token", "spam", 6)
+    assert sorted(st.session_state[forum.SELECTED_POSTS_KEY]) == [1, 3, 5, 7, 9, 11]
+    assert st.session_state["select_11"] is True
+
+
+def test_bulk_delete_keeps_results_of_chunks_before_a_failure(monkeypatch):
+    def dummy_post(url, json, headers):
+        if json["operations"][0]["id"] == 3:
+            return DummyResponse({"error": "boom"}, 500)
+        return DummyResponse({"results": [{"id": op["id"], "status": 204} for op in json["operations"]]}, 200)
+
+    invalidated = []
+    monkeypatch.setattr(forum, "_batch_unsupported", False)
+    monkeypatch.setattr(forum, "BULK_BATCH_SIZE", 2)
+    monkeypatch.setattr(forum, "invalidate_posts", lambda post_id=None: invalidated.append(post_id))
+    monkeypatch.setattr(http_client, "post", dummy_post)
+    results = forum.bulk_delete("dummy_token", [1, 2, 3, 4])
+    assert results[1] is None and results[2] is None
+    assert results[3] == results[4] == "HTTP 500 Error"
+    # The first chunk was applied, so the cached pages are dropped
+    assert invalidated == [None]
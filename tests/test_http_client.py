@@ -0,0 +1,171 @@
+import pytest
+import requests
+
+from benchmarks.stub_backend import StubBackend
+from demo5_web_svc import http_client
+
+
+@pytest.fixture(autouse=True)
+def fresh_session():
+    http_client.close_session()
+    yield
+    http_client.close_session()
+
+
+def test_build_url_joins_base_and_path():
+    assert http_client.build_url("/forum") == f"{http_client.BASE_URL}/forum"
+    assert http_client.build_url("api/meetings") == f"{http_client.BASE_URL}/api/meetings"
+
+
+def test_get_session_is_shared():
+    assert http_client.get_session() is http_client.get_session()
+
+
+def test_request_records_metrics(monkeypatch):
+    monkeypatch.setattr(http_client.get_session(), "request", lambda method, url, **kwargs: SessionResponse(201, b"abc"))
+    http_client.metrics.reset()
+    http_client.post("/forum/12")
+    summary = http_client.metrics.endpoint_summary()
+    assert summary[0]["endpoint"] == "POST /forum/{id}"
+    assert summary[0]["statuses"] == "201: 1"
+    assert summary[0]["response_bytes"] == 3
+
+
+def test_warm_up_opens_pooled_connections(monkeypatch):
+    with StubBackend() as backend:
+        monkeypatch.setattr(http_client, "BASE_URL", backend.url)
+        assert http_client.warm_up(3) == 3
+        assert backend.stats["by_path"] == {"/": 3}
+    monkeypatch.setattr(http_client, "BASE_URL", "http://127.0.0.1:9")
+    assert http_client.warm_up(2) == 0
+
+
+def test_session_pool_sizing():
+    adapter = http_client.get_session().get_adapter("http://example.com")
+    assert adapter._pool_connections == http_client.config.HTTP_POOL_CONNECTIONS
+    assert adapter._pool_maxsize == http_client.config.HTTP_POOL_MAXSIZE
+
+
+class SessionResponse:
+    def __init__(self, status_code=200, content=b""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+        self.request = None
+        self.raw = None
+
+
+def test_request_applies_default_timeout(monkeypatch):
+    calls = []
+    response = SessionResponse()
+
+    def fake_request(method, url, **kwargs):
+        calls.append((method, url, kwargs))
+        return response
+
+    monkeypatch.setattr(http_client.get_session(), "request", fake_request)
+    assert http_client.get("/forum", headers={"Authorization": "Bearer x"}) is response
+    method, url, kwargs = calls[0]
+    assert method == "GET"
+    assert url == f"{http_client.BASE_URL}/forum"
+    assert kwargs["timeout"] == http_client.DEFAULT_TIMEOUT
+
+
+def test_request_keeps_explicit_timeout(monkeypatch):
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(kwargs)
+        return SessionResponse()
+
+    monkeypatch.setattr(http_client.get_session(), "request", fake_request)
+    http_client.post("/api/login", json={}, timeout=5)
+    assert calls[0]["timeout"] == 5
+
+
+class ConditionalResponse:
+    def __init__(self, status_code, json_data=None, headers=None, content=b""):
+        self.status_code = status_code
+        self._json = json_data
+        self.headers = headers or {}
+        self.content = content
+        self.decoded = 0
+
+    def json(self):
+        self.decoded += 1
+        return self._json
+
+
+def test_get_json_revalidates_with_etag(monkeypatch):
+    sent_headers = []
+    responses = [
+        ConditionalResponse(200, [{"id": 1}], {"ETag": '"v1"', "Last-Modified": "Mon"}, b"x" * 10),
+        ConditionalResponse(304),
+    ]
+
+    def fake_get(path, headers, params):
+        sent_headers.append(headers)
+        return responses.pop(0)
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    first = http_client.get_json("/forum", headers={"Authorization": "Bearer a"})
+    second = http_client.get_json("/forum", headers={"Authorization": "Bearer a"})
+    assert second is first
+    assert "If-None-Match" not in sent_headers[0]
+    assert sent_headers[1]["If-None-Match"] == '"v1"'
+    assert sent_headers[1]["If-Modified-Since"] == "Mon"
+    assert http_client.get_conditional_stats() == {"hits": 1, "misses": 1, "bytes_saved": 10}
+
+
+def test_get_json_validators_are_scoped_per_user(monkeypatch):
+    sent_headers = []
+
+    def fake_get(path, headers, params):
+        sent_headers.append(headers)
+        return ConditionalResponse(200, [], {"ETag": '"v1"'})
+
+    monkeypatch.setattr(http_client, "get", fake_get)
+    http_client.get_json("/forum", headers={"Authorization": "Bearer a"})
+    http_client.get_json("/forum", headers={"Authorization": "Bearer b"})
+    assert "If-None-Match" not in sent_headers[1]
+
+
+def test_get_json_raises_on_error_status(monkeypatch):
+    monkeypatch.setattr(http_client, "get", lambda path, headers, params: ConditionalResponse(500))
+    with pytest.raises(requests.HTTPError):
+        http_client.get_json("/api/meetings")
+
+
+def test_get_json_coalesces_identical_concurrent_calls(monkeypatch):
+    import threading
+    import time
+
+    release = threading.Event()
+    calls = []
+
+    def slow_get(path, **kwargs):
+        calls.append(kwargs["headers"].get("Authorization"))
+        release.wait(5)
+        return ConditionalResponse(200, {"items": [1]})
+
+    monkeypatch.setattr(http_client, "get", slow_get)
+    http_client.metrics.reset()
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(http_client.get_json("/forum", headers={"Authorization": "Bearer a"})))
+        for _ in range(3)
+    ]
+    other = threading.Thread(target=lambda: http_client.get_json("/forum", headers={"Authorization": "Bearer b"}))
+    for thread in threads + [other]:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while http_client.get_coalescing_stats()["coalesced"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads + [other]:
+        thread.join(5)
+
+    assert sorted(calls) == ["Bearer a", "Bearer b"]
+    assert results == [{"items": [1]}] * 3
+    assert http_client.get_coalescing_stats() == {"calls": 2, "coalesced": 2}
+    assert 'demo5_backend_requests_coalesced_total{endpoint="GET /forum"} 2' in http_client.metrics.render_prometheus()
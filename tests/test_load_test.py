@@ -0,0 +1,31 @@
+import os
+import sys
+import time
+
+import pytest
+
+from benchmarks.load_test import ProcessSampler, VirtualUser
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_process_sampler_reads_cpu_and_memory():
+    sampler = ProcessSampler(os.getpid(), interval=0.01)
+    sampler.start()
+    deadline = time.monotonic() + 5
+    while not sampler.samples and time.monotonic() < deadline:
+        sum(range(10_000))  # Burn a little CPU while sampling
+    samples = sampler.stop()
+    assert samples[0]["rss_bytes"] > 0
+    assert samples[0]["cpu_percent"] >= 0
+
+
+def test_virtual_user_sets_state_only_for_shown_widgets():
+    from streamlit.proto.Radio_pb2 import Radio
+
+    user = VirtualUser("ws://unused", 0, timeout=1)
+    radio = Radio(id="radio-id", label="Navigation")
+    user.widgets = {"Navigation": ("radio", radio)}
+    assert user.set_string("Navigation", "Forum")
+    assert user.states["radio-id"].string_value == "Forum"
+    assert not user.set_string("Email", "user@example.com")
+    assert user.trigger("Login") is None
@@ -0,0 +1,31 @@
+import threading
+
+from demo5_web_svc import loader
+
+
+def test_load_all_runs_tasks_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def task():
+        # Deadlocks (and times out) unless both tasks run at the same time
+        barrier.wait()
+        return "done"
+
+    results = loader.load_all({"posts": task, "meetings": task})
+    assert results == {"posts": (True, "done"), "meetings": (True, "done")}
+
+
+def test_load_all_reports_errors_per_task():
+    def failing():
+        raise ValueError("backend down")
+
+    results = loader.load_all({"ok": lambda: 1, "failing": failing})
+    assert results["ok"] == (True, 1)
+    success, error = results["failing"]
+    assert success is False
+    assert isinstance(error, ValueError)
+
+
+def test_join_returns_result():
+    future = loader.submit(lambda x: x * 2, 21)
+    assert loader.join(future) == (True, 42)
@@ -1,7 +1,5 @@
-import requests
-
 from demo5_web_svc.pages import login
-from demo5_web_svc import config
+from demo5_web_svc import http_client
 
 
 class FakeResponse:
@@ -15,14 +13,13 @@ class FakeResponse:
 
 def test_attempt_login_success(monkeypatch):
     def fake_post(url, json, headers, timeout):
-        expected_url = f"{config.AUTH_SERVICE_URL}/api/login"
-        assert url == expected_url
+        assert url == "/api/login"
         assert headers == {"Content-Type": "application/json"}
         expected_payload = {"email": "user@example.com", "password": "password123", "oauth_token": "tokenX"}
         assert json == expected_payload
         return FakeResponse(200, {"token": "jwt_token_value"})
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_client, "post", fake_post)
     result = login.attempt_login("user@example.com", "password123", "tokenX")
     assert result.get("success") is True
     assert result.get("token") == "jwt_token_value"
@@ -32,7 +29,7 @@ def test_attempt_login_failure(monkeypatch):
     def fake_post(url, json, headers, timeout):
         return FakeResponse(401, {"error": "Invalid credentials"})
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_client, "post", fake_post)
     result = login.attempt_login("user@example.com", "wrongpassword", "")
     assert result.get("success") is False
     assert result.get("error") == "Invalid credentials"
@@ -42,7 +39,7 @@ def test_attempt_login_exception(monkeypatch):
     def fake_post(url, json, headers, timeout):
         raise Exception("Network error")
 
-    monkeypatch.setattr(requests, "post", fake_post)
+    monkeypatch.setattr(http_client, "post", fake_post)
     result = login.attempt_login("user@example.com", "password", "")
     assert result.get("success") is False
     assert result.get("error") == "Request failed"
@@ -0,0 +1,50 @@
+import sys
+
+from demo5_web_svc import config, main
+
+
+class FakeWorker(main.Worker):
+    def __init__(self, index, code):
+        super().__init__(index, "0.0.0.0", 8000 + index)
+        self.code = code
+
+    def command(self):
+        return [sys.executable, "-c", self.code]
+
+    def is_healthy(self):
+        return True
+
+
+def test_parse_args_passes_streamlit_options_through():
+    args, streamlit_args = main.parse_args(["--workers", "3", "--port", "9000", "--server.maxUploadSize", "10"])
+    assert (args.workers, args.port, args.worker) == (3, 9000, False)
+    assert streamlit_args == ["--server.maxUploadSize", "10"]
+
+
+def test_workers_get_their_own_port_and_metrics_exporters(monkeypatch):
+    monkeypatch.setattr(config, "METRICS_PORT", 9100)
+    monkeypatch.setattr(config, "METRICS_FILE", "/tmp/metrics.prom")
+    worker = main.Worker(2, "0.0.0.0", 8002, ["--server.maxUploadSize", "10"])
+    env = worker.env()
+    assert (env["SERVICE_PORT"], env["METRICS_PORT"], env["METRICS_FILE"]) == ("8002", "9102", "/tmp/metrics.prom.2")
+    assert worker.command()[-4:] == ["--port", "8002", "--server.maxUploadSize", "10"]
+    assert main._probe_host("0.0.0.0") == "127.0.0.1"
+
+
+def test_supervisor_reports_ready_and_restarts_exited_workers(monkeypatch):
+    monkeypatch.setattr(main, "RESTART_DELAY_SECONDS", 0)
+    running, crashing = FakeWorker(0, "import time; time.sleep(30)"), FakeWorker(1, "raise SystemExit(3)")
+    supervisor = main.Supervisor([running, crashing])
+    supervisor.start()
+    try:
+        crashing.process.wait()
+        supervisor.poll()
+        assert running.ready and not crashing.ready
+        assert crashing.restart_at is not None and crashing.failures == 1
+        supervisor.poll()
+        assert crashing.restarts == 1 and crashing.restart_at is None
+        supervisor.poll()
+        assert supervisor.all_ready
+    finally:
+        supervisor.shutdown()
+    assert running.process.returncode is not None
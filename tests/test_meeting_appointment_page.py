@@ -1,21 +1,36 @@
 import json
+from datetime import datetime
 import requests
 import logging
 import pytest
 
-from demo5_web_svc.pages.meeting_appointment import create_meeting, fetch_meetings
+from demo5_web_svc import http_client, payloads
+from demo5_web_svc.models import Meeting
+from demo5_web_svc.pages import meeting_appointment
+from demo5_web_svc.pages.meeting_appointment import create_meeting, fetch_meetings, meeting_window
 
 
 class FakeResponse:
-    def __init__(self, status_code: int, json_data=None, text: str = ""):
+    def __init__(self, status_code: int, json_data=None, text: str = "", headers=None):
         self.status_code = status_code
         self._json = json_data
         self.text = text
+        self.headers = headers or {}
+        self.content = json.dumps(json_data).encode()
+
+    def close(self):
+        pass
 
     def json(self):
         return self._json
 
 
+@pytest.fixture(autouse=True)
+def windowed_backend(monkeypatch):
+    # Each test starts out assuming the backend honours time windows
+    monkeypatch.setattr(meeting_appointment, "_windows_unsupported", False)
+
+
 def fake_post_success(url, json, headers):
     return FakeResponse(201, json_data={"id": 1, "time": json.get("time"), "location": json.get("location"), "participants": json.get("participants")}, text="Created")
 
@@ -24,19 +39,19 @@ def fake_post_failure(url, json, headers):
     return FakeResponse(400, json_data=None, text="Bad Request")
 
 
-def fake_get_success(url):
+def fake_get_success(url, headers=None, params=None, **kwargs):
     data = [
         {"time": "2023-12-31T10:00:00", "location": "Conference Room", "participants": ["user@example.com"]}
     ]
     return FakeResponse(200, json_data=data, text="OK")
 
 
-def fake_get_failure(url):
+def fake_get_failure(url, headers=None, params=None, **kwargs):
     return FakeResponse(500, json_data=None, text="Internal Server Error")
 
 
 def test_create_meeting_success(monkeypatch):
-    monkeypatch.setattr(requests, "post", fake_post_success)
+    monkeypatch.setattr(http_client, "post", fake_post_success)
     payload = {
         "time": "2099-01-01T10:00:00",
         "location": "Main Hall",
@@ -48,7 +63,7 @@ def test_create_meeting_success(monkeypatch):
 
 
 def test_create_meeting_failure(monkeypatch):
-    monkeypatch.setattr(requests, "post", fake_post_failure)
+    monkeypatch.setattr(http_client, "post", fake_post_failure)
     payload = {
         "time": "2099-01-01T10:00:00",
         "location": "",
@@ -60,15 +75,176 @@ def test_create_meeting_failure(monkeypatch):
 
 
 def test_fetch_meetings_success(monkeypatch):
-    monkeypatch.setattr(requests, "get", fake_get_success)
+    monkeypatch.setattr(http_client, "get", fake_get_success)
     success, data = fetch_meetings()
     assert success is True
-    assert isinstance(data, list)
-    assert len(data) > 0
+    meetings, total = data
+    assert isinstance(meetings, list)
+    assert total == len(meetings) > 0
+    assert meetings[0].location == "Conference Room"
+    assert meetings[0].time == datetime(2023, 12, 31, 10, 0)
+
+
+def test_fetch_meetings_requests_window_page(monkeypatch):
+    sent = []
+
+    def windowed_get(url, headers=None, params=None, **kwargs):
+        sent.append((headers, params))
+        data = {"items": [{"time": "2030-01-02T10:00:00", "location": "Room 1", "participants": []}], "total": 41}
+        return FakeResponse(200, json_data=data, text="OK")
+
+    monkeypatch.setattr(http_client, "get", windowed_get)
+    start, end = datetime(2030, 1, 1), datetime(2030, 1, 8)
+    success, (meetings, total) = fetch_meetings("token", start, end, page_number=3, per_page=20)
+    assert success is True
+    assert total == 41
+    assert len(meetings) == 1
+    headers, params = sent[0]
+    assert headers == {"Authorization": "Bearer token", "Accept": payloads.accept()}
+    assert params == {"limit": 20, "offset": 40, "start": "2030-01-01T00:00:00", "end": "2030-01-08T00:00:00"}
+
+
+def test_fetch_meetings_filters_unwindowed_backend(monkeypatch):
+    def full_list_get(url, headers=None, params=None, **kwargs):
+        data = [
+            {"time": f"2030-01-{day:02d}T10:00:00", "location": f"Room {day}", "participants": []}
+            for day in (5, 1, 3, 2, 4)
+        ]
+        return FakeResponse(200, json_data=data, text="OK")
+
+    monkeypatch.setattr(http_client, "get", full_list_get)
+    success, (meetings, total) = fetch_meetings(None, datetime(2030, 1, 2), datetime(2030, 1, 5), per_page=2)
+    assert success is True
+    assert total == 3
+    assert [meeting.location for meeting in meetings] == ["Room 2", "Room 3"]
+
+
+def test_meeting_window_this_week():
+    start, end = meeting_window("This week", datetime(2030, 1, 3, 15, 42, 10))
+    assert start == datetime(2029, 12, 31)
+    assert end == datetime(2030, 1, 7)
+    assert meeting_window("Upcoming", datetime(2030, 1, 3, 15, 42, 10)) == (datetime(2030, 1, 3, 15, 42), None)
 
 
 def test_fetch_meetings_failure(monkeypatch):
-    monkeypatch.setattr(requests, "get", fake_get_failure)
+    monkeypatch.setattr(http_client, "get", fake_get_failure)
     success, message = fetch_meetings()
     assert success is False
     assert "Failed to fetch meetings" in message
+
+
+def test_fetch_meetings_failure_logs_error_body(monkeypatch, caplog):
+    streamed = []
+
+    def failing_get(url, headers=None, params=None, **kwargs):
+        streamed.append(kwargs.get("stream", False))
+        return fake_get_failure(url)
+
+    monkeypatch.setattr(http_client, "get", failing_get)
+    with caplog.at_level(logging.ERROR):
+        success, _ = fetch_meetings()
+    assert success is False
+    # A streamed response is closed before the error is raised, losing its body
+    assert streamed == [False]
+    assert "Internal Server Error" in caplog.text
+
+
+def test_fetch_meetings_cached_until_create(monkeypatch):
+    calls = []
+
+    def counting_get(url, headers=None, params=None, **kwargs):
+        calls.append(url)
+        return fake_get_success(url)
+
+    monkeypatch.setattr(http_client, "get", counting_get)
+    monkeypatch.setattr(http_client, "post", fake_post_success)
+    fetch_meetings()
+    fetch_meetings()
+    assert len(calls) == 1
+    create_meeting({"time": "2099-01-01T10:00:00", "location": "Main Hall", "participants": []})
+    fetch_meetings()
+    assert len(calls) == 2
+
+
+def test_fetch_meetings_max_age_revalidates(monkeypatch):
+    calls = []
+
+    def counting_get(url, headers=None, params=None, **kwargs):
+        calls.append(url)
+        return fake_get_success(url)
+
+    monkeypatch.setattr(http_client, "get", counting_get)
+    fetch_meetings(max_age=60)
+    fetch_meetings(max_age=60)
+    assert len(calls) == 1
+    fetch_meetings(max_age=0)
+    assert len(calls) == 2
+
+
+def test_refresh_revalidates_only_the_callers_list(monkeypatch):
+    calls = []
+
+    def counting_get(url, headers=None, params=None, **kwargs):
+        calls.append(headers.get("Authorization"))
+        return fake_get_success(url)
+
+    monkeypatch.setattr(http_client, "get", counting_get)
+    fetch_meetings("alice")
+    fetch_meetings("bob")
+    fetch_meetings("alice", max_age=0)
+    fetch_meetings("bob")
+    assert calls == ["Bearer alice", "Bearer bob", "Bearer alice"]
+
+
+def test_meetings_view_rebuilds_rows_only_when_changed():
+    import streamlit as st
+
+    st.session_state.pop(meeting_appointment.MEETINGS_VIEW_KEY, None)
+    meetings = [Meeting(time=datetime(2030, 1, 1, 9), location="Room 1")]
+    rows, total, _ = meeting_appointment._meetings_view(meetings, 1)
+    again, _, _ = meeting_appointment._meetings_view(list(meetings), 1)
+    assert again is rows
+    changed, _, _ = meeting_appointment._meetings_view(meetings + [Meeting(time=datetime(2030, 1, 2, 9))], 2)
+    assert changed is not rows
+    assert len(changed) == 2
+
+
+def test_unwindowed_list_is_fetched_once_for_every_window(monkeypatch):
+    sent = []
+
+    def full_list_get(url, headers=None, params=None, **kwargs):
+        sent.append(params)
+        data = [{"time": f"2030-01-0{day}T10:00:00", "location": f"Room {day}", "participants": []} for day in range(1, 8)]
+        return FakeResponse(200, json_data=data, text="OK")
+
+    monkeypatch.setattr(http_client, "get", full_list_get)
+    fetch_meetings("token", datetime(2030, 1, 2), datetime(2030, 1, 5), page_number=2, per_page=2)
+    success, (meetings, total) = fetch_meetings("token", datetime(2030, 1, 4, 10, 30))
+    assert success is True
+    assert [meeting.location for meeting in meetings] == ["Room 5", "Room 6", "Room 7"]
+    assert total == 3
+    assert len(sent) == 1
+    assert len(meeting_appointment.cache.data_cache._entries) == 1
+
+
+def test_upcoming_window_is_requested_by_the_hour(monkeypatch):
+    sent = []
+    times = ["2030-01-01T10:05:00", "2030-01-01T10:20:00", "2030-01-01T10:40:00", "2030-01-01T11:00:00", "2030-01-01T12:00:00"]
+
+    def windowed_get(url, headers=None, params=None, **kwargs):
+        sent.append(params)
+        offset, limit = params["offset"], params["limit"]
+        items = [{"time": time, "location": time[11:16], "participants": []} for time in times[offset:offset + limit]]
+        return FakeResponse(200, json_data={"items": items, "total": len(times)}, text="OK")
+
+    monkeypatch.setattr(http_client, "get", windowed_get)
+    success, (meetings, total) = fetch_meetings("token", datetime(2030, 1, 1, 10, 30), per_page=2)
+    assert [meeting.location for meeting in meetings] == ["10:40", "11:00"]
+    assert total == 3
+    assert {params["start"] for params in sent} == {"2030-01-01T10:00:00"}
+    sent.clear()
+    # A minute later the same backend pages are reused
+    assert fetch_meetings("token", datetime(2030, 1, 1, 10, 31), per_page=2)[1] == (meetings, total)
+    assert sent == []
+    success, (meetings, total) = fetch_meetings("token", datetime(2030, 1, 1, 10, 31), page_number=2, per_page=2)
+    assert [meeting.location for meeting in meetings] == ["12:00"]
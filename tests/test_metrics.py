@@ -0,0 +1,69 @@
+import requests
+
+from demo5_web_svc import metrics
+
+
+def setup_function():
+    metrics.reset()
+
+
+def test_endpoint_name_templates_ids():
+    assert metrics.endpoint_name("put", "/forum/42") == "PUT /forum/{id}"
+    assert metrics.endpoint_name("GET", "forum?limit=5") == "GET /forum"
+
+
+def test_endpoint_summary_percentiles():
+    for millis in range(1, 101):
+        metrics.record_request("GET", "/forum", 200, millis / 1000, response_bytes=10)
+    metrics.record_request("GET", "/forum", "error", 1.0, retries=1)
+    row = metrics.endpoint_summary()[0]
+    assert row["requests"] == 101
+    assert row["p50_ms"] == 50.0
+    assert row["p99_ms"] == 100.0
+    assert row["statuses"] == "200: 100, error: 1"
+    assert row["response_bytes"] == 1000
+    assert row["retries"] == 1
+
+
+def test_render_prometheus():
+    metrics.record_request("GET", "/api/meetings", 200, 0.02, response_bytes=5)
+    metrics.record_page_render("Forum", 0.3)
+    text = metrics.render_prometheus()
+    assert 'demo5_backend_request_duration_seconds_bucket{endpoint="GET /api/meetings",le="0.025"} 1' in text
+    assert 'demo5_backend_request_duration_seconds_bucket{endpoint="GET /api/meetings",le="0.01"} 0' in text
+    assert 'demo5_backend_requests_total{endpoint="GET /api/meetings",status="200"} 1' in text
+    assert 'demo5_backend_response_bytes_total{endpoint="GET /api/meetings"} 5' in text
+    assert 'demo5_page_render_duration_seconds_count{page="Forum"} 1' in text
+
+
+def test_payload_summary_reports_bytes_saved():
+    metrics.record_payload("GET", "/forum?limit=5", "msgpack+gzip", 0.004, wire_bytes=100, body_bytes=900)
+    metrics.record_payload("GET", "/forum?limit=5", "msgpack+gzip", 0.002, wire_bytes=100, body_bytes=900)
+    row = metrics.payload_summary()[0]
+    assert row["endpoint"] == "GET /forum"
+    assert row["format"] == "msgpack+gzip"
+    assert row["responses"] == 2
+    assert row["bytes_saved"] == 1600
+    assert row["decode_p99_ms"] == 4.0
+    text = metrics.render_prometheus()
+    assert 'demo5_backend_payload_wire_bytes_total{endpoint="GET /forum",format="msgpack+gzip"} 200' in text
+
+
+def test_metrics_server_serves_prometheus_text():
+    metrics.record_request("GET", "/forum", 200, 0.01)
+    server = metrics.start_metrics_server("127.0.0.1", 0)
+    try:
+        host, port = server.server_address[:2]
+        response = requests.get(f"http://{host}:{port}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert "demo5_backend_requests_total" in response.text
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_write_metrics_file(tmp_path):
+    metrics.record_page_render("Login", 0.1)
+    path = tmp_path / "metrics.prom"
+    metrics.write_metrics_file(str(path))
+    assert 'page="Login"' in path.read_text()
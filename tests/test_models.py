@@ -0,0 +1,52 @@
+import dataclasses
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from demo5_web_svc import models
+
+
+def test_parse_posts_batch():
+    posts = models.parse_posts([
+        {"id": 1, "title": "A", "content": "x", "created_at": "2024-01-01T00:00:00", "unknown": 1},
+        {"id": "2"},
+    ])
+    assert [post.id for post in posts] == [1, 2]
+    assert posts[0].created_at == datetime(2024, 1, 1)
+    assert posts[1].title == ""
+
+
+def test_models_are_slotted_and_frozen():
+    post = models.Post(id=1, title="A")
+    assert not hasattr(post, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        post.title = "B"
+    assert dataclasses.replace(post, title="B").title == "B"
+
+
+def test_parse_meetings_from_json_bytes():
+    meetings = models.parse_meetings(
+        b'[{"time": "2030-01-01T09:30:00", "location": "Room 1", "participants": ["a@example.com", "b@example.com"]}]'
+    )
+    assert meetings[0].time == datetime(2030, 1, 1, 9, 30)
+    assert meetings[0].to_row() == {
+        "time": "2030-01-01 09:30",
+        "location": "Room 1",
+        "participants": "a@example.com, b@example.com",
+    }
+
+
+def test_parse_meetings_rejects_missing_time():
+    with pytest.raises(ValidationError):
+        models.parse_meetings([{"location": "Room 1"}])
+
+
+def test_meeting_index_range_and_upcoming():
+    meetings = [models.Meeting(time=datetime(2030, 1, day, 10), location=str(day)) for day in (4, 1, 3, 2)]
+    index = models.MeetingIndex(meetings)
+    assert [meeting.location for meeting in index] == ["1", "2", "3", "4"]
+    assert [meeting.location for meeting in index.between(datetime(2030, 1, 2), datetime(2030, 1, 4))] == ["2", "3"]
+    assert [meeting.location for meeting in index.upcoming(datetime(2030, 1, 2, 11), 5)] == ["3", "4"]
+    index.add(models.Meeting(time=datetime(2030, 1, 2, 12), location="new"))
+    assert [meeting.location for meeting in index.upcoming(datetime(2030, 1, 2, 11), 1)] == ["new"]
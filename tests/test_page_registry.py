@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+from demo5_web_svc import metrics, page_registry
+from demo5_web_svc.page_registry import PageEntry
+
+
+def test_registry_covers_navigation_entries():
+    assert page_registry.navigation_labels() == ("Signup", "Login", "Forum", "Meetings")
+    assert page_registry.navigation_labels(is_admin=True)[-1] == "Metrics"
+
+
+def test_page_module_imported_on_first_load(monkeypatch):
+    calls = []
+    module = types.ModuleType("fake_registry_page")
+    module.render = lambda: calls.append("rendered")
+    monkeypatch.setitem(sys.modules, "fake_registry_page", module)
+
+    entry = PageEntry("Fake", "fake_registry_page", "render")
+    assert entry.import_seconds is None
+    metrics.reset()
+    entry.render()
+    assert calls == ["rendered"]
+    assert metrics.page_summary()[0]["page"] == "Fake"
+    assert entry.import_seconds is not None
+    assert entry.first_render_seconds is not None
+
+
+def test_load_resolves_replaced_render_function(monkeypatch):
+    module = types.ModuleType("fake_registry_page")
+    module.render = lambda: "old"
+    monkeypatch.setitem(sys.modules, "fake_registry_page", module)
+
+    entry = PageEntry("Fake", "fake_registry_page", "render")
+    entry.load()
+    monkeypatch.setattr(module, "render", lambda: "new")
+    assert entry.load()() == "new"
+
+
+def test_warm_pages_imports_without_rendering():
+    timings = page_registry.warm_pages(["Login"])
+    assert set(timings) == {"Login"}
+    assert page_registry.get_page_timings()["Login"]["import_seconds"] is not None
+
+
+def test_navigation_does_not_import_backend_modules():
+    # The app script only needs the role claim before a page is chosen
+    code = (
+        "import sys\n"
+        "from demo5_web_svc import claims, page_registry\n"
+        "page_registry.navigation_labels(claims.is_admin(None))\n"
+        "print(sorted(m for m in ('requests', 'sqlite3', 'demo5_web_svc.session') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(page_registry.__file__).parents[1]))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from demo5_web_svc import metrics, payloads
+
+
+class Request:
+    method = "GET"
+    path_url = "/forum?limit=5"
+
+
+class BodyResponse:
+    def __init__(self, content, content_type="application/json", chunk_size=7, encoding=None):
+        self.content = content
+        self.headers = {"Content-Type": content_type, "Content-Length": str(len(content))}
+        if encoding:
+            self.headers["Content-Encoding"] = encoding
+        self.chunk_size = chunk_size
+        self.request = Request()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), self.chunk_size):
+            yield self.content[start:start + self.chunk_size]
+
+
+def setup_function():
+    metrics.reset()
+
+
+def test_accept_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(payloads.config, "HTTP_BINARY_PAYLOADS", False)
+    assert payloads.accept() == "application/json"
+    monkeypatch.setattr(payloads.config, "HTTP_COMPRESSION", False)
+    assert payloads.accept_encoding() == "identity"
+
+
+def test_json_window_is_parsed_and_recorded():
+    body = json.dumps([{"id": n} for n in range(20)]).encode()
+    data = payloads.parse_window(BodyResponse(body), 5, 7)
+    assert data == {"items": [{"id": 5}, {"id": 6}], "total": 20}
+    row = metrics.payload_summary()[0]
+    assert (row["format"], row["decoded_bytes"], row["wire_bytes"]) == ("json+identity", len(body), len(body))
+
+
+def test_msgpack_bodies_are_streamed_across_chunks():
+    msgpack = pytest.importorskip("msgpack")
+    items = [{"id": n, "title": "x" * n} for n in range(40)]
+    window = payloads.parse_window(BodyResponse(msgpack.packb(items), "application/msgpack"), 38, 45)
+    assert window == {"items": items[38:], "total": 40}
+
+    envelope = {"items": items[:3], "total": 40}
+    response = BodyResponse(msgpack.packb(envelope), "application/x-msgpack", encoding="gzip")
+    data, iterator = payloads.iter_items(response)
+    assert data == envelope
+    assert list(iterator) == items[:3]
+    assert payloads.decode(BodyResponse(msgpack.packb(items), "application/msgpack")) == items
+    assert {row["format"] for row in metrics.payload_summary()} == {"msgpack+identity", "msgpack+gzip"}
+
+
+def test_truncated_msgpack_body_raises():
+    msgpack = pytest.importorskip("msgpack")
+    body = msgpack.packb(list(range(100)))[:-10]
+    with pytest.raises(ValueError):
+        payloads.parse_window(BodyResponse(body, "application/msgpack"), 0, 5)
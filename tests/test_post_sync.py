@@ -0,0 +1,110 @@
+import pytest
+import requests
+
+from benchmarks.stub_backend import StubBackend, make_token
+from demo5_web_svc import config, http_client, post_sync
+from demo5_web_svc.models import Post
+from demo5_web_svc.pages import forum
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(config, "FORUM_DELTA_SYNC", True)
+    monkeypatch.setattr(config, "FORUM_SYNC_SECONDS", 0)
+    with StubBackend(post_count=12) as backend:
+        monkeypatch.setattr(http_client, "BASE_URL", backend.url)
+        yield backend
+
+
+def forum_requests(backend):
+    return backend.stats["by_path"].get("/forum", 0)
+
+
+def test_post_list_merges_changes_and_tombstones():
+    posts = post_sync.PostList()
+    posts.replace([Post(id=i, title=f"Post {i}") for i in (1, 2, 3, 4)], "1")
+    posts.apply([Post(id=2, title="Edited"), Post(id=7, title="New")], [1, 9], "2")
+    page, total = posts.page(1, 2)
+    assert [post.title for post in page] == ["Edited", "Post 3"]
+    assert total == 4
+    assert [post.id for post in posts.page(2, 2)[0]] == [4, 7]
+    assert posts.cursor == "2"
+
+
+def test_local_writes_wait_for_the_first_load():
+    posts = post_sync.PostList()
+    posts.apply([Post(id=1, title="Mine")], [])
+    assert len(posts) == 0
+
+
+def test_first_load_is_full_then_only_changes(backend):
+    token = make_token()
+    posts, total = forum.load_posts(token, 3)
+    assert [post.id for post in posts] == [11, 12]
+    assert total == 12
+
+    requests.put(f"{backend.url}/forum/11", json={"title": "Edited", "content": "C"})
+    requests.delete(f"{backend.url}/forum/2")
+    backend.reset_stats()
+    posts, total = forum.load_posts(token, 3)
+    assert [post.title for post in posts] == ["Post 12"]
+    assert total == 11
+    assert forum.load_posts(token, 2)[0][-1].title == "Edited"
+    assert forum_requests(backend) == 2
+    assert post_sync.stats()["full_syncs"] == 1
+    assert post_sync.stats()["changes"] == 2
+
+
+def test_sync_gap_reloads_everything(backend):
+    token = make_token()
+    forum.load_posts(token)
+    backend.changelog_size = 1
+    requests.delete(f"{backend.url}/forum/1")
+    requests.delete(f"{backend.url}/forum/2")
+    posts, total = forum.load_posts(token)
+    assert [post.id for post in posts] == [3, 4, 5, 6, 7]
+    assert total == 10
+    stats = post_sync.stats()
+    assert (stats["full_syncs"], stats["gaps"]) == (2, 1)
+
+
+def test_backend_without_delta_falls_back_to_pages(backend):
+    backend.delta = False
+    token = make_token()
+    posts, total = forum.load_posts(token, 2)
+    assert [post.id for post in posts] == [6, 7, 8, 9, 10]
+    assert total == 12
+    assert not post_sync.supported()
+    backend.reset_stats()
+    forum.load_posts(token, 2)
+    assert forum_requests(backend) == 0
+
+
+class Unauthorized:
+    status_code = 401
+
+    def raise_for_status(self):
+        raise requests.HTTPError("401 Unauthorized", response=self)
+
+    def close(self):
+        pass
+
+
+def test_copies_are_kept_per_scope(backend, monkeypatch):
+    get = http_client.get
+    # Another token of the same subject that was not issued by the auth service
+    forged = make_token("alice", ttl_seconds=7200)
+
+    def reject_forged(path, headers, **kwargs):
+        if headers["Authorization"] == f"Bearer {forged}":
+            return Unauthorized()
+        return get(path, headers=headers, **kwargs)
+
+    monkeypatch.setattr(config, "FORUM_SYNC_SECONDS", 60)
+    monkeypatch.setattr(http_client, "get", reject_forged)
+    forum.load_posts(make_token("alice"))
+    # It is not served alice's copy, so the backend gets to reject it
+    with pytest.raises(requests.HTTPError):
+        forum.load_posts(forged)
+    assert post_sync.stats()["scopes"] == 2
+    assert post_sync.stats()["full_syncs"] == 1
@@ -0,0 +1,176 @@
+import json
+
+import pytest
+import requests
+import streamlit as st
+
+from benchmarks.stub_backend import StubBackend, make_token
+from demo5_web_svc import config, http_client, post_sync, search, session
+from demo5_web_svc.models import Post
+from demo5_web_svc.search import SearchIndex
+
+
+def make_index():
+    index = SearchIndex()
+    index.add(Post(id=1, title="Welcome", content="Hello forum users"))
+    index.add(Post(id=2, title="Meeting notes", content="Forum meeting on Monday"))
+    index.add(Post(id=3, title="Hello again", content="Second hello"))
+    return index
+
+
+def test_search_intersects_words_in_id_order():
+    index = make_index()
+    assert index.search("hello") == [1, 3]
+    assert index.search("FORUM hello") == [1]
+    assert index.search("forum") == [1, 2]
+    assert index.search("missing") == []
+    assert index.search("  ") == []
+
+
+def test_last_word_matches_as_prefix():
+    index = make_index()
+    assert index.search("meet") == [2]
+    assert index.search("forum meet") == [2]
+    assert index.search("meet forum") == []
+    assert index.search("he") == [1, 3]
+
+
+def test_updates_and_removals_are_incremental():
+    index = make_index()
+    assert index.search("hello") == [1, 3]
+    index.add(Post(id=1, title="Welcome", content="Goodbye"))
+    assert index.search("hello") == [3]
+    assert index.search("goodbye") == [1]
+    index.remove(3)
+    assert index.search("hello") == []
+    assert len(index) == 2
+
+
+def test_page_returns_posts_and_total():
+    index = SearchIndex()
+    for post_id in range(1, 13):
+        index.add(Post(id=post_id, title=f"Post {post_id}", content="spam"))
+    posts, total = index.page("spam", 3, 5)
+    assert [post.id for post in posts] == [11, 12]
+    assert total == 12
+
+
+def test_build_skips_posts_written_meanwhile():
+    index = SearchIndex()
+
+    def streamed():
+        yield Post(id=1, title="old title")
+        # A write confirmed while the build is still streaming
+        index.add(Post(id=2, title="new title"))
+        yield Post(id=2, title="old title")
+
+    assert index.build(streamed()) == 2
+    assert index.ready
+    assert index.search("new") == [2]
+    assert index.search("old") == [1]
+
+
+def test_rebuild_drops_posts_deleted_elsewhere():
+    index = make_index()
+    index.build([Post(id=1, title="Welcome"), Post(id=3, title="Hello again")])
+    assert index.search("meeting") == []
+    assert len(index) == 2
+
+
+def test_indexes_are_kept_per_scope(monkeypatch):
+    monkeypatch.setattr(st, "session_state", {})
+    session.store_token("alice-1.eyJzdWIiOiAiYWxpY2UifQ.x")
+    session.store_token("alice-2.eyJzdWIiOiAiYWxpY2UifQ.x")
+    alice = search.index_for("alice-1.eyJzdWIiOiAiYWxpY2UifQ.x")
+    alice.add(Post(id=1, title="Private draft"))
+    assert search.index_for("alice-2.eyJzdWIiOiAiYWxpY2UifQ.x") is alice
+    # A token that did not come from the auth service gets an index of its own
+    assert search.index_for("forged.eyJzdWIiOiAiYWxpY2UifQ.x") is not alice
+    search.update("forged.eyJzdWIiOiAiYWxpY2UifQ.x", [Post(id=2, title="draft")])
+    assert alice.search("draft") == [1]
+
+
+def test_stale_index_is_rebuilt_in_the_background(monkeypatch):
+    streams = [[Post(id=1, title="first")], [Post(id=2, title="second")]]
+    monkeypatch.setattr(search, "_stream_posts", lambda token: iter(streams.pop(0)))
+    monkeypatch.setattr(config, "SEARCH_REBUILD_SECONDS", 0)
+    index = search.index_for("token")
+    search.ensure_index("token")
+    index.building.result(timeout=5)
+    assert index.search("first") == [1]
+    # Stale, so a rebuild starts, but the previous contents keep serving searches
+    assert search.ensure_index("token")
+    index.building.result(timeout=5)
+    assert index.search("second") == [2]
+    assert index.search("first") == []
+
+
+def test_delta_sync_refreshes_index_without_streaming(monkeypatch):
+    monkeypatch.setattr(config, "FORUM_DELTA_SYNC", True)
+    monkeypatch.setattr(config, "FORUM_SYNC_SECONDS", 0)
+    monkeypatch.setattr(config, "SEARCH_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(search, "_stream_posts", lambda token: pytest.fail("streamed the whole forum"))
+    with StubBackend(post_count=3) as backend:
+        monkeypatch.setattr(http_client, "BASE_URL", backend.url)
+        token = make_token()
+        index = search.index_for(token)
+        search.ensure_index(token)
+        index.building.result(timeout=5)
+        assert index.search("post") == [1, 2, 3]
+        # Written by another client; the next search picks it up from the delta feed
+        requests.put(f"{backend.url}/forum/2", json={"title": "Renamed", "content": ""})
+        requests.delete(f"{backend.url}/forum/3")
+        assert search.ensure_index(token)
+        index.building.result(timeout=5)
+    assert index.search("renamed") == [2]
+    assert index.search("post") == [1]
+    assert post_sync.stats()["full_syncs"] == 1
+
+
+def test_find_does_not_add_indexes():
+    assert search.find("visitor") is None
+    search.update("visitor", [Post(id=1, title="Hello")])
+    assert search.find("visitor") is None
+
+
+class StreamedResponse:
+    def __init__(self, data):
+        self.content = json.dumps(data).encode()
+        self.headers = {"Content-Type": "application/json"}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        yield self.content
+
+    def close(self):
+        pass
+
+
+def test_stream_posts_pages_through_backend(monkeypatch):
+    offsets = []
+
+    def fake_get(path, headers, params, stream):
+        offsets.append(params["offset"])
+        start = params["offset"]
+        items = [{"id": i} for i in range(start + 1, min(start + params["limit"], 5) + 1)]
+        return StreamedResponse({"items": items, "total": 5})
+
+    monkeypatch.setattr(search, "BUILD_PAGE_SIZE", 2)
+    monkeypatch.setattr(http_client, "get", fake_get)
+    assert [post.id for post in search._stream_posts("token")] == [1, 2, 3, 4, 5]
+    assert offsets == [0, 2, 4]
+
+
+def test_stream_posts_reads_unpaginated_backend_once(monkeypatch):
+    calls = []
+
+    def fake_get(path, headers, params, stream):
+        calls.append(params)
+        return StreamedResponse([{"id": i} for i in range(1, 6)])
+
+    monkeypatch.setattr(search, "BUILD_PAGE_SIZE", 2)
+    monkeypatch.setattr(http_client, "get", fake_get)
+    assert [post.id for post in search._stream_posts("token")] == [1, 2, 3, 4, 5]
+    assert len(calls) == 1
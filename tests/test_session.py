@@ -0,0 +1,71 @@
+import base64
+import json
+import time
+
+import streamlit as st
+
+from demo5_web_svc import http_client, session
+
+
+def make_token(exp):
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+    return f"{encode({'alg': 'HS256'})}.{encode({'sub': 'user', 'exp': exp})}.signature"
+
+
+class FakeResponse:
+    def __init__(self, status_code, json_data=None):
+        self.status_code = status_code
+        self._json = json_data
+
+    def json(self):
+        return self._json
+
+    def raise_for_status(self):
+        pass
+
+
+def test_decode_claims_and_expiry():
+    token = make_token(2_000_000_000)
+    assert session.decode_claims(token) == {"sub": "user", "exp": 2_000_000_000}
+    assert session.token_expiry(token) == 2_000_000_000
+    assert session.decode_claims("opaque-token") == {}
+    assert session.is_expired("opaque-token") is False
+
+
+def test_is_expired():
+    assert session.is_expired(make_token(time.time() - 10)) is True
+    assert session.is_expired(make_token(time.time() + 3600)) is False
+
+
+def test_get_token_drops_expired_token():
+    session.store_token(make_token(time.time() - 10))
+    assert session.get_token() is None
+    assert st.session_state[session.TOKEN_KEY] is None
+    assert "expired" in session.login_required_message("Please login")
+
+
+def test_get_token_refreshes_shortly_before_expiry(monkeypatch):
+    fresh = make_token(time.time() + 3600)
+    monkeypatch.setattr(session, "_refresh_unsupported", False)
+    monkeypatch.setattr(http_client, "post", lambda path, headers: FakeResponse(200, {"token": fresh}))
+    session.store_token(make_token(time.time() + 30))
+    assert session.get_token() == fresh
+    assert st.session_state[session.TOKEN_KEY] == fresh
+
+
+def test_get_token_keeps_token_when_refresh_unsupported(monkeypatch):
+    calls = []
+
+    def fake_post(path, headers):
+        calls.append(path)
+        return FakeResponse(404)
+
+    monkeypatch.setattr(session, "_refresh_unsupported", False)
+    monkeypatch.setattr(http_client, "post", fake_post)
+    token = make_token(time.time() + 30)
+    session.store_token(token)
+    assert session.get_token() == token
+    assert session.get_token() == token
+    assert calls == ["/api/refresh"]
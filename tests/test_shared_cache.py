@@ -0,0 +1,68 @@
+import json
+import sqlite3
+
+from demo5_web_svc.cache import TTLCache
+from demo5_web_svc.shared_cache import FORMAT_VERSION, SharedStore
+
+
+def make_cache(path, ttl=60, stale_ttl=0, max_bytes=1 << 20):
+    # One cache and store per simulated process, all on the same database file
+    store = SharedStore(str(path), max_bytes=max_bytes, max_age=ttl + stale_ttl)
+    cache = TTLCache(ttl=ttl, stale_ttl=stale_ttl, shared=store)
+    cache.share("posts", lambda value: json.dumps(value).encode(), json.loads)
+    return cache, store
+
+
+def failing_loader():
+    raise AssertionError("should have been served from the shared store")
+
+
+def test_fresh_process_is_served_from_shared_store(tmp_path):
+    first, store = make_cache(tmp_path / "cache.db")
+    store.trust("token-a", "alice", None)
+    assert first.get_or_load(("posts", "token-a", 5, 1), lambda: [1, 2]) == [1, 2]
+
+    second, other_store = make_cache(tmp_path / "cache.db")
+    assert second.get_or_load(("posts", "token-a", 5, 1), failing_loader) == [1, 2]
+    # Another genuine token of the same user shares the entry; an unknown token does not
+    other_store.trust("token-a2", "alice", None)
+    assert second.get_or_load(("posts", "token-a2", 5, 1), failing_loader) == [1, 2]
+    assert second.get_or_load(("posts", "forged", 5, 1), lambda: ["own"]) == ["own"]
+    assert other_store.stats()["entries"] == 1
+
+
+def test_shared_entries_keep_their_age(tmp_path):
+    first, _ = make_cache(tmp_path / "cache.db", ttl=10, stale_ttl=50)
+    first.set(("posts", None, 1), ["old"], age=20)
+    second, _ = make_cache(tmp_path / "cache.db", ttl=10, stale_ttl=50)
+    assert second._load_shared(("posts", None, 1))
+    assert second.get(("posts", None, 1)) == (True, ["old"], True)
+
+
+def test_invalidate_shared_retires_other_processes_entries(tmp_path):
+    first, _ = make_cache(tmp_path / "cache.db")
+    first.set(("posts", None, 1), ["a"])
+    second, _ = make_cache(tmp_path / "cache.db")
+    second.invalidate_shared("posts")
+    third, _ = make_cache(tmp_path / "cache.db")
+    assert third.get_or_load(("posts", None, 1), lambda: ["b"]) == ["b"]
+
+
+def test_store_is_bounded_by_size(tmp_path):
+    store = SharedStore(str(tmp_path / "cache.db"), max_bytes=250, max_age=60)
+    for key in range(5):
+        store.put("posts", "public", str(key), b"x" * 100)
+    assert store.get("posts", "public", "0") is None
+    assert store.get("posts", "public", "4") is not None
+    assert store.stats()["bytes"] <= 250
+    assert store.stats()["evictions"] == 3
+
+
+def test_incompatible_database_is_reset(tmp_path):
+    path = tmp_path / "cache.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE entries (junk)")
+        connection.execute(f"PRAGMA user_version = {FORMAT_VERSION + 1}")
+    store = SharedStore(str(path), max_bytes=1000, max_age=60)
+    store.put("posts", "public", "1", b"ok")
+    assert store.get("posts", "public", "1")[1] == b"ok"
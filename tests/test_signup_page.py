@@ -3,6 +3,7 @@ import json
 import requests
 import pytest
 
+from demo5_web_svc import http_client
 from demo5_web_svc.pages import signup
 
 
@@ -52,7 +53,7 @@ def test_perform_signup_request_success(monkeypatch):
     def dummy_post(url, json, headers, timeout):
         return DummyResponse(200, {"jwt_token": "dummy_jwt_token"})
 
-    monkeypatch.setattr("requests.post", dummy_post)
+    monkeypatch.setattr(http_client, "post", dummy_post)
     success, token = signup.perform_signup_request("test@example.com", "strongpassword", "valid_token")
     assert success
     assert token == "dummy_jwt_token"
@@ -63,7 +64,7 @@ def test_perform_signup_request_failure(monkeypatch):
     def dummy_post(url, json, headers, timeout):
         return DummyResponse(200, {"error": "failure"})
 
-    monkeypatch.setattr("requests.post", dummy_post)
+    monkeypatch.setattr(http_client, "post", dummy_post)
     success, message = signup.perform_signup_request("test@example.com", "strongpassword", "valid_token")
     assert not success
     assert "JWT token not received" in message
@@ -74,7 +75,7 @@ def test_perform_signup_request_exception(monkeypatch):
     def dummy_post(url, json, headers, timeout):
         raise requests.RequestException("Network error")
 
-    monkeypatch.setattr("requests.post", dummy_post)
+    monkeypatch.setattr(http_client, "post", dummy_post)
     success, message = signup.perform_signup_request("test@example.com", "strongpassword", "valid_token")
     assert not success
     assert "Signup error:" in message
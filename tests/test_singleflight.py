@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from demo5_web_svc.singleflight import Group
+
+
+def test_concurrent_calls_share_one_result():
+    group = Group()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"items": []}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(group.do("key", slow)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(group.do("key", slow)))
+    follower.start()
+    deadline = time.monotonic() + 5
+    while group.stats()["coalesced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True]
+    assert results[0][0] is results[1][0]
+    assert group.stats() == {"calls": 1, "coalesced": 1}
+
+
+def test_sequential_calls_are_not_coalesced():
+    group = Group()
+    assert group.do("key", lambda: 1) == (1, False)
+    assert group.do("key", lambda: 2) == (2, False)
+
+
+def test_exception_is_raised_and_key_released():
+    group = Group()
+
+    def failing():
+        raise ValueError("backend down")
+
+    with pytest.raises(ValueError):
+        group.do("key", failing)
+    assert group.do("key", lambda: "ok") == ("ok", False)
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from demo5_web_svc import streaming
+
+
+def chunked(data, size):
+    body = json.dumps(data).encode()
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 100_000])
+def test_iter_json_array_yields_each_element(chunk_size):
+    data = [{"id": i, "title": f"Tïtle {i}"} for i in range(20)] + [12345, "text", None]
+    assert list(streaming.iter_json_array(chunked(data, chunk_size))) == data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_iter_json_array_numbers_split_across_chunks(chunk_size):
+    data = [1.5, -2, 3e-4, 0.25, 1e10, -7.125]
+    assert list(streaming.iter_json_array(chunked(data, chunk_size))) == data
+    assert list(streaming.iter_json_array([b"[1.", b"5, 2]"])) == [1.5, 2]
+    assert list(streaming.iter_json_array([b"[1", b" ", b"]"])) == [1]
+
+
+def test_iter_json_array_empty():
+    assert list(streaming.iter_json_array([b" [ ] "])) == []
+
+
+def test_iter_json_array_truncated_body_raises():
+    with pytest.raises(ValueError):
+        list(streaming.iter_json_array([b'[{"id": 1}, {"id"']))
+
+
+def test_parse_window_keeps_only_requested_slice():
+    posts = [{"id": i} for i in range(1, 101)]
+    result = streaming.parse_window(chunked(posts, 7), 10, 15)
+    assert result == {"items": posts[10:15], "total": 100}
+
+
+def test_parse_window_passes_objects_through():
+    body = {"items": [{"id": 1}], "total": 40}
+    assert streaming.parse_window(chunked(body, 4), 0, 5) == body
+
+
+def test_iter_items_handles_arrays_and_envelopes():
+    envelope, items = streaming.iter_items(chunked([{"id": 1}, {"id": 2}], 3))
+    assert envelope is None
+    assert list(items) == [{"id": 1}, {"id": 2}]
+    envelope, items = streaming.iter_items(chunked({"items": [{"id": 3}], "total": 9}, 4))
+    assert envelope["total"] == 9
+    assert list(items) == [{"id": 3}]
@@ -0,0 +1,91 @@
+import requests
+
+from benchmarks.stub_backend import StubBackend, msgpack
+
+
+def test_stub_backend_pages_and_revalidates():
+    with StubBackend(post_count=12) as backend:
+        response = requests.get(f"{backend.url}/forum", params={"limit": 5, "offset": 10})
+        data = response.json()
+        assert data["total"] == 12
+        assert [post["id"] for post in data["items"]] == [11, 12]
+
+        etag = response.headers["ETag"]
+        response = requests.get(
+            f"{backend.url}/forum", params={"limit": 5, "offset": 10}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert backend.stats["requests"] == 2
+
+
+def test_stub_backend_delete_shifts_pages():
+    with StubBackend(post_count=10) as backend:
+        assert requests.delete(f"{backend.url}/forum/3").status_code == 204
+        data = requests.get(f"{backend.url}/forum", params={"limit": 3, "offset": 0}).json()
+        assert [post["id"] for post in data["items"]] == [1, 2, 4]
+        assert data["total"] == 9
+
+
+def test_stub_backend_injects_errors():
+    with StubBackend(error_rate=1.0) as backend:
+        assert requests.get(f"{backend.url}/api/meetings").status_code == 500
+        assert backend.stats["errors"] == 1
+
+
+def test_stub_backend_batch_endpoint():
+    with StubBackend(post_count=5) as backend:
+        operations = [{"op": "delete", "id": 2}, {"op": "update", "id": 3, "title": "T", "content": "C"}, {"op": "delete", "id": 9}]
+        results = requests.post(f"{backend.url}/forum/batch", json={"operations": operations}).json()["results"]
+        assert [item["status"] for item in results] == [204, 200, 404]
+        data = requests.get(f"{backend.url}/forum", params={"limit": 5, "offset": 0}).json()
+        assert [post["title"] for post in data["items"]] == ["Post 1", "T", "Post 4", "Post 5"]
+
+    with StubBackend(batch=False) as backend:
+        assert requests.post(f"{backend.url}/forum/batch", json={"operations": []}).status_code == 404
+
+
+def test_stub_backend_revalidates_meetings():
+    with StubBackend(meeting_count=3) as backend:
+        response = requests.get(f"{backend.url}/api/meetings", params={"limit": 2})
+        assert len(response.json()["items"]) == 2
+        etag = response.headers["ETag"]
+        response = requests.get(f"{backend.url}/api/meetings", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        requests.post(f"{backend.url}/api/meetings", json={"time": "2031-01-01T10:00:00"})
+        response = requests.get(f"{backend.url}/api/meetings", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+
+
+def test_stub_backend_negotiates_encoding():
+    with StubBackend(post_count=50, paginate=False) as backend:
+        plain = requests.get(f"{backend.url}/forum", headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in plain.headers
+        compressed = requests.get(f"{backend.url}/forum", headers={"Accept-Encoding": "gzip"})
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert int(compressed.headers["Content-Length"]) < int(plain.headers["Content-Length"])
+        assert compressed.json() == plain.json()
+
+    with StubBackend(post_count=50, compress=False) as backend:
+        response = requests.get(f"{backend.url}/forum", headers={"Accept": "application/msgpack, application/json;q=0.9"})
+        assert "Content-Encoding" not in response.headers
+        if msgpack is not None:
+            assert response.headers["Content-Type"] == "application/msgpack"
+            assert msgpack.unpackb(response.content)["total"] == 50
+        else:
+            assert response.json()["total"] == 50
+
+
+def test_stub_backend_serves_changes_since_cursor():
+    with StubBackend(post_count=5, changelog_size=2) as backend:
+        snapshot = requests.get(f"{backend.url}/forum", params={"updated_since": "0"}).json()
+        assert len(snapshot["items"]) == 5
+        cursor = snapshot["cursor"]
+
+        requests.put(f"{backend.url}/forum/2", json={"title": "T", "content": "C"})
+        requests.delete(f"{backend.url}/forum/4")
+        changes = requests.get(f"{backend.url}/forum", params={"updated_since": cursor}).json()
+        assert changes["items"] == [backend._post(2), {"id": 4, "deleted": True}]
+        assert requests.get(f"{backend.url}/forum", params={"updated_since": changes["cursor"]}).json()["items"] == []
+
+        requests.post(f"{backend.url}/forum", json={"title": "New", "content": "C"})
+        assert requests.get(f"{backend.url}/forum", params={"updated_since": cursor}).status_code == 410
@@ -0,0 +1,50 @@
+import pytest
+from email_validator import EmailNotValidError, EmailUndeliverableError
+
+from demo5_web_svc import validation
+
+
+@pytest.fixture(autouse=True)
+def fake_dns(monkeypatch):
+    lookups = []
+
+    def fake_deliverability(domain, domain_i18n, timeout=None):
+        lookups.append(domain)
+        if domain == "nomail.example":
+            raise EmailUndeliverableError(f"The domain name {domain_i18n} does not accept email.")
+        return {"mx": [(10, f"mx.{domain}")]}
+
+    validation._domain_cache.clear()
+    monkeypatch.setattr(validation, "validate_email_deliverability", fake_deliverability)
+    return lookups
+
+
+def test_syntax_only_skips_dns(fake_dns):
+    assert validation.validate_address("User@Example.com", check_deliverability=False) == "User@example.com"
+    assert fake_dns == []
+
+
+def test_deliverability_is_cached_per_domain(fake_dns):
+    validation.validate_address("a@example.com", check_deliverability=True)
+    validation.validate_address("b@example.com", check_deliverability=True)
+    assert fake_dns == ["example.com"]
+
+
+def test_undeliverable_domain_is_cached(fake_dns):
+    for _ in range(2):
+        with pytest.raises(EmailNotValidError):
+            validation.validate_address("a@nomail.example", check_deliverability=True)
+    assert fake_dns == ["nomail.example"]
+
+
+def test_validate_many_deduplicates_and_reports_each_address(fake_dns):
+    results = validation.validate_many(
+        ["a@example.com", "a@example.com", "b@example.com", "c@nomail.example", "not-an-email"],
+        check_deliverability=True,
+    )
+    assert results["a@example.com"] is None
+    assert results["b@example.com"] is None
+    assert "does not accept email" in results["c@nomail.example"]
+    assert results["not-an-email"]
+    assert len(results) == 4
+    assert sorted(fake_dns) == ["example.com", "nomail.example"]